@@ -0,0 +1,102 @@
+"""
+Benchmark of loading the output curves of a results tab: the .mint01,
+.mdcs01, .mgor01 and .mdor01 files of many samples. The line-by-line
+reader previously used for plotting is compared with CurveFile, and
+with CurveCache when reopening .npy sidecars and when held in memory.
+Plot points are built from plain tuples, so that Qt is not needed.
+
+Run from the gudpy directory:
+    python -m benchmarks.curve_load
+"""
+import os
+import shutil
+import tempfile
+import time
+
+from core.curve_cache import CurveCache
+from core.curve_file import CurveFile
+
+WATER_REF = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "test", "TestData", "water-ref", "plain"
+)
+EXTENSIONS = [".mint01", ".mdcs01", ".mgor01", ".mdor01"]
+N_SAMPLES = 100
+
+
+def lineByLine(path, offsetX=0.0, offsetY=0.0):
+    dataSet = []
+    with open(path, "r", encoding="utf-8") as fp:
+        for dataLine in fp.readlines():
+            if dataLine[0] == "#":
+                continue
+            x, y, err, *__ = [float(n) for n in dataLine.split()]
+            dataSet.append((x, y, err))
+    points = [(x, y) for x, y, _ in dataSet]
+    return [(x + offsetX, y + offsetY) for x, y in points]
+
+
+def vectorised(path, offsetX=0.0, offsetY=0.0, load=CurveFile):
+    curve = load(path)
+    return list(zip(
+        (curve.x + offsetX).tolist(), (curve.y + offsetY).tolist()))
+
+
+def timeLoad(load, paths):
+    start = time.perf_counter()
+    for path in paths:
+        load(path)
+    return time.perf_counter() - start
+
+
+def copyCurves(targetDir):
+    """Copies the curves of the reference samples, once per sample
+    of the benchmark, so that every sample has its own files
+    """
+    stems = sorted({
+        os.path.splitext(f)[0] for f in os.listdir(WATER_REF)
+        if os.path.splitext(f)[1] in EXTENSIONS
+    })
+    paths = []
+    for i in range(N_SAMPLES):
+        stem = stems[i % len(stems)]
+        for ext in EXTENSIONS:
+            path = os.path.join(targetDir, f"{stem}_{i}{ext}")
+            shutil.copyfile(os.path.join(WATER_REF, stem + ext), path)
+            paths.append(path)
+    return paths
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = copyCurves(tmp)
+        old = min(timeLoad(lineByLine, paths) for _ in range(3))
+        new = min(timeLoad(vectorised, paths) for _ in range(3))
+
+        def cached(cache):
+            return lambda path: vectorised(path, load=cache.load)
+
+        # The first view parses the files and writes the sidecars
+        first = timeLoad(cached(CurveCache()), paths)
+        # Later sessions reopen the sidecars
+        sidecar = min(
+            timeLoad(cached(CurveCache()), paths) for _ in range(3))
+        # Views within a session are served from memory
+        cache = CurveCache()
+        timeLoad(cached(cache), paths)
+        memory = min(timeLoad(cached(cache), paths) for _ in range(3))
+
+    print(f"{len(paths)} curves of {N_SAMPLES} samples")
+    print(f"{'reader':>24} {'time (s)':>10} {'speedup':>8}")
+    for name, t in [
+        ("line by line", old),
+        ("CurveFile", new),
+        ("CurveCache, first view", first),
+        ("CurveCache, sidecars", sidecar),
+        ("CurveCache, in memory", memory),
+    ]:
+        print(f"{name:>24} {t:>10.3f} {old / t:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Benchmark of parsing legacy (TXT) Gudrun input files of increasing size.
+Synthetic input files are made by replicating the samples of the
+NIMROD water test file, each with many data files.
+Parse time per sample should stay roughly constant (linear scaling).
+
+Run from the gudpy directory:
+    python -m benchmarks.gudrun_file_parse
+"""
+import contextlib
+import copy
+import io
+import os
+import tempfile
+import time
+
+from core.enums import Format
+from core.gudrun_file import GudrunFile
+
+WATER = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "test", "TestData", "NIMROD-water", "water.txt"
+)
+SAMPLE_COUNTS = [10, 100, 500, 1000, 2000]
+DATA_FILES_PER_SAMPLE = 10
+
+
+def makeInputFile(path, nSamples):
+    with contextlib.redirect_stdout(io.StringIO()):
+        gudrunFile = GudrunFile(loadFile=WATER, format=Format.TXT)
+    sampleBackground = gudrunFile.sampleBackgrounds[0]
+    template = sampleBackground.samples[0]
+    sampleBackground.samples = []
+    for i in range(nSamples):
+        sample = copy.deepcopy(template)
+        sample.name = f"SAMPLE_{i}"
+        sample.dataFiles.dataFiles = [
+            f"NIMROD{i:05d}{j:02d}.raw" for j in range(DATA_FILES_PER_SAMPLE)
+        ]
+        sampleBackground.samples.append(sample)
+    with open(path, "w", encoding="utf-8") as fp:
+        fp.write(str(gudrunFile))
+
+
+def timeParse(path, repeats=3):
+    best = float("inf")
+    for _ in range(repeats):
+        # Silence the parser's output
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            GudrunFile(loadFile=path, format=Format.TXT)
+            best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    print(f"{'samples':>8} {'lines':>8} {'time (s)':>10} {'ms/sample':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for nSamples in SAMPLE_COUNTS:
+            path = os.path.join(tmp, f"synthetic_{nSamples}.txt")
+            makeInputFile(path, nSamples)
+            with open(path, encoding="utf-8") as fp:
+                nLines = sum(1 for _ in fp)
+            elapsed = timeParse(path)
+            print(
+                f"{nSamples:>8} {nLines:>8} {elapsed:>10.3f}"
+                f" {1000 * elapsed / nSamples:>10.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Benchmark of rendering the text of an input file. A GudrunFile with
+many samples is rendered repeatedly, changing one field of one sample
+in between, as iterators do on each iteration. The time taken with the
+text of unchanged sections reused is compared with that of rendering
+every section again.
+
+Run from the gudpy directory:
+    python -m benchmarks.input_text
+"""
+import contextlib
+import io
+import os
+import time
+
+from core import gudpy as gp
+from core.enums import Format
+from core.section_cache import SectionCache
+
+WATER = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "test", "TestData", "NIMROD-water", "water.txt"
+)
+N_SAMPLES = 200
+N_ITERATIONS = 20
+
+
+def makeModel():
+    gudpy = gp.GudPy()
+    with contextlib.redirect_stdout(io.StringIO()):
+        gudpy.loadFromFile(loadFile=WATER, format=Format.TXT)
+    gudrunFile = gudpy.gudrunFile
+    samples = gudrunFile.sampleBackgrounds[0].samples
+    template = list(samples)
+    while len(samples) < N_SAMPLES:
+        samples.append(template[len(samples) % len(template)].clone())
+    return gudrunFile
+
+
+def iterate(gudrunFile, cached):
+    sample = gudrunFile.sampleBackgrounds[0].samples[0]
+    str(gudrunFile)
+    start = time.perf_counter()
+    for i in range(N_ITERATIONS):
+        if not cached:
+            gudrunFile.sectionCache = SectionCache()
+        sample.density = 0.1 + i * 1e-3
+        str(gudrunFile)
+    return (time.perf_counter() - start) / N_ITERATIONS
+
+
+def main():
+    gudrunFile = makeModel()
+    uncached = iterate(gudrunFile, False)
+    cached = iterate(gudrunFile, True)
+    print(f"{N_SAMPLES} samples, one field changed per iteration")
+    print(f"render everything (ms): {uncached * 1e3:.2f}")
+    print(f"reuse unchanged sections (ms): {cached * 1e3:.2f}")
+
+
+if __name__ == "__main__":
+    main()
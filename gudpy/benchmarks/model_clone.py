@@ -0,0 +1,71 @@
+"""
+Benchmark of cloning the project model. A GudrunFile with many samples
+is copied in full, as done for each worker and for each per-sample
+input file, using clone(), a deep copy, and a pickle round trip for
+reference.
+
+Run from the gudpy directory:
+    python -m benchmarks.model_clone
+"""
+import contextlib
+import io
+import os
+import pickle
+import time
+from copy import deepcopy
+
+from core import gudpy as gp
+from core.enums import Format
+
+WATER = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "test", "TestData", "NIMROD-water", "water.txt"
+)
+N_SAMPLES = 200
+REPEATS = 10
+
+
+def makeModel():
+    gudpy = gp.GudPy()
+    with contextlib.redirect_stdout(io.StringIO()):
+        gudpy.loadFromFile(loadFile=WATER, format=Format.TXT)
+    gudrunFile = gudpy.gudrunFile
+    samples = gudrunFile.sampleBackgrounds[0].samples
+    template = list(samples)
+    while len(samples) < N_SAMPLES:
+        samples.append(template[len(samples) % len(template)].clone())
+    return gudrunFile
+
+
+def pickleRoundTrip(gudrunFile):
+    return pickle.loads(pickle.dumps(gudrunFile))
+
+
+def measure(operation, gudrunFile):
+    times = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        operation(gudrunFile)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    gudrunFile = makeModel()
+    results = [
+        (name, measure(operation, gudrunFile))
+        for name, operation in [
+            ("clone", lambda g: g.clone()),
+            ("deepcopy", deepcopy),
+            ("pickle", pickleRoundTrip),
+        ]
+    ]
+
+    print(f"{N_SAMPLES} samples")
+    print(f"{'copy':>10} {'time (ms)':>10}")
+    for name, t in results:
+        print(f"{name:>10} {t * 1e3:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Benchmark of the memory held by the project model, and of copying it.
+A project with many samples is built from the water example, written
+to YAML, as every save does, and then copied in full, as the iterators
+do for each run. Reports the memory allocated for the model, the peak
+resident set size of the process, and the time taken to copy, both
+for the copy alone and once every object of the copy has been read.
+
+Run from the gudpy directory:
+    python -m benchmarks.model_memory
+"""
+import contextlib
+import io
+import os
+import resource
+import time
+import tracemalloc
+from copy import deepcopy
+
+from core import gudpy as gp
+from core.enums import Format
+from core.gudpy_yaml import YAML
+
+WATER = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "test", "TestData", "NIMROD-water", "water.txt"
+)
+N_SAMPLES = 2000
+N_COPIES = 5
+
+
+def loadWater():
+    gudpy = gp.GudPy()
+    with contextlib.redirect_stdout(io.StringIO()):
+        gudpy.loadFromFile(loadFile=WATER, format=Format.TXT)
+    return gudpy.gudrunFile
+
+
+def makeModel(water):
+    gudrunFile = deepcopy(water)
+    samples = gudrunFile.sampleBackgrounds[0].samples
+    template = list(samples)
+    while len(samples) < N_SAMPLES:
+        samples.append(deepcopy(template[len(samples) % len(template)]))
+    # Every object is read when saving
+    YAML().toYamlDict(gudrunFile)
+    return gudrunFile
+
+
+def timeCopy(gudrunFile, read):
+    start = time.perf_counter()
+    copy = deepcopy(gudrunFile)
+    if read:
+        # Reading every object fills in the whole copy
+        YAML().toYamlDict(copy)
+    return time.perf_counter() - start, copy
+
+
+def main():
+    water = loadWater()
+
+    tracemalloc.start()
+    gudrunFile = makeModel(water)
+    modelSize, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    copies = []
+    results = {}
+    for read in (False, True):
+        times = []
+        for _ in range(N_COPIES):
+            t, copy = timeCopy(gudrunFile, read)
+            times.append(t)
+            copies.append(copy)
+        results[read] = min(times)
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(f"{N_SAMPLES} samples, {2 * N_COPIES} copies kept")
+    print(f"model memory (MB): {modelSize / 1e6:.1f}")
+    print(f"peak RSS (MB): {peak / 1e3:.1f}")
+    print(f"deepcopy (ms): {results[False] * 1e3:.1f}")
+    print(f"deepcopy, then write to YAML (ms): {results[True] * 1e3:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Benchmark of loading YAML project files of increasing size.
+Synthetic projects are made by replicating the samples of the
+NIMROD water test file. The time to read the YAML (round-trip versus
+safe loading) and to construct the GudPy objects are reported.
+
+Run from the gudpy directory:
+    python -m benchmarks.yaml_load
+"""
+import contextlib
+import copy
+import io
+import os
+import tempfile
+import time
+
+from core.enums import Format
+from core.gudpy_yaml import YAML
+from core.gudrun_file import GudrunFile
+
+WATER = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "test", "TestData", "NIMROD-water", "water.txt"
+)
+SAMPLE_COUNTS = [10, 100, 500]
+
+
+def makeProject(path, nSamples):
+    with contextlib.redirect_stdout(io.StringIO()):
+        gudrunFile = GudrunFile(loadFile=WATER, format=Format.TXT)
+    sampleBackground = gudrunFile.sampleBackgrounds[0]
+    templates = sampleBackground.samples
+    sampleBackground.samples = []
+    for i in range(nSamples):
+        sample = copy.deepcopy(templates[i % len(templates)])
+        sample.name = f"SAMPLE_{i}"
+        sampleBackground.samples.append(sample)
+    gudrunFile.yaml.writeYAML(gudrunFile, path)
+
+
+def best(f, repeats=3):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        f()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    print(
+        f"{'samples':>8} {'rt read (s)':>12} {'safe read (s)':>14}"
+        f" {'construct (s)':>14} {'ms/sample':>10}"
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        for nSamples in SAMPLE_COUNTS:
+            path = os.path.join(tmp, f"synthetic_{nSamples}.yaml")
+            makeProject(path, nSamples)
+            yaml = YAML()
+            yaml.path = path
+
+            def roundTripRead():
+                with open(path, encoding="utf-8") as fp:
+                    yaml.yaml.load(fp)
+
+            roundTrip = best(roundTripRead)
+            read = best(lambda: yaml.yamlToDict(path))
+            yamldict = yaml.yamlToDict(path)
+            construct = best(lambda: yaml.constructClasses(yamldict))
+            print(
+                f"{nSamples:>8} {roundTrip:>12.3f} {read:>14.3f}"
+                f" {construct:>14.3f}"
+                f" {1000 * (read + construct) / nSamples:>10.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Benchmark of exporting a project to a ZIP archive. Writing every file
+with ZipFile, one after another, is compared with exportZip, which
+compresses members concurrently, with and without compression.
+The project is built from copies of the reference outputs.
+
+Run from the gudpy directory:
+    python -m benchmarks.zip_export
+"""
+import os
+import shutil
+import tempfile
+import time
+from zipfile import ZIP_DEFLATED, ZipFile
+
+from core.zip_export import ExportMember, exportZip
+
+WATER_REF = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "test", "TestData", "water-ref", "plain"
+)
+N_SAMPLES = 200
+
+
+def makeProject(projectDir):
+    members = []
+    for i in range(N_SAMPLES):
+        sampleDir = os.path.join(projectDir, f"Sample{i}")
+        os.makedirs(sampleDir)
+        for f in sorted(os.listdir(WATER_REF)):
+            path = os.path.join(sampleDir, f)
+            shutil.copyfile(os.path.join(WATER_REF, f), path)
+            members.append(ExportMember(
+                os.path.relpath(path, projectDir), path=path))
+    return members
+
+
+def serial(members, exportTo):
+    with ZipFile(exportTo, "w", ZIP_DEFLATED) as zipFile:
+        for member in members:
+            zipFile.write(member.path, arcname=member.arcname)
+
+
+def timeExport(export, members, exportTo):
+    start = time.perf_counter()
+    export(members, exportTo)
+    return time.perf_counter() - start
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        members = makeProject(os.path.join(tmp, "project"))
+        exportTo = os.path.join(tmp, "export.zip")
+        size = sum(m.size() for m in members)
+
+        results = []
+        for name, export in [
+            ("ZipFile, serial", serial),
+            ("exportZip", exportZip),
+            ("exportZip, store", lambda m, e: exportZip(m, e, store=True)),
+        ]:
+            t = min(timeExport(export, members, exportTo) for _ in range(3))
+            results.append((name, t, os.path.getsize(exportTo)))
+
+    print(f"{len(members)} files, {size / 1e6:.1f} MB")
+    print(f"{'export':>18} {'time (s)':>10} {'size (MB)':>10} {'speedup':>8}")
+    for name, t, archiveSize in results:
+        print(
+            f"{name:>18} {t:>10.3f} {archiveSize / 1e6:>10.1f} "
+            f"{results[0][1] / t:>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,10 @@
 from core.utils import spacify
 from core.enums import Geometry
 from core import config
+from core.copy_on_write import CopyOnWrite
 
 
-class Beam:
+class Beam(CopyOnWrite):
     """
     Class to represent a Beam.
 
@@ -51,6 +52,8 @@ class Beam:
     -------
     """
 
+    yamlignore = frozenset()
+
     def __init__(self):
         """
         Constructs all the necessary attributes for the Beam object.
@@ -78,10 +81,6 @@ class Beam:
         self.sampleDependantBackgroundFactor = 0.0
         self.shieldingAttenuationCoefficient = 0.0
 
-        self.yamlignore = {
-            "yamlignore"
-        }
-
     def __str__(self):
         """
         Returns the string representation of the Beam object.
@@ -1,99 +1,114 @@
+import functools
 import re
-import math
 
+import numpy as np
+
+from core.composition_engine import (
+    NO_ROW, Abundances, expectedDCSLevel
+)
 from core.element import Element
 from core.isotopes import Sears91
 from core.exception import ChemicalFormulaParserException
 from core.mass_data import massData
 from core import config
+from core.copy_on_write import CopyOnWrite
+
+
+# Most formulae whose parsed elements are kept
+FORMULA_CACHE_SIZE = 1024
+
+
+@functools.lru_cache(maxsize=FORMULA_CACHE_SIZE)
+def _parseFormula(formula):
+    """
+    Parses a chemical formula in a single scan. Returns a tuple of the
+    (symbol, mass number, abundance) of each element, None if the
+    formula does not start with an element, or False if it is invalid.
+    """
+    match = ChemicalFormulaParser.TOKEN.match(formula)
+    if not match:
+        return None
+    elements = []
+    while match:
+        symbol, massNo, abundance = match.groups()
+        massNo = int(massNo) if massNo else 0
+        abundance = float(abundance) if abundance else 1.0
+        if symbol == "D":
+            symbol = "H"
+            massNo = 2.0
+        if symbol not in massData:
+            return False
+        if (
+            Sears91.byElement.get(symbol)
+            and not Sears91().isIsotope(symbol, massNo)
+        ):
+            validIsotopes = "\n  -    ".join(
+                [
+                    f"{Sears91.isotope(isotope)}"
+                    f", {symbol}[{Sears91.mass(isotope)}]"
+                    for isotope in Sears91.byElement[symbol]
+                ]
+            )
+            raise ChemicalFormulaParserException(
+                f"{symbol}_{massNo} is not a valid isotope of {symbol}\n."
+                f" The following are valid:\n  -    {validIsotopes}"
+            )
+        elements.append((symbol, massNo, abundance))
+        if match.end() == len(formula):
+            return tuple(elements)
+        match = ChemicalFormulaParser.TOKEN.match(formula, match.end())
+    return False
 
 
 class ChemicalFormulaParser():
+    """
+    Class to parse chemical formulae, such as "H2O" or "C[13]O2",
+    into elements. Parsed formulae are cached, so parsing the same
+    formula again is cheap.
+    """
 
-    def __init__(self):
-        self.stream = None
-        self.regex = re.compile(r"[A-Z][a-z]?(\[\d+\])?\d*")
-        self.sears91 = Sears91()
-
-    def consumeTokens(self, n):
-        for _ in range(n):
-            if self.stream:
-                self.stream.pop(0)
+    # Symbol, then optional mass number and abundance of an element
+    TOKEN = re.compile(r"([A-Z][a-z]?)(?:\[(\d+)\])?(\d+\.\d+|\d+)?")
 
     def parse(self, stream):
-        if not self.regex.match(stream):
-            return None
-        self.stream = list(stream)
-        elements = []
-        while self.stream:
-            element = self.parseElement()
-            if element:
-                elements.append(element)
-            else:
-                return False
-        return elements
-
-    def parseElement(self):
-        symbol = self.parseSymbol()
-        massNo = self.parseMassNo()
-        abundance = self.parseAbundance()
-        if symbol == "D":
-            symbol = "H"
-            massNo = 2.0
-        if symbol in massData.keys():
-            if (
-                not self.sears91.isotopes(symbol)
-                or self.sears91.isIsotope(symbol, massNo)
-            ):
-                return Element(symbol, massNo, abundance)
-            else:
-                validIsotopes = "\n  -    ".join(
-                    [
-                        f"{self.sears91.isotope(isotope)}"
-                        f", {symbol}[{self.sears91.mass(isotope)}]"
-                        for isotope in self.sears91.isotopes(symbol)
-                    ]
-                )
-                raise ChemicalFormulaParserException(
-                    f"{symbol}_{massNo} is not a valid isotope of {symbol}\n."
-                    f" The following are valid:\n  -    {validIsotopes}"
-                )
-
-    def parseSymbol(self):
-        if self.stream:
-            match = re.match(r"[A-Z][a-z]|[A-Z]", "".join(self.stream))
-            if match:
-                self.consumeTokens(len(match.group(0)))
-                return match.group(0)
-
-    def parseMassNo(self):
-        if self.stream:
-            match = re.match(r"\[\d+\]", "".join(self.stream))
-            if match:
-                self.consumeTokens(len(match.group(0)))
-                return int("".join(match.group(0)[1:-1]))
-        return 0
+        """
+        Parses a chemical formula.
+
+        Parameters
+        ----------
+        stream : str
+            Formula to parse.
+
+        Returns
+        -------
+        Element[] | None | bool
+            New elements of the formula, None if the formula does
+            not start with an element, or False if it is invalid.
+
+        Raises
+        ------
+        ChemicalFormulaParserException
+            If the formula holds an isotope which does not exist.
+        """
+        elements = _parseFormula(stream)
+        if not elements:
+            return elements
+        return [
+            Element(symbol, massNo, abundance)
+            for symbol, massNo, abundance in elements
+        ]
 
-    def parseAbundance(self):
-        if self.stream:
-            match = re.match(r"\d+\.\d+|\d+", "".join(self.stream))
-            if match:
-                self.consumeTokens(len(match.group(0)))
-                return float(match.group(0))
-        return 1.0
 
+class Component(CopyOnWrite):
 
-class Component():
+    __slots__ = ("name", "elements")
+    yamlignore = frozenset()
+    # The parser holds no state, so it is shared by all components
+    parser = ChemicalFormulaParser()
 
     def __init__(self, name="", elements=[]):
         self.name = name
         self.elements = elements
-        self.parser = ChemicalFormulaParser()
-
-        self.yamlignore = {
-            "parser",
-            "yamlignore"
-        }
 
     def addElement(self, element):
         self.elements.append(element)
@@ -119,15 +134,13 @@ class Component():
         ) and self.name == obj.name
 
 
-class Components():
+class Components(CopyOnWrite):
+
+    yamlignore = frozenset()
 
     def __init__(self, components=[]):
         self.components = components
 
-        self.yamlignore = {
-            "yamlignore"
-        }
-
     def addComponent(self, component):
         self.components.append(component)
 
@@ -140,14 +153,14 @@ class Components():
         return len(self.components)
 
 
-class WeightedComponent():
+class WeightedComponent(CopyOnWrite):
+
+    __slots__ = ("component", "ratio")
+    yamlignore = frozenset()
 
     def __init__(self, component, ratio):
         self.component = component
         self.ratio = ratio
-        self.yamlignore = {
-            "yamlignore"
-        }
 
     def translate(self):
         elements = []
@@ -165,7 +178,9 @@ class WeightedComponent():
             return self.component == obj.component and self.ratio == obj.ratio
 
 
-class Composition():
+class Composition(CopyOnWrite):
+
+    yamlignore = frozenset()
 
     def __init__(self, type_, elements=None):
         self.type_ = type_
@@ -175,10 +190,6 @@ class Composition():
             self.elements = elements
         self.weightedComponents = []
 
-        self.yamlignore = {
-            "yamlignore"
-        }
-
     def addComponent(self, component, ratio):
         self.weightedComponents.append(
             WeightedComponent(component, ratio)
@@ -191,22 +202,18 @@ class Composition():
         self.elements.extend(elements)
 
     def shallowTranslate(self):
-        elements = []
-        for component in self.weightedComponents:
-            elements.extend(component.translate())
-        self.sumAndMutate(elements, elements)
-        return elements
+        """
+        Returns the relative composition of elements of the weighted
+        components, without changing the composition.
+        """
+        return Abundances.translate(self.weightedComponents).toElements()
 
     def translate(self):
         """
         Translates the weighted components present in the composition,
         into a relative composition of elements.
         """
-        elements = []
-        self.elements = []
-        for component in self.weightedComponents:
-            elements.extend(component.translate())
-        self.sumAndMutate(elements, self.elements)
+        self.elements = self.shallowTranslate()
 
     @staticmethod
     def sumAndMutate(elements, target):
@@ -215,17 +222,19 @@ class Composition():
         This ensures that the same element isn't written out
         multiple times.
         """
+        existing = {}
+        for element_ in target:
+            existing.setdefault(
+                (element_.atomicSymbol, element_.massNo), []
+            ).append(element_)
         for element in elements:
-            exists = False
-            for element_ in target:
-                if (
-                    element.atomicSymbol == element_.atomicSymbol
-                    and element.massNo == element_.massNo
-                ):
+            key = (element.atomicSymbol, element.massNo)
+            if key in existing:
+                for element_ in existing[key]:
                     element_.abundance += element.abundance
-                    exists = True
-            if not exists:
+            else:
                 target.append(element)
+                existing[key] = [element]
 
     def __str__(self):
         string = ""
@@ -239,16 +248,13 @@ class Composition():
 
     @staticmethod
     def calculateExpectedDCSLevel(elements):
-        totalAbundance = sum([el.abundance for el in elements])
-        s91 = Sears91()
-        if len(elements) and totalAbundance > 0.0:
-            return round(sum(
+        return expectedDCSLevel(
+            np.array(
                 [
-                    s91.totalXS(
-                        s91.isotopeData(
-                            el.atomicSymbol, el.massNo
-                        )
-                    ) * (el.abundance/totalAbundance) for el in elements
-                ]
-            ) / 4.0 / math.pi, 5)
-        return 0.0
+                    Sears91.rows.get((el.atomicSymbol, el.massNo), NO_ROW)
+                    for el in elements
+                ],
+                dtype=np.intp
+            ),
+            np.array([el.abundance for el in elements], dtype=np.float64)
+        )
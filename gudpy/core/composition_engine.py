@@ -0,0 +1,162 @@
+import math
+
+import numpy as np
+
+from core.element import Element
+from core.isotopes import Sears91
+
+# Row of isotopes which are not in the Sears91 table
+NO_ROW = -1
+
+
+class Abundances:
+    """
+    Class to represent the abundances of a set of isotopes as arrays,
+    for arithmetic over whole compositions. Each isotope is held once,
+    in the order it first appeared.
+
+    ...
+
+    Attributes
+    ----------
+    keys : tuple[str, int][]
+        Atomic symbol and mass number of each isotope.
+    rows : np.ndarray
+        Row of each isotope in the Sears91 table, or NO_ROW.
+    values : np.ndarray
+        Abundance of each isotope.
+    """
+
+    __slots__ = ("keys", "rows", "values")
+
+    def __init__(self, keys, values):
+        self.keys = keys
+        self.rows = np.array(
+            [Sears91.rows.get(key, NO_ROW) for key in keys], dtype=np.intp
+        )
+        self.values = values
+
+    @staticmethod
+    def _merge(keys, values):
+        """
+        Sums the values of repeated keys, in order, so that the result
+        is rounded the same as adding them one at a time.
+        """
+        first = {}
+        inverse = np.fromiter(
+            (first.setdefault(key, len(first)) for key in keys),
+            dtype=np.intp, count=len(keys)
+        )
+        merged = np.zeros(len(first), dtype=np.float64)
+        np.add.at(merged, inverse, values)
+        return Abundances(list(first), merged)
+
+    @classmethod
+    def fromElements(cls, elements):
+        """
+        Returns the abundances of a list of elements, summing those
+        of repeated isotopes.
+
+        Parameters
+        ----------
+        elements : Element[]
+            Elements to sum.
+
+        Returns
+        -------
+        Abundances
+            Abundances of each isotope.
+        """
+        return cls._merge(
+            [(el.atomicSymbol, el.massNo) for el in elements],
+            np.array([el.abundance for el in elements], dtype=np.float64)
+        )
+
+    @classmethod
+    def translate(cls, weightedComponents):
+        """
+        Returns the abundances of each isotope in a mixture of components,
+        each weighted by its ratio.
+
+        Parameters
+        ----------
+        weightedComponents : WeightedComponent[]
+            Components and their ratios.
+
+        Returns
+        -------
+        Abundances
+            Abundances of each isotope.
+        """
+        keys = []
+        owners = []
+        abundances = []
+        for i, wc in enumerate(weightedComponents):
+            for el in wc.component.elements:
+                keys.append((el.atomicSymbol, el.massNo))
+                owners.append(i)
+                abundances.append(el.abundance)
+        ratios = np.array(
+            [wc.ratio for wc in weightedComponents], dtype=np.float64
+        )
+        # Abundance of each element of each component, times its ratio
+        weighted = (
+            ratios[np.array(owners, dtype=np.intp)]
+            * np.array(abundances, dtype=np.float64)
+        )
+        return cls._merge(keys, weighted)
+
+    def toElements(self):
+        """
+        Returns the abundances as a list of elements.
+        """
+        return [
+            Element(symbol, massNo, abundance)
+            for (symbol, massNo), abundance in zip(
+                self.keys, self.values.tolist())
+        ]
+
+    def expectedDCSLevel(self):
+        """
+        Returns the expected level of the differential cross section,
+        from the total cross sections of the isotopes.
+
+        Raises
+        ------
+        KeyError
+            If an isotope is not in the Sears91 table.
+        """
+        return expectedDCSLevel(self.rows, self.values)
+
+
+def expectedDCSLevel(rows, abundances):
+    """
+    Returns the expected level of the differential cross section of
+    a composition.
+
+    Parameters
+    ----------
+    rows : np.ndarray
+        Row of each isotope in the Sears91 table, or NO_ROW.
+    abundances : np.ndarray
+        Abundance of each isotope.
+
+    Returns
+    -------
+    float
+        Expected DCS level, or 0 if there are no isotopes.
+
+    Raises
+    ------
+    KeyError
+        If an isotope is not in the Sears91 table.
+    """
+    totalAbundance = sum(abundances.tolist())
+    if not len(rows) or totalAbundance <= 0.0:
+        return 0.0
+    if (rows == NO_ROW).any():
+        raise KeyError("Isotope is not in the Sears91 table")
+    totalXS = Sears91.columns["totalXS"][rows]
+    return round(float(
+        np.sum(totalXS * (abundances / totalAbundance))
+    ) / 4.0 / math.pi, 5)
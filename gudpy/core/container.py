@@ -1,4 +1,3 @@
-from copy import deepcopy
 import os
 
 from core.element import Element
@@ -10,9 +9,12 @@ from core.enums import CrossSectionSource
 from core.sample import Sample
 from core.exception import ParserException
 from core.utils import firstword, nthfloat, nthint
+from core.token_stream import TokenStream
+from core import text_file
+from core.copy_on_write import CopyOnWrite
 
 
-class Container:
+class Container(CopyOnWrite):
     """
     Class to represent a Container.
 
@@ -61,6 +63,23 @@ class Container:
     -------
     """
 
+    __slots__ = (
+        "name", "periodNumber", "dataFiles", "composition", "geometry",
+        "upstreamThickness", "downstreamThickness", "angleOfRotation",
+        "sampleWidth", "innerRadius", "outerRadius", "sampleHeight",
+        "density", "densityUnits", "totalCrossSectionSource",
+        "crossSectionFilename", "tweakFactor", "scatteringFraction",
+        "attenuationCoefficient", "runAsSample", "topHatW", "FTMode",
+        "minRadFT", "maxRadFT", "grBroadening", "powerForBroadening",
+        "stepSize",
+        # Only set while parsing
+        "stream"
+    )
+    yamlignore = frozenset({
+        "runAsSample", "topHatW", "FTMode", "minRadFT", "maxRadFT",
+        "grBroadening", "powerForBroadening", "stepSize"
+    })
+
     def __init__(self, config=None):
         """
         Constructs all the necessary attributes for the Container object.
@@ -98,18 +117,6 @@ class Container:
         self.powerForBroadening = 0.0
         self.stepSize = 0.0
 
-        self.yamlignore = {
-            "runAsSample",
-            "topHatW",
-            "FTMode",
-            "minRadFT",
-            "maxRadFT",
-            "grBroadening",
-            "powerForBroadening",
-            "stepSize",
-            "yamlignore"
-        }
-
         if config:
             self.parseFromConfig(config)
 
@@ -213,9 +220,9 @@ class Container:
         sample = Sample()
         sample.name = self.name
         sample.periodNumber = self.periodNumber
-        sample.dataFiles = deepcopy(self.dataFiles)
+        sample.dataFiles = self.dataFiles.clone()
         sample.forceCalculationOfCorrections = True
-        sample.composition = deepcopy(self.composition)
+        sample.composition = self.composition.clone()
         sample.geometry = self.geometry
         sample.upstreamThickness = self.upstreamThickness
         sample.downstreamThickness = self.downstreamThickness
@@ -249,14 +256,8 @@ class Container:
                  Cannot parse from an invalid path"
             )
 
-        # Decide the encoding
-        import chardet
-        with open(path, 'rb') as fp:
-            encoding = chardet.detect(fp.read())['encoding']
-
         # Read the input stream into our attribute.
-        with open(path, encoding=encoding) as fp:
-            self.stream = fp.readlines()
+        self.stream = TokenStream(text_file.readLines(path))
 
         try:
             # Create a new instance of Container.
@@ -370,3 +371,6 @@ class Container:
                 " The input file is most likely of an incorrect format, "
                 "and some attributes were missing."
             ) from e
+        finally:
+            # Release the lines once parsed.
+            del self.stream
@@ -0,0 +1,355 @@
+import copy
+import itertools
+from enum import Enum
+
+# Logical clock, ordering changes to model objects
+_clock = itertools.count(1)
+
+_IMMUTABLE = (str, int, float, complex, bytes, type(None), Enum)
+# Slots holding the bookkeeping of an object, which are not fields
+_SLOTS = ("_cowModified",)
+# Names of the slots holding the fields of each class,
+# and whether its instances also have a __dict__
+_layouts = {}
+# How values of each type are copied
+_SHARE, _NODE, _COW_LIST, _LIST, _TUPLE, _OTHER = range(6)
+_kinds = {}
+
+
+def _layout(cls):
+    layout = _layouts.get(cls)
+    if layout is None:
+        slots = []
+        for base in reversed(cls.__mro__):
+            names = base.__dict__.get("__slots__", ())
+            if isinstance(names, str):
+                names = (names,)
+            slots.extend(
+                n for n in names
+                if n not in _SLOTS and n not in ("__dict__", "__weakref__")
+            )
+        layout = _layouts[cls] = (tuple(slots), cls.__dictoffset__ != 0)
+    return layout
+
+
+def _kind(cls):
+    kind = _kinds.get(cls)
+    if kind is None:
+        if issubclass(cls, _IMMUTABLE):
+            kind = _SHARE
+        elif issubclass(cls, CopyOnWrite):
+            kind = _NODE
+        elif issubclass(cls, CopyOnWriteList):
+            kind = _COW_LIST
+        elif cls is list:
+            kind = _LIST
+        elif cls is tuple:
+            kind = _TUPLE
+        else:
+            kind = _OTHER
+        _kinds[cls] = kind
+    return kind
+
+
+def _tracked(value):
+    """Returns a list as a CopyOnWriteList, so that changes made in
+    place to it, or to the lists it holds, are tracked
+    """
+    if type(value) is list:
+        return CopyOnWriteList(value)
+    return value
+
+
+def clock() -> int:
+    """Returns the current time of the logical clock. Changes made
+    afterwards to model objects, or to their lists, are later.
+    """
+    return next(_clock)
+
+
+def trackedObjects(obj) -> list:
+    """Returns the model objects and lists reachable from a model
+    object, including itself, whose changes are tracked
+
+    Parameters
+    ----------
+    obj : CopyOnWrite
+        Model object to start from.
+
+    Returns
+    -------
+    list
+        Model objects and CopyOnWriteLists.
+    """
+    found = []
+    seen = set()
+    stack = [obj]
+    while stack:
+        value = stack.pop()
+        if id(value) in seen:
+            continue
+        seen.add(id(value))
+        kind = _kind(type(value))
+        if kind == _NODE:
+            found.append(value)
+            slots, hasDict = _layout(type(value))
+            items = [getattr(value, name, None) for name in slots]
+            if hasDict:
+                items.extend(value.__dict__.values())
+        elif kind == _COW_LIST:
+            found.append(value)
+            items = value
+        elif kind == _LIST or kind == _TUPLE:
+            items = value
+        else:
+            continue
+        for item in items:
+            # Immutable values hold nothing to track
+            kind = _kinds.get(type(item))
+            if kind is None:
+                kind = _kind(type(item))
+            if kind != _SHARE and kind != _OTHER:
+                stack.append(item)
+    return found
+
+
+def changedSince(objects, time) -> bool:
+    """Returns whether any of the given model objects or lists,
+    as returned by trackedObjects, was changed after `time`
+    """
+    for obj in objects:
+        if obj._cowModified > time:
+            return True
+    return False
+
+
+def fields(obj) -> dict:
+    """Returns the fields of a model object.
+
+    Parameters
+    ----------
+    obj : CopyOnWrite
+        Object to return the fields of
+
+    Returns
+    -------
+    dict
+        Attribute names mapped to values
+    """
+    slots, hasDict = _layout(type(obj))
+    state = {}
+    for name in slots:
+        try:
+            state[name] = object.__getattribute__(obj, name)
+        except AttributeError:
+            # Optional fields are left unset
+            pass
+    if hasDict:
+        state.update(obj.__dict__)
+    return state
+
+
+def _newObject(cls):
+    obj = object.__new__(cls)
+    object.__setattr__(obj, "_cowModified", 0)
+    return obj
+
+
+def _cloneNode(obj, memo):
+    """Copies a model object at once, sharing its immutable values
+    """
+    cls = type(obj)
+    result = _newObject(cls)
+    memo[id(obj)] = result
+    slots, hasDict = _layout(cls)
+    ignore = cls.copyIgnore
+    for name in slots:
+        try:
+            value = object.__getattribute__(obj, name)
+        except AttributeError:
+            continue
+        if _kind(type(value)) != _SHARE:
+            value = _cloneValue(value, memo)
+        object.__setattr__(result, name, value)
+    if hasDict:
+        for name, value in obj.__dict__.items():
+            if name in ignore:
+                continue
+            if _kind(type(value)) != _SHARE:
+                value = _cloneValue(value, memo)
+            object.__setattr__(result, name, value)
+    return result
+
+
+def _cloneValue(value, memo):
+    kind = _kind(type(value))
+    if kind == _SHARE:
+        return value
+    result = memo.get(id(value))
+    if result is not None:
+        return result
+    if kind == _NODE:
+        return _cloneNode(value, memo)
+    if kind == _COW_LIST or kind == _LIST:
+        result = type(value)()
+        memo[id(value)] = result
+        list.extend(result, [_cloneValue(v, memo) for v in value])
+        return result
+    if kind == _TUPLE:
+        items = [_cloneValue(v, memo) for v in value]
+        if all(a is b for a, b in zip(items, value)):
+            return value
+        return tuple(items)
+    # Other mutable values, such as dicts and arrays, are copied in full
+    return copy.deepcopy(value, memo)
+
+
+class CopyOnWrite:
+    """
+    Mixin for model classes, which makes copies share their immutable
+    values, and records when each object was last changed.
+
+    Copies, whether made with clone() or copy.deepcopy, are made at
+    once, so they are independent of their source from the moment
+    they are returned, and may be handed to other threads. Attributes
+    are tracked when reassigned, and lists assigned to attributes, or
+    added to such lists, are converted to CopyOnWriteList, which tracks
+    changes made in place, such as to the rows of a table. Other
+    mutable values are copied in full, but changes made to them in
+    place are not tracked.
+
+    Subclasses may declare their fields in __slots__. The bookkeeping
+    is kept in a slot of the mixin, so that it is never part of the
+    fields of an object.
+
+    ...
+
+    Attributes
+    ----------
+    copyIgnore : frozenset
+        Attributes which are not copied.
+    """
+
+    __slots__ = _SLOTS
+    copyIgnore = frozenset()
+
+    def __new__(cls, *args, **kwargs):
+        return _newObject(cls)
+
+    def __setattr__(self, name, value):
+        object.__setattr__(self, "_cowModified", next(_clock))
+        object.__setattr__(self, name, _tracked(value))
+
+    def __delattr__(self, name):
+        object.__setattr__(self, "_cowModified", next(_clock))
+        object.__delattr__(self, name)
+
+    def clone(self):
+        """Returns a copy of the object. Immutable values are shared
+        with the original.
+
+        Returns
+        -------
+        CopyOnWrite
+            Copy of the object.
+        """
+        return _cloneNode(self, {})
+
+    def __deepcopy__(self, memo):
+        return _cloneNode(self, memo)
+
+    def __copy__(self):
+        result = type(self).__new__(type(self))
+        for k, v in fields(self).items():
+            object.__setattr__(result, k, v)
+        return result
+
+    def __getstate__(self):
+        return fields(self)
+
+    def __setstate__(self, state):
+        for k, v in state.items():
+            object.__setattr__(self, k, _tracked(v))
+
+
+class CopyOnWriteList(list):
+    """
+    List which records when it was last changed, and whose lists are
+    tracked in the same way. See CopyOnWrite.
+    """
+
+    __slots__ = ("_cowModified",)
+
+    def __init__(self, items=()):
+        super().__init__(_tracked(item) for item in items)
+        self._cowModified = 0
+
+    def _beforeWrite(self):
+        self._cowModified = next(_clock)
+
+    def append(self, item):
+        self._beforeWrite()
+        list.append(self, _tracked(item))
+
+    def extend(self, items):
+        self._beforeWrite()
+        list.extend(self, [_tracked(item) for item in items])
+
+    def insert(self, index, item):
+        self._beforeWrite()
+        list.insert(self, index, _tracked(item))
+
+    def remove(self, item):
+        self._beforeWrite()
+        list.remove(self, item)
+
+    def pop(self, index=-1):
+        self._beforeWrite()
+        return list.pop(self, index)
+
+    def clear(self):
+        self._beforeWrite()
+        list.clear(self)
+
+    def sort(self, *args, **kwargs):
+        self._beforeWrite()
+        list.sort(self, *args, **kwargs)
+
+    def reverse(self):
+        self._beforeWrite()
+        list.reverse(self)
+
+    def __setitem__(self, index, item):
+        self._beforeWrite()
+        if isinstance(index, slice):
+            item = [_tracked(i) for i in item]
+        else:
+            item = _tracked(item)
+        list.__setitem__(self, index, item)
+
+    def __delitem__(self, index):
+        self._beforeWrite()
+        list.__delitem__(self, index)
+
+    def __iadd__(self, items):
+        self._beforeWrite()
+        return list.__iadd__(self, [_tracked(item) for item in items])
+
+    def __imul__(self, n):
+        self._beforeWrite()
+        return list.__imul__(self, n)
+
+    def clone(self):
+        """Returns a copy of the list and of its items.
+        See CopyOnWrite.clone.
+        """
+        return _cloneValue(self, {})
+
+    def __deepcopy__(self, memo):
+        return _cloneValue(self, memo)
+
+    def __copy__(self):
+        return CopyOnWriteList(self)
+
+    def __reduce_ex__(self, protocol):
+        return (CopyOnWriteList, (list(self),))
@@ -0,0 +1,190 @@
+import json
+import os
+import threading
+import typing as typ
+from collections import OrderedDict
+
+import numpy as np
+
+from core.curve_file import CurveFile
+
+# Directory, next to the output files, holding the cached arrays
+CACHE_DIRNAME = ".gudpy_cache"
+# Default memory budget of the in-process cache, in bytes
+DEFAULT_MEMORY_BUDGET = 256 * 1024 * 1024
+
+
+def sourceKey(path: str) -> typ.Tuple[int, int]:
+    """Returns the size and modification time of a file, which
+    identify the version of the file that was parsed
+    """
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+class CurveCache:
+    """
+    Class to cache parsed output curves. Parsed arrays are stored as
+    .npy sidecars, in a hidden directory next to the output files,
+    and are reopened with memory mapping. An in-process LRU cache sits
+    in front of the sidecars, holding curves up to a memory budget.
+    Entries are keyed by path, and are used only while the size and
+    modification time of the file are unchanged.
+
+    ...
+
+    Attributes
+    ----------
+    memoryBudget : int
+        Maximum number of bytes of curve data held in memory.
+    persist : bool
+        If sidecars should be read and written.
+    size : int
+        Number of bytes of curve data currently held in memory.
+    """
+
+    def __init__(
+        self,
+        memoryBudget: int = DEFAULT_MEMORY_BUDGET,
+        persist: bool = True
+    ):
+        self.memoryBudget = memoryBudget
+        self.persist = persist
+        self.entries = OrderedDict()
+        self.size = 0
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def sidecarPaths(path: str) -> typ.Tuple[str, str]:
+        """Returns the paths of the array and header sidecars of a file
+        """
+        cacheDir = os.path.join(os.path.dirname(path), CACHE_DIRNAME)
+        base = os.path.join(cacheDir, os.path.basename(path))
+        return f"{base}.npy", f"{base}.json"
+
+    def load(self, path: str) -> CurveFile:
+        """Returns the parsed curve of an output file, from memory or
+        its sidecar if either is up to date, otherwise by parsing it.
+
+        Parameters
+        ----------
+        path : str
+            Path to the output file
+
+        Returns
+        -------
+        CurveFile
+            Parsed curve. Its arrays may be read-only.
+
+        Raises
+        ------
+        ParserException
+            Raised if the file cannot be parsed
+        """
+        key = os.path.abspath(path)
+        try:
+            source = sourceKey(key)
+        except OSError:
+            # Let CurveFile raise the appropriate exception
+            return CurveFile(path)
+
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry and entry[0] == source:
+                self.entries.move_to_end(key)
+                return entry[1]
+
+        curve = self.readSidecar(key, source) if self.persist else None
+        if curve is None:
+            curve = CurveFile(key)
+            if self.persist:
+                self.writeSidecar(curve, source)
+        self.remember(key, source, curve)
+        return curve
+
+    def readSidecar(
+        self, path: str, source: typ.Tuple[int, int]
+    ) -> typ.Union[CurveFile, None]:
+        """Reads the sidecar of a file, if it is up to date
+        """
+        npyPath, jsonPath = self.sidecarPaths(path)
+        try:
+            with open(jsonPath, "r", encoding="utf-8") as fp:
+                info = json.load(fp)
+            if tuple(info["source"]) != source:
+                return None
+            try:
+                data = np.load(npyPath, mmap_mode="r")
+            except ValueError:
+                # Empty arrays cannot be memory mapped
+                data = np.load(npyPath)
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        if data.ndim != 2 or data.shape[0] != 3:
+            return None
+        return CurveFile.fromData(path, info["header"], data)
+
+    def writeSidecar(self, curve: CurveFile, source: typ.Tuple[int, int]):
+        """Writes the sidecar of a parsed curve. A sidecar which cannot
+        be written is skipped.
+        """
+        npyPath, jsonPath = self.sidecarPaths(curve.path)
+        try:
+            os.makedirs(os.path.dirname(npyPath), exist_ok=True)
+            # Write the arrays first, so that the header of a
+            # stale sidecar never matches them
+            with open(f"{npyPath}.tmp", "wb") as fp:
+                np.save(fp, curve.data)
+            os.replace(f"{npyPath}.tmp", npyPath)
+            with open(f"{jsonPath}.tmp", "w", encoding="utf-8") as fp:
+                json.dump({"source": source, "header": curve.header}, fp)
+            os.replace(f"{jsonPath}.tmp", jsonPath)
+        except OSError:
+            pass
+
+    def remember(
+        self, key: str, source: typ.Tuple[int, int], curve: CurveFile
+    ):
+        """Holds a curve in memory, evicting the least recently used
+        curves to stay within the memory budget
+        """
+        nbytes = curve.data.nbytes
+        with self.lock:
+            previous = self.entries.pop(key, None)
+            if previous:
+                self.size -= previous[2]
+            if nbytes > self.memoryBudget:
+                return
+            self.entries[key] = (source, curve, nbytes)
+            self.size += nbytes
+            while self.size > self.memoryBudget:
+                _, (_, _, evicted) = self.entries.popitem(last=False)
+                self.size -= evicted
+
+    def clear(self):
+        """Empties the in-process cache. Sidecars are kept.
+        """
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+
+# Cache shared by everything that reads output curves
+curveCache = CurveCache()
+
+
+def loadCurve(path: str) -> CurveFile:
+    """Returns the parsed curve of an output file, using the
+    shared cache
+
+    Parameters
+    ----------
+    path : str
+        Path to the output file
+
+    Returns
+    -------
+    CurveFile
+        Parsed curve. Its arrays may be read-only.
+    """
+    return curveCache.load(path)
@@ -0,0 +1,166 @@
+import os
+import typing as typ
+import warnings
+
+import numpy as np
+
+from core.exception import ParserException
+
+# Output curves written by gudrun_dcs, as (x, y, error) columns
+CURVE_EXTENSIONS = (".mint01", ".mdcs01", ".mgor01", ".mdor01")
+
+
+class CurveFile:
+    """
+    Class to represent an output curve of gudrun_dcs
+    (files with .mint01, .mdcs01, .mgor01 or .mdor01 extension).
+    The columns are read into contiguous NumPy arrays in one pass.
+
+    ...
+
+    Attributes
+    ----------
+    path : str
+        Path to the file.
+    header : str[]
+        Lines of the '#' header, as read.
+    data : np.ndarray
+        Array of shape (3, n), holding the x, y and error columns.
+    metadata : dict
+        Metadata of the header: the name of the file and, where
+        present, the title, author and time stamp of the run.
+    Methods
+    -------
+    parse():
+        Parses the header and columns of the file.
+    """
+
+    # Position of each metadata field within the header
+    METADATA_LINES = {"name": 0, "title": 1, "author": 4, "stamp": 5}
+
+    def __init__(self, path):
+        """
+        Constructs all the necessary attributes for the CurveFile object.
+        Calls the CurveFile's parse method,
+        to parse the CurveFile from its path.
+
+        Parameters
+        ----------
+        path : str
+            Path to the file.
+        """
+        self.path = path
+        if not path or not os.path.isfile(path):
+            raise ParserException(
+                f"Cannot parse curve from an invalid path: {path}")
+        if os.path.splitext(path)[1] not in CURVE_EXTENSIONS:
+            raise ParserException(
+                f"Attempted to parse {path}, which is not a curve file.")
+        self.header = []
+        self.data = np.empty((3, 0))
+        self.metadata = {}
+        self.parse()
+
+    @property
+    def x(self) -> np.ndarray:
+        return self.data[0]
+
+    @property
+    def y(self) -> np.ndarray:
+        return self.data[1]
+
+    @property
+    def err(self) -> np.ndarray:
+        return self.data[2]
+
+    @property
+    def name(self) -> str:
+        return self.metadata.get("name", "")
+
+    @property
+    def title(self) -> str:
+        return self.metadata.get("title", "")
+
+    def __len__(self):
+        return self.data.shape[1]
+
+    def parse(self):
+        """
+        Parses the CurveFile from its path. The header is read line by
+        line, and the columns are then parsed by NumPy in a single call.
+        Columns beyond the third are ignored.
+        """
+        try:
+            with open(self.path, "r", encoding="utf-8") as fp:
+                position = fp.tell()
+                line = fp.readline()
+                while line.startswith("#"):
+                    self.header.append(line)
+                    position = fp.tell()
+                    line = fp.readline()
+                fp.seek(position)
+                with warnings.catch_warnings():
+                    # A curve with no points is valid
+                    warnings.simplefilter("ignore", UserWarning)
+                    data = np.loadtxt(
+                        fp, comments="#", usecols=(0, 1, 2),
+                        ndmin=2, dtype=np.float64
+                    )
+        except (OSError, ValueError, UnicodeDecodeError) as e:
+            raise ParserException(
+                f"Whilst parsing {self.path}, an exception occured. {e}"
+            ) from e
+        # Transpose so that each column is contiguous
+        self.data = np.ascontiguousarray(data.reshape(-1, 3).T)
+        self.parseHeader()
+
+    def parseHeader(self):
+        """
+        Extracts the metadata of the header.
+        """
+        self.metadata = {}
+        lines = [line[1:].strip() for line in self.header]
+        for key, n in self.METADATA_LINES.items():
+            if n < len(lines) and lines[n]:
+                self.metadata[key] = lines[n]
+
+    @classmethod
+    def fromData(cls, path, header, data):
+        """
+        Constructs a CurveFile from already parsed contents,
+        without reading the file.
+
+        Parameters
+        ----------
+        path : str
+            Path to the file.
+        header : str[]
+            Lines of the header.
+        data : np.ndarray
+            Array of shape (3, n) of the x, y and error columns.
+        """
+        curve = cls.__new__(cls)
+        curve.path = path
+        curve.header = list(header)
+        curve.data = data
+        curve.parseHeader()
+        return curve
+
+
+def readCurve(
+    path: str
+) -> typ.Tuple[list, np.ndarray, np.ndarray, np.ndarray]:
+    """Reads an output curve
+
+    Parameters
+    ----------
+    path : str
+        Path to the output file
+
+    Returns
+    -------
+    tuple[list[str], np.ndarray, np.ndarray, np.ndarray]
+        Header lines, x, y and error columns
+    """
+    curve = CurveFile(path)
+    return curve.header, curve.x, curve.y, curve.err
@@ -1,7 +1,8 @@
 from core import config
+from core.copy_on_write import CopyOnWrite
 
 
-class DataFiles:
+class DataFiles(CopyOnWrite):
     """
     Class to represent a set of data files belonging to an object.
 
@@ -17,6 +18,9 @@ class DataFiles:
     -------
     """
 
+    __slots__ = ("dataFiles", "name")
+    yamlignore = frozenset()
+
     def __init__(self, dataFiles, name):
         """
         Constructs all the necessary attributes for the DataFiles object.
@@ -31,11 +35,6 @@ class DataFiles:
         self.dataFiles = dataFiles
         self.name = name
 
-        self.yamlignore = {
-            "str",
-            "yamlignore"
-        }
-
     def __str__(self):
         """
         Returns the string representation of the DataFiles object.
@@ -49,11 +48,10 @@ class DataFiles:
         string : str
             String representation of DataFiles.
         """
-        self.str = [
+        return """\n""".join(
             df + config.spc10 + self.name + " data files"
             for df in self.dataFiles
-        ]
-        return """\n""".join(self.str)
+        )
 
     def __len__(self):
         """
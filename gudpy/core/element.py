@@ -1,4 +1,7 @@
-class Element:
+from core.copy_on_write import CopyOnWrite
+
+
+class Element(CopyOnWrite):
     """
     Class to represent an Element.
 
@@ -15,6 +18,10 @@ class Element:
     Methods
     -------
     """
+
+    __slots__ = ("atomicSymbol", "massNo", "abundance")
+    yamlignore = frozenset()
+
     def __init__(self, atomicSymbol, massNo, abundance):
         """
         Constructs all the necessary attributes for the DataFiles object.
@@ -33,10 +40,6 @@ class Element:
         self.massNo = int(massNo) if massNo % 1 == 0 else massNo
         self.abundance = abundance
 
-        self.yamlignore = {
-            "yamlignore"
-        }
-
     def __str__(self):
         """
         Returns the string representation of the Element object.
@@ -88,6 +88,12 @@ class Format(Enum):
     YAML = 1
 
 
+class OutputArchive(Enum):
+    NONE = 0
+    ALSO = 1
+    ONLY = 2
+
+
 EXTRAPOLATION_MODES = {
     0: ["BACKWARDS"],
     1: ["FORWARDS"],
@@ -0,0 +1,311 @@
+import os
+import typing as typ
+
+import h5py as h5
+import numpy as np
+
+from core import utils
+from core import data_files
+from core.gudrun_file import GudrunFile
+
+# Number of events read from a dataset at a time
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+
+def iterChunks(dataset: h5.Dataset, chunkSize: int = DEFAULT_CHUNK_SIZE):
+    """Reads a one dimensional dataset in chunks, aligned to the
+    storage chunks of the dataset where it has them.
+
+    Parameters
+    ----------
+    dataset : h5.Dataset
+        Dataset to read
+    chunkSize : int, optional
+        Maximum number of values to read at once,
+        by default DEFAULT_CHUNK_SIZE
+
+    Yields
+    ------
+    np.ndarray
+        Consecutive chunks of the dataset
+    """
+    step = chunkSize
+    if dataset.chunks:
+        step = max(chunkSize // dataset.chunks[0], 1) * dataset.chunks[0]
+    for start in range(0, dataset.shape[0], step):
+        yield dataset[start:start + step]
+
+
+def spectra(fp: h5.File) -> typ.List[str]:
+    """Returns the names of the spectra (one dimensional datasets
+    of event times) in an event file
+    """
+    return [
+        key for key in fp.keys()
+        if isinstance(fp[key], h5.Dataset) and len(fp[key].shape) == 1
+    ]
+
+
+class EventSlicer:
+    """
+    Class to slice an event mode data file into time slices,
+    to allow time-resolved reductions. Events are streamed from the
+    file in chunks, so memory use is bounded by the chunk size
+    rather than the number of events.
+
+    ...
+
+    Attributes
+    ----------
+    path : str
+        Path to the event file
+    edges : np.ndarray
+        Edges of the time slices. Slice i holds the events in
+        [edges[i], edges[i + 1]).
+    chunkSize : int
+        Number of events read at once
+    """
+
+    def __init__(
+        self, path: str, edges, chunkSize: int = DEFAULT_CHUNK_SIZE
+    ):
+        """
+        Raises
+        ------
+        ValueError
+            Raised if fewer than two edges are given, or if they
+            are not increasing
+        """
+        self.path = path
+        self.edges = np.asarray(edges, dtype=float)
+        if self.edges.ndim != 1 or len(self.edges) < 2:
+            raise ValueError("At least two slice edges are required.")
+        if np.any(np.diff(self.edges) <= 0):
+            raise ValueError("Slice edges must be increasing.")
+        self.chunkSize = chunkSize
+
+    @property
+    def nSlices(self) -> int:
+        return len(self.edges) - 1
+
+    def sliceIndices(self, events: np.ndarray) -> np.ndarray:
+        """Returns the slice of each event, or -1 if it is in none
+        """
+        idx = np.searchsorted(self.edges, events, side="right") - 1
+        idx[idx >= self.nSlices] = -1
+        return idx
+
+    def _stream(self, fp: h5.File, progress: typ.Callable[[int], None]):
+        """Yields (spectrum, events) chunks of every spectrum, reporting
+        the percentage of events read.
+        """
+        names = spectra(fp)
+        total = sum(fp[name].shape[0] for name in names)
+        read = 0
+        percent = -1
+        for name in names:
+            for events in iterChunks(fp[name], self.chunkSize):
+                yield name, events
+                read += events.shape[0]
+                if progress and total:
+                    current = int(100 * read / total)
+                    if current != percent:
+                        percent = current
+                        progress(percent)
+
+    def counts(
+        self, progress: typ.Callable[[int], None] = None
+    ) -> typ.Dict[str, np.ndarray]:
+        """Counts the events of each spectrum in each slice
+
+        Parameters
+        ----------
+        progress : Callable[[int], None], optional
+            Called with the percentage of events read, by default None
+
+        Returns
+        -------
+        dict[str, np.ndarray]
+            Number of events in each slice, per spectrum
+        """
+        counts = {}
+        with h5.File(self.path, "r") as fp:
+            for name in spectra(fp):
+                counts[name] = np.zeros(self.nSlices, dtype=np.int64)
+            for name, events in self._stream(fp, progress):
+                idx = self.sliceIndices(events)
+                counts[name] += np.bincount(
+                    idx[idx >= 0], minlength=self.nSlices)
+        return counts
+
+    def slicePaths(self, outputDir: str) -> typ.List[str]:
+        stem, ext = os.path.splitext(os.path.basename(self.path))
+        return [
+            os.path.join(outputDir, f"{stem}_slice{i + 1}{ext}")
+            for i in range(self.nSlices)
+        ]
+
+    def slice(
+        self,
+        outputDir: str,
+        progress: typ.Callable[[int], None] = None
+    ) -> typ.List[str]:
+        """Writes an event file per time slice, with the same spectra
+        as the original, holding only the events within the slice.
+
+        Parameters
+        ----------
+        outputDir : str
+            Directory to write the sliced files to
+        progress : Callable[[int], None], optional
+            Called with the percentage of events read, by default None
+
+        Returns
+        -------
+        list[str]
+            Paths to the sliced files, in order of the slices
+        """
+        utils.makeDir(outputDir)
+        paths = self.slicePaths(outputDir)
+        outputs = [h5.File(path, "w") for path in paths]
+        try:
+            with h5.File(self.path, "r") as fp:
+                names = spectra(fp)
+                for i, output in enumerate(outputs):
+                    output.attrs["start"] = self.edges[i]
+                    output.attrs["end"] = self.edges[i + 1]
+                    for name in names:
+                        output.create_dataset(
+                            name,
+                            shape=(0,),
+                            maxshape=(None,),
+                            dtype=fp[name].dtype,
+                            chunks=True
+                        )
+
+                for name, events in self._stream(fp, progress):
+                    idx = self.sliceIndices(events)
+                    inSlice = idx >= 0
+                    events, idx = events[inSlice], idx[inSlice]
+                    # Group the events of the chunk by slice
+                    order = np.argsort(idx, kind="stable")
+                    events, idx = events[order], idx[order]
+                    bounds = np.searchsorted(idx, np.arange(self.nSlices + 1))
+                    for i, output in enumerate(outputs):
+                        sliced = events[bounds[i]:bounds[i + 1]]
+                        if not sliced.shape[0]:
+                            continue
+                        dataset = output[name]
+                        n = dataset.shape[0]
+                        dataset.resize((n + sliced.shape[0],))
+                        dataset[n:] = sliced
+        finally:
+            for output in outputs:
+                output.close()
+        return paths
+
+
+def uniformEdges(path: str, nSlices: int,
+                 chunkSize: int = DEFAULT_CHUNK_SIZE) -> np.ndarray:
+    """Returns the edges of `nSlices` slices of equal duration, spanning
+    every event in an event file. The file is streamed in chunks.
+
+    Parameters
+    ----------
+    path : str
+        Path to the event file
+    nSlices : int
+        Number of slices
+    chunkSize : int, optional
+        Number of events read at once, by default DEFAULT_CHUNK_SIZE
+
+    Returns
+    -------
+    np.ndarray
+        Edges of the slices
+
+    Raises
+    ------
+    ValueError
+        Raised if the file contains no events
+    """
+    lo, hi = np.inf, -np.inf
+    with h5.File(path, "r") as fp:
+        for name in spectra(fp):
+            for events in iterChunks(fp[name], chunkSize):
+                if events.shape[0]:
+                    lo = min(lo, float(events.min()))
+                    hi = max(hi, float(events.max()))
+    if lo > hi:
+        raise ValueError(f"No events found in {path}")
+    # Extend the last edge so that the final event is included
+    return np.linspace(lo, np.nextafter(hi, np.inf), nSlices + 1)
+
+
+def sliceSample(
+    gudrunFile: GudrunFile,
+    sample,
+    edges,
+    outputDir: str = "",
+    progress: typ.Callable[[int], None] = None,
+    chunkSize: int = DEFAULT_CHUNK_SIZE
+) -> typ.List[GudrunFile]:
+    """Slices the event data files of a sample, and creates an input
+    file per slice, in which the sample uses only that slice. Each
+    input file has its own project directory, so they may be run
+    together with `GudrunPool`.
+
+    Parameters
+    ----------
+    gudrunFile : GudrunFile
+        Input file containing the sample
+    sample : Sample
+        Sample to slice
+    edges : array_like
+        Edges of the time slices
+    outputDir : str, optional
+        Directory to write the sliced files to, by default the
+        "EventSlices" directory within the data file directory
+    progress : Callable[[int], None], optional
+        Called with the overall percentage of events read,
+        by default None
+    chunkSize : int, optional
+        Number of events read at once, by default DEFAULT_CHUNK_SIZE
+
+    Returns
+    -------
+    list[GudrunFile]
+        Input file of each slice
+    """
+    dataFileDir = gudrunFile.instrument.dataFileDir
+    if not outputDir:
+        outputDir = os.path.join(dataFileDir, "EventSlices")
+
+    slicedFiles = []
+    nFiles = len(sample.dataFiles)
+    for n, dataFile in enumerate(sample.dataFiles):
+        slicer = EventSlicer(
+            os.path.join(dataFileDir, dataFile), edges, chunkSize)
+        slicedFiles.append(slicer.slice(
+            outputDir,
+            (lambda p, n=n: progress(int((100 * n + p) / nFiles)))
+            if progress else None
+        ))
+
+    inputs = []
+    for i in range(len(edges) - 1):
+        sliced = gudrunFile.clone()
+        for sampleBackground in sliced.sampleBackgrounds:
+            for s in sampleBackground.samples:
+                if s.name != sample.name:
+                    continue
+                # Data files are relative to the data file directory
+                s.dataFiles = data_files.DataFiles(
+                    [os.path.relpath(paths[i], dataFileDir)
+                     for paths in slicedFiles],
+                    s.name
+                )
+        sliced.projectDir = os.path.join(
+            gudrunFile.projectDir, "EventSlices", f"Slice{i + 1}")
+        inputs.append(sliced)
+    return inputs
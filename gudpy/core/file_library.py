@@ -1,9 +1,11 @@
 import os
-from zipfile import ZipFile, ZIP_DEFLATED
 from pathlib import Path
 
 from core import utils
+from core.curve_cache import CACHE_DIRNAME
 from core.enums import CrossSectionSource
+from core.snapshot import SNAPSHOT_EXT
+from core.zip_export import ExportMember, exportZip
 
 
 class GudPyFileLibrary:
@@ -169,40 +171,112 @@ class GudPyFileLibrary:
         renameDataFiles=False,
         exportTo=None,
         includeParams=False,
+        store=False,
+        progress=None
     ):
+        """
+        Exports the .mint01 output of each sample, and optionally
+        its parameters, into a ZIP archive.
+
+        Parameters
+        ----------
+        samples : Sample[]
+            Samples to export
+        renameDataFiles : bool, optional
+            Whether to name the outputs after their samples
+        exportTo : str, optional
+            Path to the archive, by default named after the project
+        includeParams : bool, optional
+            Whether to include the .sample file of each sample
+        store : bool, optional
+            Whether to store the files without compression
+        progress : Callable[[int, int], None], optional
+            Called with the number of files written and the total
+
+        Returns
+        -------
+        str
+            Path to the archive
+        """
         if not exportTo:
             exportTo = os.path.join(
                 self.gudrunFile.projectDir,
                 Path(self.gudrunFile.path()).stem + ".zip",
             )
-        with ZipFile(exportTo, "w", ZIP_DEFLATED) as zipFile:
-            for sample in samples:
-                if len(sample.dataFiles.dataFiles):
+        members = []
+        for sample in samples:
+            if not len(sample.dataFiles.dataFiles):
+                continue
+            path = os.path.join(
+                self.gudrunFile.projectDir,
+                sample.dataFiles.dataFiles[0].replace(
+                    self.gudrunFile.instrument.dataFileType, "mint01"
+                ),
+            )
+            safeSampleName = utils.replace_unwanted_chars(
+                sample.name).translate(
+                {ord(x): "" for x in r"/\!*~,&|[]"}
+            )
+            if os.path.exists(path):
+                outpath = path
+                if renameDataFiles:
+                    newName = safeSampleName + ".mint01"
+                    outpath = newName
+                members.append(ExportMember(
+                    os.path.basename(outpath), path=path))
+                if includeParams:
                     path = os.path.join(
                         self.gudrunFile.projectDir,
-                        sample.dataFiles.dataFiles[0].replace(
-                            self.gudrunFile.instrument.dataFileType, "mint01"
-                        ),
+                        safeSampleName + ".sample",
                     )
-                safeSampleName = utils.replace_unwanted_chars(
-                    sample.name).translate(
-                    {ord(x): "" for x in r"/\!*~,&|[]"}
-                )
-                if os.path.exists(path):
-                    outpath = path
-                    if renameDataFiles:
-                        newName = safeSampleName + ".mint01"
-                        outpath = newName
-                    zipFile.write(path, arcname=os.path.basename(outpath))
-                    if includeParams:
-                        path = os.path.join(
-                            self.gudrunFile.projectDir,
-                            safeSampleName + ".sample",
+                    if not os.path.exists(path):
+                        sample.write_out(
+                            self.gudrunFile.projectDir
                         )
-                        if not os.path.exists(path):
-                            sample.write_out(
-                                self.gudrunFile.projectDir
-                            )
-                        zipFile.write(path, arcname=os.path.basename(path))
+                    members.append(ExportMember(
+                        os.path.basename(path), path=path))
+
+        return exportZip(members, exportTo, store=store, progress=progress)
+
+    def exportProject(self, exportTo=None, store=False, progress=None):
+        """
+        Exports the whole project directory into a ZIP archive: its
+        input files, and the Purge and Gudrun outputs. Caches and
+        snapshots, which are rebuilt on demand, are left out.
+
+        Parameters
+        ----------
+        exportTo : str, optional
+            Path to the archive, by default named after the project
+            and placed next to it
+        store : bool, optional
+            Whether to store the files without compression
+        progress : Callable[[int, int], None], optional
+            Called with the number of files written and the total
+
+        Returns
+        -------
+        str
+            Path to the archive
+        """
+        projectDir = os.path.normpath(self.gudrunFile.projectDir)
+        if not exportTo:
+            exportTo = projectDir + ".zip"
+        exportTo = os.path.abspath(exportTo)
+        projectName = os.path.basename(projectDir)
+
+        members = []
+        for root, dirs, files in os.walk(projectDir):
+            dirs[:] = sorted(d for d in dirs if d != CACHE_DIRNAME)
+            for f in sorted(files):
+                path = os.path.join(root, f)
+                if (
+                    f.endswith((SNAPSHOT_EXT, ".tmp"))
+                    or os.path.abspath(path) == exportTo
+                ):
+                    continue
+                arcname = os.path.join(
+                    projectName, os.path.relpath(path, projectDir))
+                members.append(ExportMember(arcname, path=path))
 
-            return zipFile.filename
+        return exportZip(members, exportTo, store=store, progress=progress)
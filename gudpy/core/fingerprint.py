@@ -0,0 +1,290 @@
+import enum
+import functools
+import hashlib
+import os
+
+from core import config
+from core import utils
+from core.copy_on_write import CopyOnWrite, fields
+from core.enums import CrossSectionSource
+from core.output_file_handler import readManifest
+
+# Fields which do not affect the outputs of gudrun_dcs
+IGNORE = frozenset({"GudrunInputFileDir", "output", "stream"})
+# Fields of a sample background which belong to its samples
+BACKGROUND_IGNORE = IGNORE | {"samples", "writeAllSamples"}
+
+
+def canonical(value, ignore=IGNORE):
+    """Returns a value built only of tuples and plain values,
+    whose representation identifies a model object's fields
+    """
+    if isinstance(value, CopyOnWrite):
+        return (type(value).__name__,) + tuple(
+            (name, canonical(field))
+            for name, field in fields(value).items()
+            if name not in ignore
+        )
+    if isinstance(value, (list, tuple)):
+        return tuple(canonical(item) for item in value)
+    if isinstance(value, dict):
+        return tuple(sorted(
+            (repr(key), canonical(item)) for key, item in value.items()
+        ))
+    if isinstance(value, enum.Enum):
+        return (type(value).__name__, value.name)
+    return value
+
+
+def _dataFileStats(dataFileDir: str, dataFiles) -> tuple:
+    """Returns the size and modification time of each data file,
+    or None for those which cannot be read
+    """
+    stats = []
+    for dataFile in dataFiles:
+        try:
+            stat = os.stat(os.path.join(dataFileDir, dataFile))
+            stats.append((dataFile, stat.st_size, stat.st_mtime_ns))
+        except OSError:
+            stats.append((dataFile, None))
+    return tuple(stats)
+
+
+@functools.lru_cache(maxsize=256)
+def _contentDigest(path: str, size: int, mtime: int) -> str:
+    """Returns a digest of the contents of a file. The size and
+    modification time are part of the key, so edited files are
+    read again.
+    """
+    digest = hashlib.sha1()
+    with open(path, "rb") as fp:
+        for chunk in iter(lambda: fp.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _fileContents(startFolder: str, paths) -> tuple:
+    """Returns a digest of the contents of each input file, or None for
+    those which cannot be read. Relative paths are resolved against
+    the folder gudrun_dcs is started from, as gudrun_dcs does.
+    """
+    contents = []
+    for path in paths:
+        if not path:
+            continue
+        resolved = path if os.path.isabs(path) else os.path.join(
+            startFolder, path)
+        try:
+            stat = os.stat(resolved)
+            contents.append((path, _contentDigest(
+                resolved, stat.st_size, stat.st_mtime_ns)))
+        except OSError:
+            contents.append((path, None))
+    return tuple(contents)
+
+
+def _crossSectionFile(obj) -> list:
+    if obj.totalCrossSectionSource == CrossSectionSource.FILE:
+        return [obj.crossSectionFilename]
+    return []
+
+
+def _inputFiles(gudrunFile) -> list:
+    """Returns the files, other than data files, which gudrun_dcs reads
+    for every sample
+    """
+    instrument = gudrunFile.instrument
+    normalisation = gudrunFile.normalisation
+    files = [
+        instrument.detectorCalibrationFileName,
+        instrument.groupFileName,
+        instrument.deadtimeConstantsFileName,
+        instrument.neutronScatteringParametersFile,
+        gudrunFile.beam.filenameIncidentBeamSpectrumParams,
+        normalisation.normalisationDifferentialCrossSectionFile,
+        *_crossSectionFile(normalisation)
+    ]
+    if instrument.dataFileType.lower() == "nxs":
+        files.append(instrument.nxsDefinitionFile)
+    return files
+
+
+def _sampleInputFiles(sample) -> list:
+    """Returns the files, other than data files, which gudrun_dcs reads
+    for a sample and its containers
+    """
+    files = _crossSectionFile(sample)
+    for container in sample.containers:
+        files.extend(_crossSectionFile(container))
+    return files
+
+
+def _update(digest, value):
+    digest.update(repr(value).encode("utf-8"))
+
+
+def _backgroundDigests(gudrunFile, purgeFiles):
+    """Yields each sample background with a digest of the inputs
+    shared by its samples
+    """
+    dataFileDir = gudrunFile.instrument.dataFileDir
+    normalisation = gudrunFile.normalisation
+    shared = hashlib.sha1()
+    _update(shared, (
+        config.geometry.name,
+        canonical(gudrunFile.instrument),
+        canonical(gudrunFile.beam),
+        canonical(normalisation),
+        _dataFileStats(
+            dataFileDir,
+            list(normalisation.dataFiles) + list(normalisation.dataFilesBg)
+        ),
+        _fileContents(
+            gudrunFile.instrument.GudrunStartFolder,
+            _inputFiles(gudrunFile)
+        ),
+        # Purge outputs are copied beside the input file by name
+        tuple(
+            (os.path.basename(path), content)
+            for path, content in _fileContents("", sorted(purgeFiles))
+        )
+    ))
+    for sampleBackground in gudrunFile.sampleBackgrounds:
+        background = shared.copy()
+        _update(background, (
+            canonical(sampleBackground, BACKGROUND_IGNORE),
+            _dataFileStats(dataFileDir, sampleBackground.dataFiles)
+        ))
+        yield sampleBackground, background
+
+
+def _runSamples(sampleBackground):
+    return [
+        sample for sample in sampleBackground.samples
+        if sample.runThisSample and len(sample.dataFiles)
+    ]
+
+
+def _containerDataFiles(sample) -> list:
+    return [
+        dataFile
+        for container in sample.containers
+        for dataFile in container.dataFiles
+    ]
+
+
+def sampleFingerprints(gudrunFile, purgeFiles=()) -> dict:
+    """Returns a fingerprint of the inputs of each sample gudrun_dcs
+    will process: the sample and its containers, the instrument, beam,
+    normalisation and sample background it is reduced with, the
+    size and modification time of their data files, and the contents
+    of the other files gudrun_dcs reads, such as the detector
+    calibration and the outputs of purge_det. Samples whose name
+    is shared with another sample are left out.
+
+    Parameters
+    ----------
+    gudrunFile : GudrunFile
+        GudrunFile to fingerprint the samples of
+    purgeFiles : str[], optional
+        Paths to the outputs of purge_det the run uses
+
+    Returns
+    -------
+    Dict[str, str]
+        Sample names mapped to the fingerprints of their inputs
+    """
+    dataFileDir = gudrunFile.instrument.dataFileDir
+    fingerprints = {}
+    duplicates = set()
+    startFolder = gudrunFile.instrument.GudrunStartFolder
+    for sampleBackground, background in _backgroundDigests(
+        gudrunFile, purgeFiles
+    ):
+        for sample in _runSamples(sampleBackground):
+            if sample.name in fingerprints:
+                duplicates.add(sample.name)
+            dataFiles = list(sample.dataFiles) + _containerDataFiles(sample)
+            digest = background.copy()
+            _update(digest, (
+                canonical(sample), _dataFileStats(dataFileDir, dataFiles),
+                _fileContents(startFolder, _sampleInputFiles(sample))
+            ))
+            fingerprints[sample.name] = digest.hexdigest()
+
+    for name in duplicates:
+        del fingerprints[name]
+    return fingerprints
+
+
+def dataFileFingerprints(gudrunFile, purgeFiles=()) -> dict:
+    """Returns a fingerprint of the inputs of each data file of each
+    sample, as reduced on its own by `RunModes.partition`. The
+    fingerprint is that of the sample, with only that data file.
+    Data files whose sample shares its name with another are left out.
+
+    Parameters
+    ----------
+    gudrunFile : GudrunFile
+        GudrunFile to fingerprint the data files of
+    purgeFiles : str[], optional
+        Paths to the outputs of purge_det the run uses
+
+    Returns
+    -------
+    Dict[tuple[str, str], str]
+        (sample name, data file) pairs mapped to the fingerprints
+        of their inputs
+    """
+    dataFileDir = gudrunFile.instrument.dataFileDir
+    fingerprints = {}
+    duplicates = set()
+    startFolder = gudrunFile.instrument.GudrunStartFolder
+    for sampleBackground, background in _backgroundDigests(
+        gudrunFile, purgeFiles
+    ):
+        for sample in _runSamples(sampleBackground):
+            shared = background.copy()
+            _update(shared, (
+                canonical(sample, IGNORE | {"name", "dataFiles"}),
+                _dataFileStats(dataFileDir, _containerDataFiles(sample)),
+                _fileContents(startFolder, _sampleInputFiles(sample))
+            ))
+            for dataFile in sample.dataFiles:
+                key = (sample.name, dataFile)
+                if key in fingerprints:
+                    duplicates.add(key)
+                digest = shared.copy()
+                _update(digest, _dataFileStats(dataFileDir, [dataFile]))
+                fingerprints[key] = digest.hexdigest()
+
+    for key in duplicates:
+        del fingerprints[key]
+    return fingerprints
+
+
+def unchangedOutputs(fingerprints: dict, outputDir: str) -> dict:
+    """Returns the outputs recorded in an output directory which are
+    still valid, those of samples whose inputs are unchanged since they
+    were written, and whose output directories are still in place.
+
+    Parameters
+    ----------
+    fingerprints : Dict[str, str]
+        Fingerprints of the samples to be run, from `sampleFingerprints`
+    outputDir : str
+        Directory the outputs of the run will be organised into
+
+    Returns
+    -------
+    Dict[str, SampleOutput]
+        Sample names mapped to their recorded outputs
+    """
+    manifest = readManifest(outputDir)
+    return {
+        name: manifest[name][1]
+        for name, fingerprint in fingerprints.items()
+        if name in manifest and manifest[name][0] == fingerprint
+        and os.path.isdir(os.path.join(
+            outputDir, utils.replace_unwanted_chars(name)))
+    }
@@ -1,7 +1,10 @@
 from core.exception import ParserException
+from core.token_stream import TokenStream
 
 import os
 import re
+import typing as typ
+from concurrent.futures import ProcessPoolExecutor
 from decimal import Decimal, getcontext
 getcontext().prec = 5
 
@@ -80,7 +83,7 @@ class GudFile:
         Writes out the string representation of the GudFile to a file.
     """
 
-    def __init__(self, path):
+    def __init__(self, path, lines=None):
         """
         Constructs all the necessary attributes for the GudFile object.
         Calls the GudFiles parse method, to parse the GudFile from its path.
@@ -89,6 +92,9 @@ class GudFile:
         ----------
         path : str
             Path to the file.
+        lines : str[], optional
+            Contents of the file, if already read. The file is then
+            not required to exist.
         """
 
         # Handle edge cases - invalid extensions and paths.
@@ -99,7 +105,7 @@ class GudFile:
             raise ParserException(f"Attempted to parse {path}" +
                                   "\nOnly .gud files can be parsed.")
 
-        if not os.path.isfile(path):
+        if lines is None and not os.path.isfile(path):
             raise ParserException(f"{path} is not a valid path.")
 
         self.path = path
@@ -125,16 +131,15 @@ class GudFile:
         self.err = ""
         self.result = ""
         self.suggestedTweakFactor = 0.0
-        self.stream = []
+        self.stream = None
         self.output = ""
 
         # Parse the GudFile
-        self.parse()
+        self.parse(lines)
 
     def getNextLine(self, ignoreEmpty=False):
         """
-        Pops the next 'line' from the stream and returns it.
-        Essentially removes the first line in the stream and returns it.
+        Consumes the next 'line' from the stream and returns it.
 
         Parameters
         ----------
@@ -144,13 +149,11 @@ class GudFile:
         -------
         str | None
         """
-        if ignoreEmpty and self.stream:
-            line = self.stream.pop(0)
-            while line.isspace():
-                line = self.stream.pop(0)
-            return line
-        else:
-            return self.stream.pop(0) if self.stream else None
+        line = self.stream.next()
+        if ignoreEmpty:
+            while line is not None and line.isspace():
+                line = self.stream.next()
+        return line
 
     def peekNextLine(self):
         """
@@ -163,7 +166,7 @@ class GudFile:
         -------
         str | None
         """
-        return self.stream[0] if self.stream else None
+        return self.stream.peek()
 
     def consumeLines(self, n):
         """
@@ -180,63 +183,60 @@ class GudFile:
         for _ in range(n):
             self.getNextLine()
 
-    def parse(self):
+    def getNextValue(self, ignoreEmpty=False, n=-1, type_=float):
+        """
+        Consumes the next line and returns its nth word,
+        converted to the given type.
+
+        Parameters
+        ----------
+        ignoreEmpty : bool, default=False
+            Should empty lines be ignored?
+        n : int, default=-1
+            Index of the word to return
+        type_ : type, default=float
+            Type to convert the word to
+        Returns
+        -------
+        type_
+        """
+        return type_(self.getNextLine(ignoreEmpty).split()[n])
+
+    def parse(self, lines=None):
         """
         Parses the GudFile from its path, assigning extracted variables to
-        their corresponding attributes.
+        their corresponding attributes. The file is read once, and its
+        lines are consumed through a cursor.
 
         Parameters
         ----------
-        None
+        lines : str[], optional
+            Contents of the file, if already read
         Returns
         -------
         None
         """
 
         # Read the contents into an auxilliary variable.
-        with open(self.path) as f:
-            self.stream = f.readlines()
-            f.close()
-
-        # Simple cases, we can just extract the stripped lines.
+        if lines is None:
+            with open(self.path) as f:
+                lines = f.readlines()
+        self.stream = TokenStream(lines)
 
         try:
-
+            # Simple cases, we can just extract the stripped lines.
             self.name = self.getNextLine().strip()
-
             self.title = self.getNextLine(True).strip()
-
             self.author = self.getNextLine(True).strip()
-
             self.stamp = self.getNextLine(True).strip()
 
-            self.atomicDensity = float(
-                self.getNextLine(True).split()[-1].strip()
-            )
-
-            self.chemicalDensity = float(
-                self.getNextLine().split()[-1].strip()
-            )
-
-            self.averageScatteringLength = float(
-                self.getNextLine().split()[-1].strip()
-            )
-
-            self.averageScatteringLengthSquared = float(
-                self.getNextLine().split()[-1].strip()
-            )
-
-            self.averageSquareOfScatteringLength = float(
-                self.getNextLine().split()[-1].strip()
-            )
-
-            self.coherentRatio = float(
-                self.getNextLine().split()[-1].strip()
-            )
-
-            self.expectedDCS = float(
-                self.getNextLine(True).split()[-1].strip()
-            )
+            self.atomicDensity = self.getNextValue(True)
+            self.chemicalDensity = self.getNextValue()
+            self.averageScatteringLength = self.getNextValue()
+            self.averageScatteringLengthSquared = self.getNextValue()
+            self.averageSquareOfScatteringLength = self.getNextValue()
+            self.coherentRatio = self.getNextValue()
+            self.expectedDCS = self.getNextValue(True)
 
             self.consumeLines(3)
 
@@ -246,16 +246,10 @@ class GudFile:
 
             self.groupsTable = "".join(self.groups)
 
-            self.noGroups = int(
-                self.getNextLine(True).split()[-1].strip()
-            )
-
-            self.averageLevelMergedDCS = float(
-                self.getNextLine(True).split()[-2].strip()
-            )
-
+            self.noGroups = self.getNextValue(True, type_=int)
+            self.averageLevelMergedDCS = self.getNextValue(True, n=-2)
             self.gradient = float(
-                self.getNextLine(True).split()[-4].strip().replace("%", '')
+                self.getNextLine(True).split()[-4].replace("%", '')
             )
 
             token = self.getNextLine(True)
@@ -284,9 +278,7 @@ class GudFile:
                     self.output = "0%"
             # Collect the suggested tweak factor
             # from the end of the final line.
-            self.suggestedTweakFactor = self.getNextLine(
-                True
-            ).split()[-1].strip()
+            self.suggestedTweakFactor = self.getNextValue(True, type_=str)
 
         except Exception as e:
             raise ParserException(
@@ -295,6 +287,9 @@ class GudFile:
                 " were yielded. "
                 f"{str(e)}"
             ) from e
+        finally:
+            # Release the lines once parsed.
+            self.stream = None
 
     def __str__(self):
         """
@@ -369,3 +364,53 @@ class GudFile:
         f = open(path, "w", encoding="utf-8")
         f.write(str(self))
         f.close()
+
+
+# Exceptions raised by a .gud file which fails to parse or cannot be read
+PARSE_ERRORS = (ParserException, OSError, ValueError)
+
+
+def parseGudFiles(
+    paths: typ.List[str], maxWorkers: int = None
+) -> typ.Tuple[typ.Dict[str, GudFile], typ.Dict[str, Exception]]:
+    """
+    Parses several .gud files in parallel, in separate processes, as
+    parsing is CPU-bound. A file which fails to parse, or cannot be
+    read, does not prevent the others from being parsed.
+
+    Parameters
+    ----------
+    paths : str[]
+        Paths to the .gud files.
+    maxWorkers : int, optional
+        Maximum number of processes, by default the number of
+        CPUs. A single file, or a single worker, is parsed in
+        this process.
+    Returns
+    -------
+    gudFiles : Dict[str, GudFile]
+        Parsed GudFiles, keyed by path.
+    errors : Dict[str, Exception]
+        Exceptions raised by the files which failed to parse or could
+        not be read, keyed by path. These are ParserException,
+        OSError or ValueError.
+    """
+    gudFiles = {}
+    errors = {}
+    paths = list(dict.fromkeys(paths))
+    nWorkers = min(len(paths), maxWorkers or os.cpu_count() or 1)
+    if nWorkers <= 1:
+        for path in paths:
+            try:
+                gudFiles[path] = GudFile(path)
+            except PARSE_ERRORS as e:
+                errors[path] = e
+        return gudFiles, errors
+    with ProcessPoolExecutor(max_workers=nWorkers) as executor:
+        futures = {path: executor.submit(GudFile, path) for path in paths}
+    for path, future in futures.items():
+        try:
+            gudFiles[path] = future.result()
+        except PARSE_ERRORS as e:
+            errors[path] = e
+    return gudFiles, errors
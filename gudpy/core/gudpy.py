@@ -4,7 +4,9 @@ import sys
 import subprocess
 import shutil
 import copy
+import time
 import typing as typ
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 
 import gudpy_cli as cli
 from core import utils
@@ -16,14 +18,29 @@ from core.purge_file import PurgeFile
 import core.output_file_handler as handlers
 from core.file_library import GudPyFileLibrary
 from core import data_files
+from core import sliding_window
+from core import run_planner
+from core import scheduler
+from core import nexus_index
+from core import fingerprint
 
 SUFFIX = ".exe" if os.name == "nt" else ""
 
 
 class GudPy:
     def __init__(
-        self
+        self,
+        runHistory: run_planner.RunHistory = None
     ):
+        """
+        Initialise `GudPy`
+
+        Parameters
+        ----------
+        runHistory : run_planner.RunHistory, optional
+            History runs are recorded to and estimated from,
+            by default none is kept
+        """
         self.originalGudrunFile: GudrunFile = None
         self.gudrunFile: GudrunFile = None
         self.purgeFile = None
@@ -33,8 +50,11 @@ class GudPy:
         self.runModes: RunModes = None
         self.gudrunIterator: GudrunIterator = None
         self.batchProcessor: BatchProcessing = None
+        self.runHistory = runHistory or run_planner.RunHistory()
 
         self.gudrunOutput = None
+        # Whether runs also, or only, write their outputs to an archive
+        self.outputArchive = enums.OutputArchive.NONE
 
         self.projectDir = ""
         self.autosaveLocation = ""
@@ -43,7 +63,8 @@ class GudPy:
         self,
         loadFile: str,
         format: enums.Format,
-        config: bool = False
+        config: bool = False,
+        snapshot: bool = False
     ):
         """Loads GudPy from an input file
 
@@ -55,6 +76,9 @@ class GudPy:
             Format of the input file (YAML or TXT)
         config : bool, optional
             If loading from preset config, by default False
+        snapshot : bool, optional
+            If a valid binary snapshot of a YAML input file should be
+            loaded in place of it, by default False
 
         Raises
         ------
@@ -67,22 +91,27 @@ class GudPy:
         self.gudrunFile = GudrunFile(
             loadFile=loadFile,
             format=format,
-            config=config
+            config=config,
+            snapshot=snapshot
         )
 
-        self.originalGudrunFile = copy.deepcopy(self.gudrunFile)
+        self.originalGudrunFile = self.gudrunFile.clone()
         self.originalGudrunFile.filename = "original"
 
         self.projectDir == ""
         self.autosaveLocation = ""
 
-    def loadFromProject(self, projectDir: str):
+    def loadFromProject(self, projectDir: str, snapshot: bool = False):
         """Loads GudPy from a project directory
 
         Parameters
         ----------
         projectDir : str
             Path to GudPy project folder
+        snapshot : bool, optional
+            If the binary snapshot of the input file should be loaded,
+            when it is up to date with the YAML and was written by this
+            user, by default False
 
         Raises
         ------
@@ -111,7 +140,8 @@ class GudPy:
             raise FileNotFoundError(
                 "Could not find GudPy input file within the project")
 
-        self.loadFromFile(loadFile=loadFile, format=enums.Format.YAML)
+        self.loadFromFile(
+            loadFile=loadFile, format=enums.Format.YAML, snapshot=snapshot)
         self.setSaveLocation(projectDir)
 
     def checkSaveLocation(self):
@@ -140,7 +170,12 @@ class GudPy:
             f"{os.path.basename(projectDir)}.autosave"
         )
 
-    def save(self, path: str = "", format: enums.Format = enums.Format.YAML):
+    def save(
+        self,
+        path: str = "",
+        format: enums.Format = enums.Format.YAML,
+        snapshot: bool = False
+    ):
         """Saves current GudPy input file
 
         Parameters
@@ -149,11 +184,14 @@ class GudPy:
             Path to desired save location, by default ""
         format : enums.Format, optional
             Desired format of save file, by default enums.Format.YAML
+        snapshot : bool, optional
+            If a binary snapshot should be written next to a YAML
+            input file, for faster loading, by default False
         """
         if not path:
             path = self.gudrunFile.path()
         self.originalGudrunFile.save(path=path)
-        self.gudrunFile.save(path=path, format=format)
+        self.gudrunFile.save(path=path, format=format, snapshot=snapshot)
 
     def saveAs(self, targetDir: str):
         """Save GudPy project to a new location, set current
@@ -240,13 +278,19 @@ class GudPy:
                 f"{self.purge.error}"
             )
 
-    def runGudrun(self, gudrunFile: GudrunFile = None):
+    def runGudrun(
+        self, gudrunFile: GudrunFile = None, incremental: bool = False
+    ):
         """Runs gudrun_dcs binary
 
         Parameters
         ----------
         gudrunFile : GudrunFile, optional
             GudrunFile object to input to gudrun_dcs, by default None
+        incremental : bool, optional
+            Whether to only run the samples whose inputs changed since
+            the previous run, carrying over the outputs of the others,
+            by default False
 
         Raises
         ------
@@ -257,8 +301,12 @@ class GudPy:
 
         if not gudrunFile:
             gudrunFile = self.gudrunFile
-        self.gudrun = Gudrun()
-        exitcode = self.gudrun.gudrun(gudrunFile=gudrunFile)
+        self.gudrun = Gudrun(
+            outputArchive=self.outputArchive, history=self.runHistory)
+        exitcode = self.gudrun.gudrun(
+            gudrunFile=gudrunFile,
+            incremental=incremental
+        )
         if exitcode:
             raise exc.GudrunException(
                 "Gudrun failed to run with the following output:\n"
@@ -335,7 +383,8 @@ class GudPy:
         stepSize=1,
         offset: int = 0,
         rtol=0.0,
-        separateFirstBatch=False
+        separateFirstBatch=False,
+        slidingWindow=False
     ):
         """Run gudrun_dcs using batch processing
 
@@ -354,12 +403,45 @@ class GudPy:
         separateFirstBatch : bool, optional
             Whether or not to separate the first batch,
             by default False
+        slidingWindow : bool, optional
+            Whether to reduce each data file once and form each
+            (overlapping) batch from the per-file results,
+            by default False
 
         Raises
         ------
         exc.GudrunException
             Raised if gudrun_dcs failed to execute
         """
+        if slidingWindow:
+            if iterator:
+                raise ValueError(
+                    "Sliding window batch processing does not support"
+                    " iterators.")
+            self.prepareRun()
+            # Keep previously reduced data files if the batches
+            # are resized.
+            cache = (
+                self.batchProcessor.fileOutputs
+                if isinstance(
+                    self.batchProcessor, SlidingWindowBatchProcessing)
+                else {}
+            )
+            self.batchProcessor = SlidingWindowBatchProcessing(
+                gudrunFile=self.gudrunFile,
+                batchSize=batchSize,
+                stepSize=stepSize,
+                offset=offset,
+                fileOutputs=cache
+            )
+            exitcode, error = self.batchProcessor.process(purge=self.purge)
+            if exitcode:
+                raise exc.GudrunException(
+                    "Batch Processing failed with the following output:\n"
+                    f"{error}"
+                )
+            return
+
         self.batchProcessor = BatchProcessing(
             gudrunFile=self.gudrunFile,
             iterator=iterator,
@@ -374,6 +456,120 @@ class GudPy:
         except exc.GudrunException as e:
             raise e
 
+    def runGudrunPool(
+        self, gudrunFiles: typ.List[GudrunFile], nWorkers: int = None
+    ) -> typ.List[handlers.GudrunOutput]:
+        """Runs gudrun_dcs on several input files concurrently,
+        starting the longest jobs first
+
+        Parameters
+        ----------
+        gudrunFiles : list[GudrunFile]
+            Input files to run, each with its own project directory
+        nWorkers : int, optional
+            Number of concurrent jobs, by default the number of CPUs
+
+        Returns
+        -------
+        list[handlers.GudrunOutput]
+            Output of each job, in the order given
+
+        Raises
+        ------
+        exc.GudrunException
+            Raised if gudrun_dcs failed to execute for any job
+        """
+        self.prepareRun()
+        pool = GudrunPool(nWorkers, history=self.runHistory)
+        results = pool.run(gudrunFiles, purge=self.purge)
+        errors = [
+            f"{gudrunFile.projectDir}:\n{error}"
+            for gudrunFile, (exitcode, error) in zip(gudrunFiles, results)
+            if exitcode
+        ]
+        if errors:
+            raise exc.GudrunException(
+                "Gudrun failed to run with the following output:\n"
+                + "\n".join(errors)
+            )
+        return [gudrun.gudrunOutput for gudrun in pool.gudrunObjects]
+
+    def planGudrun(
+        self, iterator: iterators.Iterator = None
+    ) -> run_planner.RunPlan:
+        """Plans the runs of gudrun_dcs made by `runGudrun`,
+        or by `iterateGudrun` if an iterator is given
+
+        Parameters
+        ----------
+        iterator : iterators.Iterator, optional
+            Iterator to apply, by default None
+
+        Returns
+        -------
+        run_planner.RunPlan
+            Number of runs, with the estimated wall time and disk usage
+        """
+        return self.runHistory.estimate(
+            run_planner.planGudrun(self.gudrunFile, iterator))
+
+    def planComposition(
+        self, iterator: iterators.Composition
+    ) -> run_planner.RunPlan:
+        """Plans the runs of gudrun_dcs made by `iterateComposition`
+
+        Parameters
+        ----------
+        iterator : iterators.Composition
+            Composition iterator to use
+
+        Returns
+        -------
+        run_planner.RunPlan
+            Maximum number of runs, with the estimated wall time
+            and disk usage
+        """
+        return self.runHistory.estimate(
+            run_planner.planComposition(self.gudrunFile, iterator))
+
+    def planBatchProcessing(
+        self,
+        iterator: iterators.Iterator = None,
+        batchSize=1,
+        stepSize=1,
+        offset: int = 0,
+        rtol=0.0,
+        separateFirstBatch=False,
+        slidingWindow=False
+    ) -> run_planner.RunPlan:
+        """Plans the runs of gudrun_dcs made by `batchProcessing`.
+        Parameters are as in `batchProcessing`.
+
+        Returns
+        -------
+        run_planner.RunPlan
+            Number of runs, with the estimated wall time and disk usage
+        """
+        fileOutputs = (
+            self.batchProcessor.fileOutputs
+            if isinstance(self.batchProcessor, SlidingWindowBatchProcessing)
+            else None
+        )
+        return self.runHistory.estimate(
+            run_planner.planBatchProcessing(
+                self.gudrunFile,
+                iterator=iterator,
+                batchSize=batchSize,
+                stepSize=stepSize,
+                offset=offset,
+                rtol=rtol,
+                separateFirstBatch=separateFirstBatch,
+                slidingWindow=slidingWindow,
+                fileOutputs=fileOutputs,
+                purgeFiles=self.purge.outputFiles() if self.purge else []
+            )
+        )
+
 
 class Process:
     def __init__(self, process: str):
@@ -434,6 +630,17 @@ class Purge(Process):
         )
         return outputHandler.organiseOutput()
 
+    def outputFiles(self) -> typ.List[str]:
+        """Returns the paths to the outputs of the last run of purge_det,
+        which are passed on to gudrun_dcs
+        """
+        if not self.purgeLocation:
+            return []
+        return sorted(
+            os.path.join(self.purgeLocation, f)
+            for f in os.listdir(self.purgeLocation)
+        )
+
     def purge(self, purgeFile: PurgeFile):
         self.checkBinary()
         with tempfile.TemporaryDirectory() as tmp:
@@ -467,20 +674,32 @@ class Purge(Process):
 
 
 class Gudrun(Process):
-    def __init__(self):
+    def __init__(
+        self,
+        outputArchive: enums.OutputArchive = enums.OutputArchive.NONE,
+        history: run_planner.RunHistory = None
+    ):
         self.PROCESS: str = "gudrun_dcs"
         super().__init__(self.PROCESS)
+        # History the run is recorded to, if any
+        self.history = history or run_planner.RunHistory()
+        self.duration = 0.0
+        self.outputArchive = outputArchive
 
     def organiseOutput(
         self,
         gudrunFile: GudrunFile,
         exclude: list[str] = [],
         head: str = "",
-        overwrite: bool = True
+        overwrite: bool = True,
+        carried: typ.Dict[str, handlers.SampleOutput] = None,
+        fingerprints: typ.Dict[str, str] = None
     ) -> handlers.GudrunOutput:
 
         outputHandler = handlers.GudrunOutputHandler(
-            gudrunFile=gudrunFile, head=head, overwrite=overwrite
+            gudrunFile=gudrunFile, head=head, overwrite=overwrite,
+            archive=self.outputArchive, carried=carried,
+            fingerprints=fingerprints
         )
         gudrunOutput = outputHandler.organiseOutput(exclude=exclude)
         return gudrunOutput
@@ -490,27 +709,63 @@ class Gudrun(Process):
         gudrunFile: GudrunFile,
         purge: Purge = None,
         iterator: iterators.Iterator = None,
-        save: bool = True
+        save: bool = True,
+        incremental: bool = False
     ) -> int:
+        """Runs gudrun_dcs on a GudrunFile and organises its outputs
+
+        Parameters
+        ----------
+        gudrunFile : GudrunFile
+            GudrunFile to run
+        purge : Purge, optional
+            Purge whose outputs are used, by default None
+        iterator : iterators.Iterator, optional
+            Iterator organising the outputs, by default None
+        save : bool, optional
+            Whether to save the GudrunFile to the project, by default True
+        incremental : bool, optional
+            Whether to carry over the outputs of samples whose inputs
+            are unchanged since they were written to the project's
+            output directory, instead of running them again,
+            by default False
+
+        Returns
+        -------
+        int
+            Exit code of gudrun_dcs
+        """
         self.checkBinary()
         if not purge:
             cli.echoWarning("Gudrun running without purge")
+        fingerprints = fingerprint.sampleFingerprints(
+            gudrunFile, purge.outputFiles() if purge else [])
+        carried = {}
+        if incremental and not iterator:
+            carried = fingerprint.unchangedOutputs(
+                fingerprints, os.path.join(gudrunFile.projectDir, "Gudrun")
+            )
+        runFile = gudrunFile
+        if carried:
+            runFile = gudrunFile.clone()
+            for sample in run_planner.runSamples(runFile):
+                if sample.name in carried:
+                    sample.runThisSample = False
         with tempfile.TemporaryDirectory() as tmp:
             purgeFiles = []
             if purge:
-                for f in os.listdir(purge.purgeLocation):
-                    shutil.copyfile(
-                        os.path.join(purge.purgeLocation, f),
-                        os.path.join(tmp, f)
-                    )
-                    purgeFiles.append(os.path.join(tmp, f))
+                for f in purge.outputFiles():
+                    target = os.path.join(tmp, os.path.basename(f))
+                    shutil.copyfile(f, target)
+                    purgeFiles.append(target)
 
-            gudrunFile.setGudrunDir(tmp)
+            runFile.setGudrunDir(tmp)
             path = os.path.join(
                 tmp,
-                gudrunFile.OUTPATH
+                runFile.OUTPATH
             )
-            gudrunFile.write_out(path)
+            runFile.write_out(path)
+            start = time.perf_counter()
             with subprocess.Popen(
                 [self.BINARY_PATH, path], cwd=tmp,
                 stdout=subprocess.PIPE,
@@ -531,7 +786,8 @@ class Gudrun(Process):
                     gudrunFile, exclude=purgeFiles)
             else:
                 self.gudrunOutput = self.organiseOutput(
-                    gudrunFile, exclude=purgeFiles)
+                    runFile, exclude=purgeFiles, carried=carried,
+                    fingerprints=fingerprints)
             if save:
                 gudrunFile.save(
                     path=os.path.join(
@@ -540,11 +796,140 @@ class Gudrun(Process):
                     ),
                     format=enums.Format.YAML
                 )
-            gudrunFile.setGudrunDir(self.gudrunOutput.path)
+            gudrunFile.setGudrunDir(self.gudrunOutput.directory())
+            self.duration = time.perf_counter() - start
+            self.recordRun(runFile)
 
         self.exitcode = 0
         return self.exitcode
 
+    def recordRun(self, gudrunFile: GudrunFile):
+        """Records the duration and output size of the run,
+        to be used for estimating the cost of future runs.
+        Failing to record does not affect the run.
+        """
+        try:
+            archive = self.gudrunOutput.archive
+            self.history.record(
+                gudrunFile.instrument.name.name,
+                len(run_planner.runSamples(gudrunFile)),
+                self.duration,
+                (os.path.getsize(archive.path) if archive
+                 else run_planner.directorySize(self.gudrunOutput.path)),
+                run_planner.runDataFiles(gudrunFile)
+            )
+        except OSError:
+            pass
+
+
+class GudrunPool:
+    """
+    Runs several gudrun_dcs jobs concurrently, `nWorkers` at a time.
+    Whenever a worker is free, the longest pending job is started (LPT),
+    with durations estimated from previous jobs of the same signature,
+    which are updated as jobs finish. Each job must have its own
+    project directory.
+    """
+
+    def __init__(
+        self,
+        nWorkers: int = None,
+        timings: scheduler.TimingHistory = None,
+        history: run_planner.RunHistory = None
+    ):
+        self.nWorkers = nWorkers or os.cpu_count() or 1
+        # History the jobs are recorded to, if any
+        self.history = history or run_planner.RunHistory()
+        self.timings = (
+            timings if timings is not None
+            else scheduler.TimingHistory.fromRunHistory(self.history)
+        )
+        self.gudrunObjects: typ.List[Gudrun] = []
+
+    def estimates(self, gudrunFiles: typ.List[GudrunFile]) -> typ.List[float]:
+        return [
+            self.timings.estimate(scheduler.jobSignature(gudrunFile))
+            for gudrunFile in gudrunFiles
+        ]
+
+    def expectedMakespan(self, gudrunFiles: typ.List[GudrunFile]) -> float:
+        """Estimates the wall time to run all jobs in the pool
+
+        Parameters
+        ----------
+        gudrunFiles : list[GudrunFile]
+            Input files of the jobs
+
+        Returns
+        -------
+        float
+            Expected makespan
+        """
+        return scheduler.makespan(self.estimates(gudrunFiles), self.nWorkers)
+
+    def runJob(
+        self, gudrun: Gudrun, gudrunFile: GudrunFile, purge: Purge
+    ) -> int:
+        exitcode = gudrun.gudrun(gudrunFile, purge)
+        if not exitcode:
+            self.timings.update(
+                scheduler.jobSignature(gudrunFile), gudrun.duration)
+        return exitcode
+
+    def run(
+        self, gudrunFiles: typ.List[GudrunFile], purge: Purge = None
+    ) -> typ.List[typ.Tuple[int, str]]:
+        """Runs gudrun_dcs on each input file
+
+        Parameters
+        ----------
+        gudrunFiles : list[GudrunFile]
+            Input files of the jobs
+        purge : Purge, optional
+            Purge to use, by default None
+
+        Returns
+        -------
+        list[tuple[int, str]]
+            Exit code and error of each job, in the order given
+
+        Raises
+        ------
+        ValueError
+            Raised if two jobs share a project directory
+        """
+        projectDirs = [gudrunFile.projectDir for gudrunFile in gudrunFiles]
+        if len(set(projectDirs)) != len(projectDirs):
+            raise ValueError(
+                "Each job in the pool requires its own project directory.")
+
+        self.gudrunObjects = [
+            Gudrun(history=self.history) for _ in gudrunFiles]
+        results = [None] * len(gudrunFiles)
+        pending = list(range(len(gudrunFiles)))
+        running = {}
+        with ThreadPoolExecutor(max_workers=self.nWorkers) as executor:
+            while pending or running:
+                # Start the longest pending jobs, by the current estimates
+                while pending and len(running) < self.nWorkers:
+                    estimates = self.estimates(
+                        [gudrunFiles[i] for i in pending])
+                    i = pending.pop(scheduler.order(estimates)[0])
+                    running[executor.submit(
+                        self.runJob, self.gudrunObjects[i], gudrunFiles[i],
+                        purge
+                    )] = i
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    i = running.pop(future)
+                    try:
+                        results[i] = (
+                            future.result(), self.gudrunObjects[i].error)
+                    except Exception as e:
+                        # A failing job does not stop the others
+                        results[i] = (1, str(e))
+        return results
+
 
 class GudrunIterator:
     def __init__(
@@ -554,21 +939,19 @@ class GudrunIterator:
     ):
 
         # Create a copy of gudrun file
-        self.gudrunFile = copy.deepcopy(gudrunFile)
+        self.gudrunFile = gudrunFile.clone()
         self.iterator = iterator
         self.gudrunObjects = []
         self.exitcode = (1, "Operation incomplete")
         self.gudrunOutput = None
         self.result = {}
 
+        # If the iterator requires a prelimenary run, the first
+        # object is used for it
         for _ in range(
                 iterator.nTotal + (1 if iterator.requireDefault else 0)):
             self.gudrunObjects.append(Gudrun())
 
-        # If the iterator requires a prelimenary run
-        if iterator.requireDefault:
-            self.gudrunObjects.append(Gudrun())
-
     def singleIteration(
         self,
         gudrunFile: GudrunFile,
@@ -621,7 +1004,7 @@ class CompositionIterator:
         iterator: iterators.Composition,
         gudrunFile: GudrunFile,
     ):
-        self.gudrunFile = copy.deepcopy(gudrunFile)
+        self.gudrunFile = gudrunFile.clone()
         self.iterator = iterator
         self.gudrunObjects = []
         self.result = {}
@@ -689,7 +1072,7 @@ class CompositionIterator:
 
 class RunModes:
     def convertContainersToSample(self, gudrunFile: GudrunFile):
-        newGudrunFile = copy.deepcopy(gudrunFile)
+        newGudrunFile = gudrunFile.clone()
         containersAsSamples = []
         for sampleBackground in gudrunFile.sampleBackgrounds:
             for sample in sampleBackground.samples:
@@ -700,10 +1083,27 @@ class RunModes:
             newGudrunFile.sampleBackground.samples = containersAsSamples
         return newGudrunFile
 
-    def partition(self, gudrunFile):
-        newGudrunFile = copy.deepcopy(gudrunFile)
-        # Deepcopy the sample backgrounds.
-        sampleBackgrounds = copy.deepcopy(gudrunFile.sampleBackgrounds)
+    def partition(self, gudrunFile, skip=None):
+        """Create a copy of the GudrunFile where each sample is split
+        into one sample per data file.
+
+        Parameters
+        ----------
+        gudrunFile : GudrunFile
+            GudrunFile to partition
+        skip : set[tuple[str, str]], optional
+            (sample name, data file) pairs to leave out, by default None
+
+        Returns
+        -------
+        GudrunFile
+            Partitioned GudrunFile
+        """
+        if not skip:
+            skip = set()
+        # Copy at once, as the copy is handed to another thread.
+        newGudrunFile = gudrunFile.clone()
+        sampleBackgrounds = newGudrunFile.sampleBackgrounds
         # Clear the original list.
         newGudrunFile.sampleBackgrounds = []
 
@@ -711,19 +1111,22 @@ class RunModes:
         # For each sample, create a copy for each
         # data file, and add it to the corresponding sample background.
         for i, sampleBackground in enumerate(sampleBackgrounds):
-            samples = copy.deepcopy(sampleBackground.samples)
+            samples = sampleBackground.samples
             sampleBackgrounds[i].samples = []
 
             for sample in samples:
                 if sample.runThisSample:
                     for dataFile in sample.dataFiles:
-                        childSample = copy.deepcopy(sample)
+                        if (sample.name, dataFile) in skip:
+                            continue
+                        childSample = sample.clone()
 
                         # Only run one data file.
                         childSample.dataFiles = (
                             data_files.DataFiles([dataFile], childSample.name)
                         )
-                        childSample.name = f"{childSample.name} [{dataFile}]"
+                        childSample.name = self.partitionName(
+                            sample, dataFile)
 
                         # Append sample
                         sampleBackgrounds[i].samples.append(childSample)
@@ -732,9 +1135,13 @@ class RunModes:
         newGudrunFile.sampleBackgrounds = sampleBackgrounds
         return newGudrunFile
 
+    @staticmethod
+    def partitionName(sample, dataFile):
+        return f"{sample.name} [{dataFile}]"
+
 
 class BatchProcessing:
-    def __init___(
+    def __init__(
         self,
         gudrunFile: GudrunFile,
         iterator: iterators.Iterator = None,
@@ -753,6 +1160,8 @@ class BatchProcessing:
         self.RTOL = rtol
 
         self.separateFirstBatch = separateFirstBatch
+        self.nexusIndex = None
+        self.gudrunIterators = {}
 
         self.firstBatch, self.batchedGudrunFile = self.batch(
             separateFirstBatch=self.separateFirstBatch,
@@ -763,22 +1172,50 @@ class BatchProcessing:
             self.iterationMode = self.iterator.iterationMode
             self.gudrunIterators = {
                 "FIRST": GudrunIterator(
-                    self.firstBatch, self.purgeLocation, copy.deepcopy(
-                        iterator)
+                    self.firstBatch, copy.deepcopy(iterator)
                 ) if self.separateFirstBatch else None,
                 "REST": GudrunIterator(
-                    self.batchedGudrunFile, self.purgeLocation,
-                    copy.deepcopy(iterator)
+                    self.batchedGudrunFile, copy.deepcopy(iterator)
                 )
             }
 
+    def windows(
+        self, gudrunFile: GudrunFile, sample, nDataFiles: int, offset: int
+    ) -> typ.List[typ.Tuple[int, int]]:
+        """Returns the (start, stop) indices of each batch of a sample.
+        Batches of NeXus data files are formed by cumulative proton
+        charge where it is available, otherwise by file count.
+
+        Parameters
+        ----------
+        gudrunFile : GudrunFile
+            Input file being batched
+        sample : Sample
+            Sample being batched
+        nDataFiles : int
+            Number of data files to batch by file count
+        offset : int
+            Number of data files to skip
+
+        Returns
+        -------
+        list[tuple[int, int]]
+            Bounds of each batch
+        """
+        if self.nexusIndex is None:
+            self.nexusIndex = nexus_index.indexFor(gudrunFile.instrument)
+        return nexus_index.batchWindows(
+            self.nexusIndex, gudrunFile.instrument, sample.dataFiles,
+            nDataFiles, self.BATCH_SIZE, self.STEP_SIZE, offset
+        )
+
     def batch(self, gudrunFile: GudrunFile, separateFirstBatch: bool
               ) -> typ.Tuple[typ.Union[GudrunFile, None], GudrunFile]:
         if not separateFirstBatch:
-            batch = copy.deepcopy(gudrunFile)
+            batch = gudrunFile.clone()
             batch.sampleBackgrounds = []
             for sampleBackground in gudrunFile.sampleBackgrounds:
-                batchedSampleBackground = copy.deepcopy(sampleBackground)
+                batchedSampleBackground = sampleBackground.clone()
                 batchedSampleBackground.samples = []
                 maxDataFiles = max(
                     [
@@ -787,10 +1224,12 @@ class BatchProcessing:
                     ]
                 )
                 for sample in sampleBackground.samples:
-                    for i in range(self.OFFSET, maxDataFiles, self.STEP_SIZE):
-                        batchedSample = copy.deepcopy(sample)
+                    for start, stop in self.windows(
+                        gudrunFile, sample, maxDataFiles, self.OFFSET
+                    ):
+                        batchedSample = sample.clone()
                         batchedSample.dataFiles.dataFiles = sample.dataFiles[
-                            i: i + self.BATCH_SIZE
+                            start:stop
                         ]
                         batchedSampleBackground.samples.append(batchedSample)
                 batch.sampleBackgrounds.append(batchedSampleBackground)
@@ -798,21 +1237,22 @@ class BatchProcessing:
             return (None, batch)
 
         else:
-            first = copy.deepcopy(gudrunFile)
+            first = gudrunFile.clone()
             first.sampleBackgrounds = []
             for sampleBackground in gudrunFile.sampleBackgrounds:
-                batchedSampleBackground = copy.deepcopy(sampleBackground)
+                batchedSampleBackground = sampleBackground.clone()
                 batchedSampleBackground.samples = []
                 for sample in sampleBackground.samples:
-                    batchedSample = copy.deepcopy(sample)
+                    batchedSample = sample.clone()
+                    start, stop = self.windows(gudrunFile, sample, 1, 0)[0]
                     batchedSample.dataFiles.dataFiles = (
-                        sample.dataFiles[:self.BATCH_SIZE]
+                        sample.dataFiles[start:stop]
                     )
                     batchedSampleBackground.samples.append(batchedSample)
                 first.sampleBackgrounds.append(batchedSampleBackground)
             return (
                 first,
-                self.batch(separateFirstBatch=False)
+                self.batch(gudrunFile, separateFirstBatch=False)[1]
             )
 
     def canConverge(self, batch):
@@ -880,15 +1320,15 @@ class BatchProcessing:
             self.batchedGudrunFile.projectDir,
             f"BATCH_PROCESSING_BATCH_SIZE{batchSize}"
         ))
-        exitcode = gudrun.gudrun(GudrunFile, purge, iterator)
-        self.writeDiagnosticsFile(
-            os.path.join(
-                self.batchedGudrunFile.path(),
-                "batch_processing_diagnostics.txt",
-            ),
-            self.batchedGudrunFile,
-            self.iterationMode
-        )
+        exitcode = gudrun.gudrun(self.batchedGudrunFile, purge, iterator)
+        if not exitcode:
+            self.writeDiagnosticsFile(
+                os.path.join(
+                    self.batchedGudrunFile.projectDir,
+                    "batch_processing_diagnostics.txt",
+                ),
+                self.batchedGudrunFile
+            )
         self.exitcode = (exitcode, gudrun.error)
         return self.exitcode
 
@@ -897,6 +1337,7 @@ class BatchProcessing:
         gudrunIterator: GudrunIterator,
         batchedFile: GudrunFile,
         outputFolder: str,
+        purge: Purge
     ) -> int:
         prevOutput = None
 
@@ -906,78 +1347,281 @@ class BatchProcessing:
             outputFolder
         )
         gudrunIterator.gudrunFile = batchedFile
+        first = 0
 
-        # If the iterator requires a prelimenary run
+        # If the iterator requires a prelimenary run, the first
+        # object is used for it
         if gudrunIterator.iterator.requireDefault:
-            exitcode, error = self.gudrunIterators[-1].defaultIteration(
-                batchedFile)
+            defaultRun = gudrunIterator.gudrunObjects[0]
+            first = 1
+            exitcode = defaultRun.gudrun(
+                batchedFile, purge, gudrunIterator.iterator)
             if exitcode:  # An exit code != 0 indicates failure
-                self.exitcode = (exitcode, error)
+                self.exitcode = (exitcode, defaultRun.error)
                 return self.exitcode
-            prevOutput = gudrunIterator.defaultRun.gudrunOutput
+            prevOutput = defaultRun.gudrunOutput
 
         # Iterate through gudrun objects
-        for i, gudrun in enumerate(gudrunIterator.gudrunObjects):
-            if self.canConverge(batchedFile, self.RTOL):
+        for i, gudrun in enumerate(
+                gudrunIterator.gudrunObjects[first:], first):
+            if self.canConverge(batchedFile):
                 # Keep only the processed objects in the list
                 gudrunIterator.gudrunObjects = gudrunIterator.gudrunObjects[:i]
-                self.exitcode = (0, )
+                self.exitcode = (0, "")
                 return self.exitcode
 
             exitcode = gudrunIterator.singleIteration(
-                batchedFile, gudrun, prevOutput)
-
-            self.writeDiagnosticsFile(
-                os.path.join(batchedFile.path(),
-                             "batch_processing_diagnostics.txt")
-            )
+                batchedFile, gudrun, purge, prevOutput)
 
             if exitcode:
                 self.exitcode = (exitcode, gudrun.error)
                 return self.exitcode
 
+            self.writeDiagnosticsFile(
+                os.path.join(batchedFile.projectDir,
+                             "batch_processing_diagnostics.txt"),
+                batchedFile
+            )
             prevOutput = gudrun.gudrunOutput
 
-        self.exitcode = (0, )
+        self.exitcode = (0, "")
         return self.exitcode
 
     def process(
         self,
         purge: Purge
     ):
-        if self.iterationMode == enums.IterationModes.NONE:
-            return self.bactchProcess(
-                Gudrun(), self.BATCH_SIZE, purge=purge)
-
-        else:
-            if self.separateFirstBatch:
-                exitcode, error = self.iterate(
-                    gudrunIterator=self.gudrunIterators["FIRST"],
-                    gudrunFile=self.firstBatch,
-                    outputFolder="FIRST_BATCH"
-                )
-                if exitcode:
-                    raise exc.GudrunException(
-                        "Batch Processing failed with the following output:\n"
-                        f"{error}"
-                    )
-
-                self.propogateResults(
-                    self.firstBatch, self.batchedGudrunFile
+        if (
+            not self.iterator
+            or self.iterationMode == enums.IterationModes.NONE
+        ):
+            exitcode, error = self.bactchProcess(
+                Gudrun(), purge, self.BATCH_SIZE)
+            if exitcode:
+                raise exc.GudrunException(
+                    "Batch Processing failed with the following output:\n"
+                    f"{error}"
                 )
+            return
 
-            iterator = copy.deepcopy(self.iterator)
-            self.gudrunIterators.append(GudrunIterator(
-                self.batchedGudrunFile,
-                iterator
-            ))
+        if self.separateFirstBatch:
             exitcode, error = self.iterate(
-                gudrunIterator=self.gudrunIterators["REST"],
-                gudrunFile=self.batchedGudrunFile,
-                outputFolder="REST"
+                gudrunIterator=self.gudrunIterators["FIRST"],
+                batchedFile=self.firstBatch,
+                outputFolder="FIRST_BATCH",
+                purge=purge
             )
             if exitcode:
                 raise exc.GudrunException(
                     "Batch Processing failed with the following output:\n"
                     f"{error}"
                 )
+
+            self.propogateResults(
+                self.firstBatch, self.batchedGudrunFile
+            )
+
+        exitcode, error = self.iterate(
+            gudrunIterator=self.gudrunIterators["REST"],
+            batchedFile=self.batchedGudrunFile,
+            outputFolder="REST",
+            purge=purge
+        )
+        if exitcode:
+            raise exc.GudrunException(
+                "Batch Processing failed with the following output:\n"
+                f"{error}"
+            )
+
+
+class SlidingWindowBatchProcessing:
+    """
+    Batch processing for overlapping batches (stepSize < batchSize).
+    Each data file is reduced by gudrun_dcs once, and the result of
+    each window is formed by an error-weighted sum of the .mint01
+    outputs of its data files. gudrun_dcs is only run on a whole
+    window if its per-file outputs cannot be combined.
+    """
+
+    # Windows are formed as batches are, by proton charge where known
+    windows = BatchProcessing.windows
+
+    def __init__(
+        self,
+        gudrunFile: GudrunFile,
+        batchSize=1,
+        stepSize=1,
+        offset: int = 0,
+        fileOutputs: typ.Dict[str, str] = None
+    ):
+        self.gudrunFile = gudrunFile
+        self.BATCH_SIZE = batchSize
+        self.STEP_SIZE = stepSize
+        self.OFFSET = offset
+        self.exitcode = (1, "Operation incomplete")
+        self.gudrunObjects = []
+
+        # Maps the fingerprint of the inputs of a data file to its
+        # .mint01, so outputs are only reused while the inputs match
+        self.fileOutputs = fileOutputs if fileOutputs is not None else {}
+        # Maps (sample name, data file) to that fingerprint
+        self.fileKeys = fingerprint.dataFileFingerprints(gudrunFile)
+        # Maps sample name to a list of (data files, .mint01) per window
+        self.windowOutputs = {}
+        self.nexusIndex = None
+
+    def outputDir(self) -> str:
+        return os.path.join(
+            self.gudrunFile.projectDir,
+            f"SLIDING_WINDOW_BATCH_SIZE{self.BATCH_SIZE}"
+        )
+
+    def samples(self):
+        return [
+            sample
+            for sampleBackground in self.gudrunFile.sampleBackgrounds
+            for sample in sampleBackground.samples
+            if sample.runThisSample and len(sample.dataFiles)
+        ]
+
+    def fileOutput(self, sample, dataFile) -> str:
+        key = self.fileKeys.get((sample.name, dataFile))
+        return self.fileOutputs.get(key, "") if key else ""
+
+    def cached(self, sample, dataFile) -> bool:
+        path = self.fileOutput(sample, dataFile)
+        return bool(path) and os.path.exists(path)
+
+    def runGudrun(
+        self, gudrunFile: GudrunFile, purge: Purge, outputFolder: str
+    ) -> typ.Tuple[int, str, handlers.GudrunOutput]:
+        gudrunFile.projectDir = utils.uniquify(
+            os.path.join(self.outputDir(), outputFolder))
+        gudrun = Gudrun()
+        self.gudrunObjects.append(gudrun)
+        exitcode = gudrun.gudrun(gudrunFile, purge, save=False)
+        if exitcode:
+            return (exitcode, gudrun.error, None)
+        return (0, "", gudrun.gudrunOutput)
+
+    def reduceFiles(self, purge: Purge) -> typ.Tuple[int, str]:
+        """Runs gudrun_dcs on each data file that has not been
+        reduced yet.
+        """
+        skip = {
+            (sample.name, dataFile)
+            for sample in self.samples()
+            for dataFile in sample.dataFiles
+            if self.cached(sample, dataFile)
+        }
+        partitioned = RunModes().partition(self.gudrunFile, skip=skip)
+        if not any(sb.samples for sb in partitioned.sampleBackgrounds):
+            return (0, "")
+
+        exitcode, error, gudrunOutput = self.runGudrun(
+            partitioned, purge, "FILES")
+        if exitcode:
+            return (exitcode, error)
+
+        for sample in self.samples():
+            for dataFile in sample.dataFiles:
+                key = self.fileKeys.get((sample.name, dataFile))
+                if (sample.name, dataFile) in skip or not key:
+                    continue
+                self.fileOutputs[key] = (
+                    gudrunOutput.output(
+                        RunModes.partitionName(sample, dataFile),
+                        dataFile, ".mint01"
+                    )
+                )
+        return (0, "")
+
+    def mergeWindows(self) -> typ.List[typ.Tuple[typ.Any, int, typ.List]]:
+        """Forms the result of each window from the per-file outputs.
+
+        Returns
+        -------
+        list[tuple[Sample, int, list[str]]]
+            Windows which could not be merged, and require
+            a fresh run of gudrun_dcs
+        """
+        unmerged = []
+        for sample in self.samples():
+            self.windowOutputs[sample.name] = []
+            for idx, (start, stop) in enumerate(self.windows(
+                self.gudrunFile, sample, len(sample.dataFiles), self.OFFSET
+            )):
+                dataFiles = sample.dataFiles[start:stop]
+                self.windowOutputs[sample.name].append((dataFiles, None))
+                if not all(self.cached(sample, df) for df in dataFiles):
+                    unmerged.append((sample, idx, dataFiles))
+                    continue
+                target = os.path.join(
+                    self.outputDir(), "WINDOWS",
+                    utils.replace_unwanted_chars(sample.name),
+                    f"{os.path.splitext(dataFiles[0])[0]}"
+                    f"-{os.path.splitext(dataFiles[-1])[0]}.mint01"
+                )
+                try:
+                    self.windowOutputs[sample.name][idx] = (
+                        dataFiles,
+                        sliding_window.mergeCurves(
+                            [self.fileOutput(sample, df)
+                             for df in dataFiles],
+                            target
+                        )
+                    )
+                except (ValueError, exc.ParserException):
+                    unmerged.append((sample, idx, dataFiles))
+        return unmerged
+
+    def runWindows(self, windows, purge: Purge) -> typ.Tuple[int, str]:
+        """Runs gudrun_dcs on whole windows, for those which could
+        not be formed from the per-file outputs.
+        """
+        batch = self.gudrunFile.clone()
+        names = {}
+        for sampleBackground in batch.sampleBackgrounds:
+            samples = sampleBackground.samples
+            sampleBackground.samples = []
+            for sample in samples:
+                for original, idx, dataFiles in windows:
+                    if original.name != sample.name:
+                        continue
+                    batchedSample = sample.clone()
+                    batchedSample.dataFiles = data_files.DataFiles(
+                        list(dataFiles), batchedSample.name)
+                    batchedSample.name = f"{sample.name} [WINDOW {idx}]"
+                    names[(sample.name, idx)] = batchedSample.name
+                    sampleBackground.samples.append(batchedSample)
+
+        exitcode, error, gudrunOutput = self.runGudrun(
+            batch, purge, "WINDOWS_FRESH")
+        if exitcode:
+            return (exitcode, error)
+
+        for sample, idx, dataFiles in windows:
+            self.windowOutputs[sample.name][idx] = (
+                dataFiles,
+                gudrunOutput.output(
+                    names[(sample.name, idx)], dataFiles[0], ".mint01")
+            )
+        return (0, "")
+
+    def process(self, purge: Purge = None) -> typ.Tuple[int, str]:
+        self.fileKeys = fingerprint.dataFileFingerprints(
+            self.gudrunFile, purge.outputFiles() if purge else [])
+        exitcode, error = self.reduceFiles(purge)
+        if exitcode:
+            self.exitcode = (exitcode, error)
+            return self.exitcode
+
+        unmerged = self.mergeWindows()
+        if unmerged:
+            exitcode, error = self.runWindows(unmerged, purge)
+            if exitcode:
+                self.exitcode = (exitcode, error)
+                return self.exitcode
+
+        self.exitcode = (0, "")
+        return self.exitcode
@@ -2,11 +2,16 @@ from abc import abstractmethod
 from enum import Enum
 from ruamel.yaml import YAML as yaml
 from ruamel.yaml import YAMLError
+from ruamel.yaml.comments import CommentedMap
+import io
 import os
 
 from core.composition import (
     Component, Components, Composition, WeightedComponent
 )
+from core.copy_on_write import (
+    CopyOnWriteList, changedSince, clock, fields, trackedObjects
+)
 from core.data_files import DataFiles
 from core.element import Element
 from core.exception import YAMLException
@@ -20,12 +25,21 @@ from core.sample_background import SampleBackground
 from core.sample import Sample
 from core.container import Container
 from core import config
+from core import snapshot
 
 
 class YAML:
+    # Field-setting plans of each class, see fieldPlan
+    plans = {}
 
     def __init__(self):
         self.yaml = self.getYamlModule()
+        self.loader = self.getLoaderModule()
+        # Source, tracked objects, time and emitted text of each part
+        # of the last model written, see dumpModel
+        self.dumpCache = {}
+        # Stat and contents of the files last written, keyed by path
+        self.written = {}
 
     def getYamlModule(self):
         yaml_ = yaml()
@@ -34,8 +48,20 @@ class YAML:
         yaml_.encoding = 'utf-8'
         return yaml_
 
-    def parseYaml(self, path):
+    def getLoaderModule(self):
+        # Project files are plain data, so they are read with the safe
+        # loader, which uses the C parser if available and constructs
+        # builtins rather than round-trip types.
+        loader = yaml(typ="safe")
+        loader.encoding = 'utf-8'
+        return loader
+
+    def parseYaml(self, path, useSnapshot=False):
         self.path = path
+        if useSnapshot:
+            parsed = snapshot.readSnapshot(path)
+            if parsed is not None:
+                return parsed
         try:
             parsedYAML = self.constructClasses(self.yamlToDict(path))
         except YAMLError as e:
@@ -49,8 +75,8 @@ class YAML:
 
     def yamlToDict(self, path):
         # Read the input stream into our attribute.
-        with open(path, encoding=self.yaml.encoding) as fp:
-            return self.yaml.load(fp)
+        with open(path, encoding=self.loader.encoding) as fp:
+            return self.loader.load(fp)
 
     def constructClasses(self, yamldict):
         instrument = Instrument()
@@ -90,110 +116,146 @@ class YAML:
             normalisation, sampleBackgrounds, GUI
         )
 
-    @abstractmethod
     def maskYAMLDicttoClass(self, cls, yamldict):
+        plan = self.fieldPlan(cls)
         for k, v in yamldict.items():
-            if not hasattr(cls, k):
-                # If attribute is not valid
-                raise YAMLException(
-                    f"Invalid attribute '{k}' given to '{type(cls).__name__}'")
+            setter = plan.get(k)
+            if setter is None:
+                if not hasattr(cls, k):
+                    # If attribute is not valid
+                    raise YAMLException(
+                        f"Invalid attribute '{k}' given to"
+                        f" '{type(cls).__name__}'")
+                setter = self.fieldSetter(cls, k, getattr(cls, k))
+            setter(self, cls, k, v)
 
-            if isinstance(cls.__dict__[k], Enum):
-                setattr(cls, k, type(cls.__dict__[k])[v])
+    def fieldPlan(self, cls):
+        """
+        Returns the plan of how each field of an object is set from
+        its YAML value. The plan is built once per class, from the
+        default values of the first instance seen, and is then reused
+        for every object of that class.
 
-            elif isinstance(cls.__dict__[k], DataFiles):
-                setattr(
-                    cls, k,
-                    DataFiles(
-                        [v_ for v_ in v["dataFiles"]], v["name"])
-                )
+        Parameters
+        ----------
+        cls : object
+            Object to be set from YAML.
 
-            elif (
-                isinstance(
-                    cls,
-                    (Component, Composition)
-                )
-                and k == "elements"
+        Returns
+        -------
+        dict
+            Setter of each field, keyed by attribute name.
+        """
+        plan = YAML.plans.get(type(cls))
+        if plan is None:
+            plan = {
+                k: self.fieldSetter(cls, k, v)
+                for k, v in fields(cls).items()
+            }
+            YAML.plans[type(cls)] = plan
+        return plan
+
+    def fieldSetter(self, cls, k, default):
+        """
+        Returns the function which sets the field `k` of an object
+        from its YAML value, based on the default value of the field.
+        """
+        if isinstance(default, Enum):
+            enum = type(default)
+            return lambda self, cls, k, v: setattr(cls, k, enum[v])
+        elif isinstance(default, DataFiles):
+            return YAML.setDataFiles
+        elif isinstance(cls, (Component, Composition)) and k == "elements":
+            return YAML.setElements
+        elif isinstance(cls, Composition) and k == "weightedComponents":
+            return YAML.setWeightedComponents
+        elif (
+            isinstance(cls, (Normalisation, Sample, Container))
+            and k == "composition"
+        ):
+            return lambda self, cls, k, v: self.maskYAMLDicttoClass(
+                getattr(cls, k), v)
+        elif isinstance(cls, SampleBackground) and k == "samples":
+            return YAML.setSamples
+        elif isinstance(cls, Sample) and k == "containers":
+            return YAML.setContainers
+        type_ = type(default)
+        if issubclass(type_, (list, tuple)):
+            return lambda self, cls, k, v: setattr(
+                cls, k, type_(self.toBuiltin(v)))
+        return lambda self, cls, k, v: setattr(cls, k, type_(v))
+
+    def setDataFiles(self, cls, k, v):
+        setattr(cls, k, DataFiles([v_ for v_ in v["dataFiles"]], v["name"]))
+
+    def setElements(self, cls, k, v):
+        elements = []
+        for idx, element in enumerate(v):
+            # Ensuring correct arguements are provided
+            if (
+                "atomicSymbol" not in element
+                or "massNo" not in element
+                or "abundance" not in element
             ):
-                elements = []
-                for idx, element in enumerate(v):
-                    # Ensuring correct arguements are provided
-                    if (
-                        "atomicSymbol" not in element
-                        or "massNo" not in element
-                        or "abundance" not in element
-                    ):
-                        raise YAMLException(
-                            "Insufficient arguments given to element"
-                            + f" {idx + 1}. Expects 'atomicSymbol', 'massNo'"
-                            + " and 'abundance'"
-                        )
+                raise YAMLException(
+                    "Insufficient arguments given to element"
+                    + f" {idx + 1}. Expects 'atomicSymbol', 'massNo'"
+                    + " and 'abundance'"
+                )
 
-                    # Setting element properties
-                    try:
-                        element_ = Element(
-                            **{
-                                "atomicSymbol": element["atomicSymbol"],
-                                "massNo": float(element["massNo"]),
-                                "abundance": float(element["abundance"])
-                            }
-                        )
-                        elements.append(element_)
-                    except ValueError:
-                        raise YAMLException(
-                            f"Invalid number given to element {idx + 1}"
-                            + f" in '{type(cls).__name__}")
-                setattr(cls, k, elements)
-
-            elif isinstance(cls, Composition) and k == "weightedComponents":
-                weightedComponents = []
-                for weightedComponent in v:
-                    if (
-                        "component" not in weightedComponent
-                        or "ratio" not in weightedComponent
-                    ):
-                        raise YAMLException(
-                            "Weighted Component expects 'component' and"
-                            + " 'ratio' to be provided")
-                    component = Component()
-                    self.maskYAMLDicttoClass(
-                        component, weightedComponent["component"]
-                    )
-                    ratio = weightedComponent["ratio"]
-                    try:
-                        weightedComponents.append(
-                            WeightedComponent(
-                                component, float(ratio))
-                        )
-                    except ValueError:
-                        raise YAMLException(
-                            "Invalid ratio given to Weighted Component")
-                setattr(cls, k, weightedComponents)
-
-            elif (
-                isinstance(
-                    cls,
-                    (Normalisation, Sample, Container)
+            # Setting element properties
+            try:
+                element_ = Element(
+                    **{
+                        "atomicSymbol": element["atomicSymbol"],
+                        "massNo": float(element["massNo"]),
+                        "abundance": float(element["abundance"])
+                    }
                 )
-                and k == "composition"
-            ):
-                self.maskYAMLDicttoClass(cls.__dict__[k], v)
+                elements.append(element_)
+            except ValueError:
+                raise YAMLException(
+                    f"Invalid number given to element {idx + 1}"
+                    + f" in '{type(cls).__name__}")
+        setattr(cls, k, elements)
 
-            elif isinstance(cls, SampleBackground) and k == "samples":
-                for sampleyaml in yamldict[k]:
-                    sample = Sample()
-                    self.maskYAMLDicttoClass(sample, sampleyaml)
-                    sample.name = utils.replace_unwanted_chars(sample.name)
-                    cls.samples.append(sample)
+    def setWeightedComponents(self, cls, k, v):
+        weightedComponents = []
+        for weightedComponent in v:
+            if (
+                "component" not in weightedComponent
+                or "ratio" not in weightedComponent
+            ):
+                raise YAMLException(
+                    "Weighted Component expects 'component' and"
+                    + " 'ratio' to be provided")
+            component = Component()
+            self.maskYAMLDicttoClass(
+                component, weightedComponent["component"]
+            )
+            ratio = weightedComponent["ratio"]
+            try:
+                weightedComponents.append(
+                    WeightedComponent(
+                        component, float(ratio))
+                )
+            except ValueError:
+                raise YAMLException(
+                    "Invalid ratio given to Weighted Component")
+        setattr(cls, k, weightedComponents)
 
-            elif isinstance(cls, Sample) and k == "containers":
-                for contyaml in yamldict[k]:
-                    container = Container()
-                    self.maskYAMLDicttoClass(container, contyaml)
-                    cls.containers.append(container)
+    def setSamples(self, cls, k, v):
+        for sampleyaml in v:
+            sample = Sample()
+            self.maskYAMLDicttoClass(sample, sampleyaml)
+            sample.name = utils.replace_unwanted_chars(sample.name)
+            cls.samples.append(sample)
 
-            else:
-                setattr(cls, k, type(cls.__dict__[k])(self.toBuiltin(v)))
+    def setContainers(self, cls, k, v):
+        for contyaml in v:
+            container = Container()
+            self.maskYAMLDicttoClass(container, contyaml)
+            cls.containers.append(container)
 
     def maskYAMLSeqtoClass(self, cls, yamlseq):
         if isinstance(cls, Components):
@@ -205,24 +267,155 @@ class YAML:
             setattr(cls, "components", components)
 
     def writeYAML(self, base, path):
+        """
+        Writes the model to a YAML file. Only the parts of the model
+        which changed since the last write are re-emitted, and the
+        write is skipped if the file would be unchanged.
+
+        Parameters
+        ----------
+        base : GudrunFile
+            Model to write.
+        path : str
+            Path to write to.
+
+        Returns
+        -------
+        bool
+            If the file was written.
+        """
+        data = self.dumpModel(base)
+        try:
+            stat = os.stat(path)
+            current = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            current = None
+        if current and self.written.get(path) == (current, data):
+            return False
         with open(path, "wb") as fp:
-            outyaml = {
-                "Instrument": base.instrument,
-                "Beam": base.beam,
-                "Components": base.components.components,
-                "Normalisation": base.normalisation,
-                "SampleBackgrounds": base.sampleBackgrounds,
-                "GUI": config.GUI
-            }
-            self.yaml.dump(
-                {k: self.toYaml(v) for k, v in outyaml.items()},
-                fp
-            )
+            fp.write(data)
+        stat = os.stat(path)
+        self.written[path] = ((stat.st_mtime_ns, stat.st_size), data)
+        return True
+
+    def dump(self, data):
+        stream = io.BytesIO()
+        self.yaml.dump(data, stream)
+        return stream.getvalue()
+
+    def cachedPart(self, cache, key, obj, value, wrap, skipLines):
+        """
+        Emits a part of the model, reusing the text emitted for it by
+        the last write if none of the model objects it is built from
+        changed since, as SectionCache does, so that unchanged parts
+        are neither serialised nor dumped again. The part is dumped
+        wrapped in its enclosing structure, so that it is emitted at the
+        same indentation as in a whole dump, and the lines of the
+        enclosing structure are then skipped.
+        """
+        cached = cache.get(key)
+        if (
+            cached is not None and cached[0] is obj
+            and not changedSince(cached[1], cached[2])
+        ):
+            self.dumpCache[key] = cached
+            return cached[3]
+        # A key of a sample background depends on the object itself,
+        # not on the rest of what it holds, such as its samples
+        objects = trackedObjects(value)
+        if value is not obj:
+            objects.append(obj)
+        time = clock()
+        text = self.dump(wrap(self.toYaml(value))).split(
+            b"\n", skipLines)[-1]
+        self.dumpCache[key] = (obj, objects, time, text)
+        return text
+
+    @staticmethod
+    def blockMap(k, v):
+        # A sample background is always emitted in block style,
+        # even when only one of its keys is dumped.
+        mapping = CommentedMap({k: v})
+        mapping.fa.set_block_style()
+        return mapping
+
+    def dumpModel(self, base):
+        """
+        Emits the model, section by section, and each sample background
+        key by key and sample by sample, so that parts unchanged since
+        the last write are not built or dumped again. The output is
+        identical to dumping the whole of toYamlDict at once.
+        """
+        cache, self.dumpCache = self.dumpCache, {}
+        sections = {
+            "Instrument": base.instrument,
+            "Beam": base.beam,
+            "Components": base.components.components,
+            "Normalisation": base.normalisation,
+            "SampleBackgrounds": base.sampleBackgrounds,
+            "GUI": config.GUI
+        }
+        parts = []
+        for k, v in sections.items():
+            if k != "SampleBackgrounds" or not v:
+                parts.append(self.cachedPart(
+                    cache, (k,), v, v, lambda v, k=k: {k: v}, 0))
+                continue
+            parts.append(b"SampleBackgrounds:\n")
+            for sampleBackground in v:
+                items = [
+                    (k_, v_) for k_, v_ in fields(sampleBackground).items()
+                    if k_ not in sampleBackground.yamlignore
+                ]
+                for n, (k_, v_) in enumerate(items):
+                    # Only the first key of an item carries its dash
+                    indent = b"- " if n == 0 else b"  "
+                    if k_ != "samples" or not v_:
+                        text = self.cachedPart(
+                            cache, (id(sampleBackground), k_),
+                            sampleBackground, v_,
+                            lambda v_, k_=k_: {k: [self.blockMap(k_, v_)]},
+                            1
+                        )
+                        parts.append(indent + text[2:])
+                        continue
+                    parts.append(indent + b"samples:\n")
+                    # Samples are emitted identically wherever they are,
+                    # so they are cached by identity, not position
+                    for sample in v_:
+                        parts.append(self.cachedPart(
+                            cache, ("samples", id(sample)), sample, sample,
+                            lambda s: {k: [{"samples": [s]}]}, 2
+                        ))
+        return b"".join(parts)
+
+    def writeSnapshot(self, base, path):
+        """
+        Writes a binary snapshot next to a YAML input file that has just
+        been written. The snapshot holds the objects that loading the
+        YAML would construct, so it loads identically.
+        """
+        self.path = path
+        snapshot.writeSnapshot(
+            path, self.constructClasses(self.toYamlDict(base)))
+
+    def toYamlDict(self, base):
+        outyaml = {
+            "Instrument": base.instrument,
+            "Beam": base.beam,
+            "Components": base.components.components,
+            "Normalisation": base.normalisation,
+            "SampleBackgrounds": base.sampleBackgrounds,
+            "GUI": config.GUI
+        }
+        return {k: self.toYaml(v) for k, v in outyaml.items()}
 
     @abstractmethod
     def toYaml(self, var):
         if var.__class__.__module__ == "ruamel.yaml.scalarfloat":
             return float(var)
+        if isinstance(var, CopyOnWriteList):
+            return [self.toYaml(v) for v in var]
         if var.__class__.__module__ == "builtins":
             if isinstance(var, (list, tuple)):
                 return type(var)([self.toYaml(v) for v in var])
@@ -237,7 +430,7 @@ class YAML:
         )):
             return {
                 k: self.toYaml(v)
-                for k, v in var.__dict__.items()
+                for k, v in fields(var).items()
                 if k not in var.yamlignore
             }
 
@@ -1,7 +1,6 @@
 import os
 import time
 import re
-from copy import deepcopy
 
 from core.utils import (
     extract_nums_from_string,
@@ -31,13 +30,18 @@ from core.enums import (
 from core import utils
 from core import config as cfg
 from core.gudpy_yaml import YAML
+from core.section_cache import SectionCache
+from core.snapshot import hasSnapshot
 from core.exception import ParserException, YAMLException
 from core.gud_file import GudFile
+from core.token_stream import TokenStream
+from core import text_file
+from core.copy_on_write import CopyOnWrite
 
 SUFFIX = ".exe" if os.name == "nt" else ""
 
 
-class GudrunFile:
+class GudrunFile(CopyOnWrite):
     """
     Class to represent a GudFile (files with .gud extension).
     .gud files are outputted by gudrun_dcs, via merge_routines
@@ -61,9 +65,9 @@ class GudrunFile:
         List of SampleBackgrounds extracted from the input file.
     purged : bool
         Have the detectors been purged?
-    stream : str[]
-        List of strings, where each item represents a line
-        in the input stream.
+    stream : TokenStream
+        Lines of the input file, consumed through a cursor
+        whilst parsing.
     Methods
     -------
     getNextToken():
@@ -118,12 +122,17 @@ class GudrunFile:
         Create a PurgeFile from the GudrunFile, and run purge_det on it.
     """
 
+    # The YAML writer and the section cache keep what was written,
+    # for this file only
+    copyIgnore = frozenset({"yaml", "sectionCache"})
+
     def __init__(
         self,
         projectDir=None,
         loadFile=None,
         format=Format.YAML,
-        config=False
+        config=False,
+        snapshot=False
     ):
         """
         Constructs all the necessary attributes for the GudrunFile object.
@@ -140,9 +149,13 @@ class GudrunFile:
             Format of the file
         config : bool
             If a new input file should be constructed from a config
+        snapshot : bool
+            If a valid binary snapshot of a YAML file should be
+            loaded in place of it
         """
 
         self.yaml = YAML()
+        self.sectionCache = SectionCache()
         self.format = format
 
         # Construct the outpath of generated input file
@@ -171,16 +184,7 @@ class GudrunFile:
         if not config:
             self.setGudrunDir(os.path.dirname(loadFile))
 
-        self.parse(loadFile, config=config)
-
-    def __deepcopy__(self, memo):
-        result = self.__class__.__new__(self.__class__)
-        memo[id(self)] = result
-        for k, v in self.__dict__.items():
-            if k == "yaml":
-                continue
-            setattr(result, k, deepcopy(v, memo))
-        return result
+        self.parse(loadFile, config=config, snapshot=snapshot)
 
     def path(self):
         if not self.projectDir:
@@ -194,8 +198,8 @@ class GudrunFile:
 
     def getNextToken(self):
         """
-        Pops the 'next token' from the stream and returns it.
-        Essentially removes the first line in the stream and returns it.
+        Consumes the 'next token' from the stream and returns it.
+        Essentially advances the stream past its next line and returns it.
 
         Parameters
         ----------
@@ -204,7 +208,7 @@ class GudrunFile:
         -------
         str | None
         """
-        return self.stream.pop(0) if self.stream else None
+        return self.stream.next() if self.stream else None
 
     def peekNextToken(self):
         """
@@ -217,7 +221,7 @@ class GudrunFile:
         -------
         str | None
         """
-        return self.stream[0] if self.stream else None
+        return self.stream.peek() if self.stream else None
 
     def consumeTokens(self, n):
         """
@@ -1307,7 +1311,7 @@ class GudrunFile:
             line = self.peekNextToken()
         return sampleBackground
 
-    def parse(self, path, config=False):
+    def parse(self, path, config=False, snapshot=False):
         """
         Parse the GudrunFile from its path.
         Assign objects from the file to the attributes of the class.
@@ -1342,7 +1346,7 @@ class GudrunFile:
                     self.normalisation,
                     self.sampleBackgrounds,
                     cfg.GUI
-                ) = self.yaml.parseYaml(path)
+                ) = self.yaml.parseYaml(path, useSnapshot=snapshot)
             except YAMLException as e:
                 raise ParserException(e)
         else:
@@ -1354,14 +1358,8 @@ class GudrunFile:
                 "NORMALISATION": False
             }
 
-            # Decide the encoding
-            import chardet
-            with open(path, 'rb') as fp:
-                encoding = chardet.detect(fp.read())['encoding']
-
             # Read the input stream into our attribute.
-            with open(path, encoding=encoding) as fp:
-                self.stream = fp.readlines()
+            self.stream = TokenStream(text_file.readLines(path))
 
             # Here we go! Get the first token and begin parsing.
             line = self.getNextToken()
@@ -1407,6 +1405,8 @@ class GudrunFile:
                 elif "COMPONENTS:" in line:
                     self.makeParse("COMPONENTS")
                 line = self.getNextToken()
+            # Release the lines once parsed.
+            self.stream = None
 
     def __str__(self):
         """
@@ -1421,55 +1421,69 @@ class GudrunFile:
         string : str
             String representation of GudrunFile.
         """
+        cache = self.textCache()
+        parts = [self.headerStr()]
+        parts.append("\n".join(
+            [x.toString(render=cache.render) for x in self.sampleBackgrounds]
+        ).rstrip())
+        parts.append(self.footerStr())
+        # Forget sections which are no longer part of the file
+        cache.prune()
+        return "".join(parts)
+
+    def textCache(self):
+        """
+        Returns the cache of the text of each section of the file.
+        Copies of the GudrunFile start with an empty cache.
+        """
+        if getattr(self, "sectionCache", None) is None:
+            self.sectionCache = SectionCache()
+        return self.sectionCache
 
+    def headerStr(self):
+        """
+        Returns the part of the string representation shared by every
+        input file: the instrument, beam and normalisation.
+        """
+        cache = self.textCache()
         LINEBREAK = "\n\n"
-        header = (
-            f"'{cfg.spc2}'{cfg.spc2}'{cfg.spc10}'"
-            f"{cfg.spc2}'{os.path.sep}'{LINEBREAK}"
-        )
-        instrument = (
-            f"INSTRUMENT{cfg.spc10}{{\n\n"
-            + str(self.instrument)
-            + LINEBREAK
-            + "}"
-        )
-        beam = f"BEAM{cfg.spc10}{{\n\n" + str(self.beam) + LINEBREAK + "}"
-        normalisation = (
-            f"NORMALISATION{cfg.spc10}{{\n\n"
-            + str(self.normalisation)
-            + LINEBREAK
-            + "}"
-        )
-        sampleBackgrounds = "\n".join(
-            [str(x) for x in self.sampleBackgrounds]
-        ).rstrip()
-        footer = (
-            f"\n\n\nEND{cfg.spc10}"
-            f"\n1\nDate and time last written:  "
-            f"{time.strftime('%Y%m%d %H:%M:%S')}{cfg.spc10}"
-            f"\nN"
-        )
-
-        components = (
-            f"\n\nCOMPONENTS:\n{str(self.components)}"
-            if len(self.components.components)
-            else ""
-        )
-
-        return (
-            header
-            + instrument
-            + LINEBREAK
-            + beam
-            + LINEBREAK
-            + normalisation
-            + LINEBREAK
-            + sampleBackgrounds
-            + footer
-            + components
-        )
-
-    def save(self, path='', format=None):
+        return "".join([
+            f"'{cfg.spc2}'{cfg.spc2}'{cfg.spc10}'",
+            f"{cfg.spc2}'{os.path.sep}'{LINEBREAK}",
+            f"INSTRUMENT{cfg.spc10}{{\n\n",
+            cache.render(self.instrument),
+            LINEBREAK,
+            "}",
+            LINEBREAK,
+            f"BEAM{cfg.spc10}{{\n\n",
+            cache.render(self.beam),
+            LINEBREAK,
+            "}",
+            LINEBREAK,
+            f"NORMALISATION{cfg.spc10}{{\n\n",
+            cache.render(self.normalisation),
+            LINEBREAK,
+            "}",
+            LINEBREAK,
+        ])
+
+    def footerStr(self):
+        """
+        Returns the end of the string representation, following the
+        sample backgrounds.
+        """
+        parts = [
+            f"\n\n\nEND{cfg.spc10}",
+            "\n1\nDate and time last written:  ",
+            f"{time.strftime('%Y%m%d %H:%M:%S')}{cfg.spc10}",
+            "\nN",
+        ]
+        if len(self.components.components):
+            parts.append("\n\nCOMPONENTS:\n")
+            parts.append(self.textCache().render(self.components))
+        return "".join(parts)
+
+    def save(self, path='', format=None, snapshot=False):
         if not path:
             path = self.path()
 
@@ -1479,11 +1493,17 @@ class GudrunFile:
             self.write_out(
                 path=f"{os.path.splitext(path)[0]}.txt", overwrite=True)
         elif format == Format.YAML:
-            self.write_yaml(path=f"{os.path.splitext(path)[0]}.yaml")
-
-    def write_yaml(self, path):
-        self.yaml = YAML()
-        self.yaml.writeYAML(self, path)
+            self.write_yaml(
+                path=f"{os.path.splitext(path)[0]}.yaml", snapshot=snapshot)
+
+    def write_yaml(self, path, snapshot=False):
+        # The YAML writer is kept between saves, as it caches
+        # the output of unchanged parts of the model.
+        if getattr(self, "yaml", None) is None:
+            self.yaml = YAML()
+        written = self.yaml.writeYAML(self, path)
+        if snapshot and (written or not hasSnapshot(path)):
+            self.yaml.writeSnapshot(self, path)
 
     def write_out(self, path='', overwrite=False, writeParameters=True):
         """
@@ -1531,20 +1551,30 @@ class GudrunFile:
         f.close()
 
         if writeParameters:
-            for sb in self.sampleBackgrounds:
-                for s in sb.samples:
-                    if s.runThisSample:
-                        gf = deepcopy(self)
-                        gf.sampleBackgrounds = [deepcopy(sb)]
-                        gf.sampleBackgrounds[0].samples = [deepcopy(s)]
-                        gf.write_out(
-                            path=os.path.join(
-                                self.instrument.GudrunInputFileDir,
-                                s.pathName(),
-                            ),
-                            overwrite=True,
-                            writeParameters=False
-                        )
+            self.writeParameterFiles()
+
+    def writeParameterFiles(self):
+        """
+        Writes out an input file for each sample to be run, holding
+        only that sample, to '{sample.pathName()}' in the input file
+        directory. The instrument, beam and normalisation are rendered
+        once, and shared by every file.
+        """
+        header = None
+        for sb in self.sampleBackgrounds:
+            for s in sb.samples:
+                if not s.runThisSample:
+                    continue
+                if header is None:
+                    header = self.headerStr()
+                path = os.path.join(
+                    self.instrument.GudrunInputFileDir, s.pathName()
+                )
+                with open(path, "w", encoding="utf-8") as f:
+                    f.write(header)
+                    f.write(sb.toString(
+                        [s], render=self.textCache().render).rstrip())
+                    f.write(self.footerStr())
 
     def setGudrunDir(self, dir):
         self.instrument.GudrunInputFileDir = dir
@@ -1,6 +1,9 @@
-class GUIConfig():
+from core.copy_on_write import CopyOnWrite
+
+
+class GUIConfig(CopyOnWrite):
+
+    yamlignore = frozenset()
+
     def __init__(self):
         self.useComponents = False
-        self.yamlignore = {
-            "yamlignore"
-        }
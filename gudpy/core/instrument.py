@@ -4,9 +4,10 @@ import sys
 from core.utils import spacify, numifyBool, bjoin
 from core.enums import MergeWeights, Scales, Instruments
 from core import config
+from core.copy_on_write import CopyOnWrite
 
 
-class Instrument:
+class Instrument(CopyOnWrite):
     """
     Class to represent an Instrument.
 
@@ -107,6 +108,32 @@ class Instrument:
     -------
     """
 
+    __slots__ = (
+        "name", "GudrunInputFileDir", "dataFileDir", "dataFileType",
+        "detectorCalibrationFileName", "columnNoPhiVals", "groupFileName",
+        "deadtimeConstantsFileName", "spectrumNumbersForIncidentBeamMonitor",
+        "wavelengthRangeForMonitorNormalisation",
+        "spectrumNumbersForTransmissionMonitor",
+        "incidentMonitorQuietCountConst",
+        "transmissionMonitorQuietCountConst", "channelNosSpikeAnalysis",
+        "spikeAnalysisAcceptanceFactor", "wavelengthMin", "wavelengthMax",
+        "wavelengthStep", "NoSmoothsOnMonitor", "XMin", "XMax", "XStep",
+        "useLogarithmicBinning", "groupingParameterPanel",
+        "groupsAcceptanceFactor", "mergePower", "subSingleAtomScattering",
+        "mergeWeights", "incidentFlightPath",
+        "spectrumNumberForOutputDiagnosticFiles",
+        "neutronScatteringParametersFile", "scaleSelection",
+        "subWavelengthBinnedData", "GudrunStartFolder", "startupFileFolder",
+        "logarithmicStepSize", "hardGroupEdges", "nxsDefinitionFile",
+        "goodDetectorThreshold",
+        # Only set on copies shown in the output tree
+        "output"
+    )
+    yamlignore = frozenset({
+        "GudrunInputFileDir", "GudrunStartFolder", "startupFileFolder",
+        "goodDetectorThreshold"
+    })
+
     def __init__(self):
         """
         Constructs all the necessary attributes for the Instrument object.
@@ -168,14 +195,6 @@ class Instrument:
         self.nxsDefinitionFile = ""
         self.goodDetectorThreshold = 0
 
-        self.yamlignore = {
-            "GudrunInputFileDir",
-            "GudrunStartFolder",
-            "startupFileFolder",
-            "goodDetectorThreshold",
-            "yamlignore"
-        }
-
     def __str__(self):
         """
         Returns the string representation of the Instrument object.
@@ -1,3 +1,6 @@
+import numpy as np
+
+
 class Sears91():
 
     sears91Data = [
@@ -369,9 +372,42 @@ class Sears91():
 
     ]
 
+    # Columns of the table, by the name of their accessor
+    COLUMNS = (
+        "isotope", "element", "mass", "spin", "atwt",
+        "boundCoherent", "boundIncoherent", "boundCoherentXS",
+        "boundIncoherentXS", "totalXS", "absorptionXS"
+    )
+    # Columns holding numbers, which are also kept as arrays
+    NUMERIC_COLUMNS = COLUMNS[4:]
+
     def isotopeData(self, element, mass):
-        if self.isIsotope(element, mass):
-            return [isotope for isotope in self.sears91Data if self.element(isotope) == element and self.mass(isotope) == mass][0]
+        row = self.rows.get((element, mass))
+        if row is not None:
+            return self.sears91Data[row]
+
+    def row(self, element, mass):
+        """
+        Returns the row of an isotope in the table.
+
+        Parameters
+        ----------
+        element : str
+            Atomic symbol.
+        mass : int
+            Mass number, or 0 for the natural element.
+
+        Returns
+        -------
+        int
+            Index of the row.
+
+        Raises
+        ------
+        KeyError
+            If there is no such isotope.
+        """
+        return self.rows[(element, mass)]
 
     @staticmethod
     def isotope(isotope_):
@@ -418,20 +454,36 @@ class Sears91():
         return isotope[10]
 
     def isotopes(self, element):
-        return [
-            isotope
-            for isotope in self.sears91Data
-            if self.element(isotope) == element
-        ]
+        return list(self.byElement.get(element, ()))
 
     def findIsotope(self, element, mass):
-        for isotope in self.isotopes(element):
-            if self.mass(isotope) == mass:
-                return isotope
+        return self.isotopeData(element, mass)
 
     def isIsotope(self, element, mass):
-        isotopes = self.isotopes(element)
-        for isotope in isotopes:
-            if self.mass(isotope) == mass:
-                return True
-        return False
+        return (element, mass) in self.rows
+
+
+def _index(table):
+    """Builds the indices of the table, keeping the first row
+    of any isotope listed twice
+    """
+    rows = {}
+    byElement = {}
+    for i, isotope in enumerate(table):
+        rows.setdefault((Sears91.element(isotope), Sears91.mass(isotope)), i)
+        byElement.setdefault(Sears91.element(isotope), []).append(isotope)
+    columns = {}
+    for name in Sears91.NUMERIC_COLUMNS:
+        column = np.array(
+            [getattr(Sears91, name)(isotope) for isotope in table],
+            dtype=np.float64
+        )
+        column.flags.writeable = False
+        columns[name] = column
+    return rows, byElement, columns
+
+
+# Row of each isotope by (element, mass), the isotopes of each element,
+# and the numeric columns as arrays, for arithmetic over many isotopes
+Sears91.rows, Sears91.byElement, Sears91.columns = _index(
+    Sears91.sears91Data)
@@ -1,4 +1,3 @@
-from copy import deepcopy
 import math
 from enum import Enum
 
@@ -684,8 +683,8 @@ class Composition(Iterator):
                         wc for wc in sample.composition.weightedComponents
                         if self.components[0].eq(wc.component)
                     ]:
-                        sb = deepcopy(sampleBackground)
-                        sb.samples = [deepcopy(sample)]
+                        sb = sampleBackground.clone()
+                        sb.samples = [sample.clone()]
                         if self.mode == Composition.Mode.SINGLE:
                             self.sampleArgs.append({
                                 "sample": sample,
@@ -0,0 +1,316 @@
+import hashlib
+import json
+import os
+import typing as typ
+from dataclasses import asdict, dataclass
+
+import h5py as h5
+
+# Per-user cache of the indexes, so that nothing is written
+# to the data file directories, which may be read-only or shared
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".gudpy", "nexus_index")
+
+
+@dataclass
+class NexusMetadata:
+    """
+    Header metadata of a NeXus data file.
+
+    Attributes
+    ----------
+    mtime : float
+        Modification time of the file when it was read
+    charge : float
+        Integrated proton charge
+    goodFrames : int
+        Number of good frames
+    startTime : str
+        Start time of the run
+    endTime : str
+        End time of the run
+    """
+    mtime: float
+    charge: float = None
+    goodFrames: int = None
+    startTime: str = ""
+    endTime: str = ""
+
+
+def _scalar(dataset):
+    """Reads a small header dataset as a Python scalar
+    """
+    value = dataset[()]
+    if hasattr(value, "shape") and value.shape:
+        value = value.flat[0]
+    if isinstance(value, bytes):
+        return value.decode("utf-8", errors="replace")
+    return value.item() if hasattr(value, "item") else value
+
+
+def _attribute(group, name):
+    """Reads an attribute of a group as a Python scalar
+    """
+    value = group.attrs.get(name)
+    if hasattr(value, "shape") and value.shape:
+        value = value.flat[0]
+    if isinstance(value, bytes):
+        return value.decode("utf-8", errors="replace")
+    return value
+
+
+def readMetadata(path: str) -> NexusMetadata:
+    """Reads the header metadata of a NeXus file. Only the scalar
+    run information of the first entry is read, event data is not.
+
+    Parameters
+    ----------
+    path : str
+        Path to the NeXus file
+
+    Returns
+    -------
+    NexusMetadata
+        Metadata of the file
+
+    Raises
+    ------
+    OSError
+        Raised if the file cannot be read
+    """
+    metadata = NexusMetadata(mtime=os.path.getmtime(path))
+    with h5.File(path, "r") as fp:
+        entries = [
+            fp[key] for key in fp.keys() if isinstance(fp[key], h5.Group)
+        ]
+        nxEntries = [
+            e for e in entries
+            if _attribute(e, "NX_class") == "NXentry"
+        ]
+        entries = nxEntries or entries
+        if not entries:
+            return metadata
+        entry = entries[0]
+        fields = {
+            "charge": ("proton_charge", float),
+            "goodFrames": ("good_frames", int),
+            "startTime": ("start_time", str),
+            "endTime": ("end_time", str),
+        }
+        for attr, (key, type_) in fields.items():
+            if key in entry and isinstance(entry[key], h5.Dataset):
+                setattr(metadata, attr, type_(_scalar(entry[key])))
+    return metadata
+
+
+class NexusIndex:
+    """
+    Class to index the header metadata of NeXus data files.
+    The index is cached on disk, and an entry is re-read
+    only if the modification time of its file has changed.
+    """
+
+    def __init__(self, cachePath: str):
+        """
+        Parameters
+        ----------
+        cachePath : str
+            Path of the on-disk cache
+        """
+        self.cachePath = cachePath
+        self.entries: typ.Dict[str, NexusMetadata] = {}
+        self.modified = False
+        self.load()
+
+    @classmethod
+    def forDirectory(cls, dataFileDir: str):
+        """Creates the index of a data file directory, cached
+        in CACHE_DIR under a digest of the directory's path
+        """
+        key = hashlib.sha1(
+            os.path.abspath(dataFileDir).encode("utf-8")).hexdigest()
+        return cls(os.path.join(CACHE_DIR, f"{key}.json"))
+
+    def load(self):
+        if not os.path.exists(self.cachePath):
+            return
+        try:
+            with open(self.cachePath, "r", encoding="utf-8") as fp:
+                cached = json.load(fp)
+            self.entries = {
+                path: NexusMetadata(**metadata)
+                for path, metadata in cached.items()
+            }
+        except (OSError, ValueError, TypeError):
+            self.entries = {}
+
+    def save(self):
+        """Writes the index to the cache, if it has changed.
+        A cache which cannot be written is ignored.
+        """
+        if not self.modified:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.cachePath), exist_ok=True)
+            with open(self.cachePath, "w", encoding="utf-8") as fp:
+                json.dump(
+                    {
+                        path: asdict(metadata)
+                        for path, metadata in self.entries.items()
+                    },
+                    fp
+                )
+            self.modified = False
+        except OSError:
+            pass
+
+    def metadata(self, path: str) -> typ.Union[NexusMetadata, None]:
+        """Returns the metadata of a NeXus file
+
+        Parameters
+        ----------
+        path : str
+            Path to the NeXus file
+
+        Returns
+        -------
+        NexusMetadata | None
+            Metadata of the file, None if it cannot be read
+        """
+        key = os.path.abspath(path)
+        try:
+            mtime = os.path.getmtime(key)
+        except OSError:
+            return None
+        cached = self.entries.get(key)
+        if cached and cached.mtime == mtime:
+            return cached
+        try:
+            self.entries[key] = readMetadata(key)
+        except OSError:
+            return None
+        self.modified = True
+        return self.entries[key]
+
+    def charges(self, paths: typ.List[str]) -> typ.Union[list, None]:
+        """Returns the proton charge of each file, or None if the
+        charge of any file is unavailable
+        """
+        charges = []
+        for path in paths:
+            metadata = self.metadata(path)
+            if metadata is None or not metadata.charge:
+                self.save()
+                return None
+            charges.append(metadata.charge)
+        self.save()
+        return charges
+
+
+def chargeWindows(
+    charges: typ.List[float], batchSize: int, stepSize: int, offset: int = 0
+) -> typ.List[typ.Tuple[int, int]]:
+    """Forms batches of data files by cumulative proton charge.
+    The charge of a batch is `batchSize` times the mean charge of a
+    file, and consecutive batches start `stepSize` times the mean charge
+    apart. A file belongs to a batch if the midpoint of its charge falls
+    in it. Files of equal charge are batched exactly as by file count.
+
+    Parameters
+    ----------
+    charges : list[float]
+        Proton charge of each data file
+    batchSize : int
+        Size of a batch, in files of mean charge
+    stepSize : int
+        Step between batches, in files of mean charge
+    offset : int, optional
+        Number of data files to skip, by default 0
+
+    Returns
+    -------
+    list[tuple[int, int]]
+        List of (start, stop) indices of each batch
+    """
+    charges = charges[offset:]
+    if not charges:
+        return []
+    mean = sum(charges) / len(charges)
+    batchCharge = batchSize * mean
+    stepCharge = stepSize * mean
+
+    midpoints = []
+    total = 0.0
+    for charge in charges:
+        midpoints.append(total + charge / 2)
+        total += charge
+
+    windows = []
+    start = 0.0
+    # Compare with a tolerance, so equal charges match count batching
+    eps = mean * 1e-9
+    while start < total - eps:
+        members = [
+            i for i, m in enumerate(midpoints)
+            if start - eps <= m < start + batchCharge - eps
+        ]
+        if members:
+            windows.append((offset + members[0], offset + members[-1] + 1))
+        start += stepCharge
+    return windows
+
+
+def indexFor(instrument) -> typ.Union[NexusIndex, None]:
+    """Returns the index of the data files of an instrument,
+    or None if its data files are not NeXus files
+    """
+    if instrument.dataFileType.lower() != "nxs":
+        return None
+    return NexusIndex.forDirectory(instrument.dataFileDir)
+
+
+def batchWindows(
+    index: typ.Union[NexusIndex, None],
+    instrument,
+    dataFiles: typ.List[str],
+    nDataFiles: int,
+    batchSize: int,
+    stepSize: int,
+    offset: int = 0
+) -> typ.List[typ.Tuple[int, int]]:
+    """Returns the (start, stop) indices of each batch of the data files
+    of a sample. Batches of NeXus data files are formed by cumulative
+    proton charge where it is available, otherwise by file count.
+
+    Parameters
+    ----------
+    index : NexusIndex | None
+        Index of the data files, as returned by indexFor
+    instrument : Instrument
+        Instrument of the input file being batched
+    dataFiles : list[str]
+        Data files of the sample
+    nDataFiles : int
+        Number of data files to batch by file count
+    batchSize : int
+        Size of a batch
+    stepSize : int
+        Step between batches
+    offset : int, optional
+        Number of data files to skip, by default 0
+
+    Returns
+    -------
+    list[tuple[int, int]]
+        Bounds of each batch
+    """
+    if index is not None and len(dataFiles):
+        charges = index.charges([
+            os.path.join(instrument.dataFileDir, dataFile)
+            for dataFile in dataFiles
+        ])
+        if charges:
+            return chargeWindows(charges, batchSize, stepSize, offset)
+    return [
+        (i, i + batchSize)
+        for i in range(offset, nDataFiles, stepSize)
+    ]
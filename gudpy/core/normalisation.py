@@ -5,9 +5,10 @@ from core.enums import (
     CrossSectionSource, Geometry, UnitsOfDensity
 )
 from core import config
+from core.copy_on_write import CopyOnWrite
 
 
-class Normalisation:
+class Normalisation(CopyOnWrite):
     """
     Class to represent Normalisation.
 
@@ -65,6 +66,8 @@ class Normalisation:
     -------
     """
 
+    yamlignore = frozenset()
+
     def __init__(self):
         """
         Constructs all the necessary attributes for the Normalistion object.
@@ -97,10 +100,6 @@ class Normalisation:
         self.normalisationDegreeSmoothing = 0.0
         self.minNormalisationSignalBR = 0.0
 
-        self.yamlignore = {
-            "yamlignore"
-        }
-
     def __str__(self):
         """
         Returns the string representation of the Normalisation object.
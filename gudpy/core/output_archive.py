@@ -0,0 +1,316 @@
+import os
+import typing as typ
+import warnings
+
+import h5py as h5
+import numpy as np
+
+from core.curve_file import CurveFile
+from core.exception import ParserException
+from core.gud_file import GudFile
+
+ARCHIVE_EXT = ".h5"
+ARCHIVE_VERSION = 1
+# Group holding the mapping of samples to their outputs
+MAPPING_GROUP = "_gudpy"
+COMPRESSION = "gzip"
+COMPRESSION_LEVEL = 4
+
+
+def archivePath(outputDir: str) -> str:
+    """Returns the path of the archive of an output directory
+    """
+    return f"{os.path.normpath(outputDir)}{ARCHIVE_EXT}"
+
+
+def _parseNumeric(
+    data: bytes
+) -> typ.Union[typ.Tuple[typ.List[str], np.ndarray], None]:
+    """Parses a file of whitespace separated columns of numbers,
+    following an optional '#' header. Returns None if the file is not
+    entirely numeric.
+    """
+    try:
+        text = data.decode("utf-8")
+    except UnicodeDecodeError:
+        return None
+    lines = text.splitlines(keepends=True)
+    header = []
+    for line in lines:
+        if not line.startswith("#"):
+            break
+        header.append(line)
+    body = lines[len(header):]
+    if not any(line.strip() for line in body):
+        return None
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", UserWarning)
+            array = np.loadtxt(body, comments="#", ndmin=2, dtype=np.float64)
+    except ValueError:
+        return None
+    return header, array
+
+
+def _compressed(size: int) -> dict:
+    """Returns the storage options of a dataset. Empty datasets
+    cannot be chunked.
+    """
+    if not size:
+        return {}
+    return {
+        "chunks": True,
+        "compression": COMPRESSION,
+        "compression_opts": COMPRESSION_LEVEL,
+        "shuffle": True,
+    }
+
+
+def _writeFile(group: h5.Group, name: str, path: str):
+    """Stores a file as a dataset. Numeric files are stored as
+    float arrays with their header as an attribute, other text files
+    as arrays of lines, and anything else as raw bytes.
+    """
+    with open(path, "rb") as fp:
+        data = fp.read()
+
+    numeric = _parseNumeric(data)
+    if numeric:
+        header, array = numeric
+        dataset = group.create_dataset(
+            name, data=array, **_compressed(array.size))
+        dataset.attrs["kind"] = "numeric"
+        dataset.attrs["header"] = "".join(header)
+    elif b"\0" not in data:
+        lines = np.array(data.splitlines(keepends=True), dtype=np.bytes_)
+        dataset = group.create_dataset(
+            name, data=lines, **_compressed(lines.size))
+        dataset.attrs["kind"] = "text"
+    else:
+        array = np.frombuffer(data, dtype=np.uint8)
+        dataset = group.create_dataset(
+            name, data=array, **_compressed(array.size))
+        dataset.attrs["kind"] = "binary"
+
+
+def _relative(path: str, root: str) -> str:
+    return os.path.relpath(path, root).replace(os.sep, "/") if path else ""
+
+
+def writeArchive(
+    treeDir: str,
+    outputDir: str,
+    inputFilePath: str,
+    sampleOutputs: dict,
+    target: str = ""
+) -> str:
+    """Writes an organised output directory into a single HDF5 file.
+    Directories become groups and files become datasets. The mapping
+    of samples to their outputs is stored as attributes, so that a
+    GudrunOutput can be read back from the archive alone.
+
+    Parameters
+    ----------
+    treeDir : str
+        Directory holding the organised outputs
+    outputDir : str
+        Directory the outputs are addressed by, which the paths of
+        `inputFilePath` and `sampleOutputs` are relative to
+    inputFilePath : str
+        Path to the input file of the run
+    sampleOutputs : Dict[str, SampleOutput]
+        Outputs of each sample
+    target : str, optional
+        Path of the archive, by default next to `outputDir`
+
+    Returns
+    -------
+    str
+        Path of the archive
+    """
+    target = target or archivePath(outputDir)
+    tmp = f"{target}.tmp"
+    with h5.File(tmp, "w") as archive:
+        archive.attrs["version"] = ARCHIVE_VERSION
+        archive.attrs["inputFilePath"] = _relative(inputFilePath, outputDir)
+
+        for root, dirs, files in os.walk(treeDir):
+            dirs.sort()
+            rel = os.path.relpath(root, treeDir)
+            group = (
+                archive if rel == os.curdir
+                else archive.require_group(rel.replace(os.sep, "/"))
+            )
+            for f in sorted(files):
+                _writeFile(group, f, os.path.join(root, f))
+
+        mapping = archive.create_group(f"{MAPPING_GROUP}/sampleOutputs")
+        for i, (name, sampleOutput) in enumerate(sampleOutputs.items()):
+            group = mapping.create_group(str(i))
+            group.attrs["name"] = name
+            group.attrs["sampleFile"] = _relative(
+                sampleOutput.sampleFile, outputDir)
+            for kind in ("outputs", "diagnostics"):
+                kindGroup = group.create_group(kind)
+                for j, (dataFile, paths) in enumerate(
+                        getattr(sampleOutput, kind).items()):
+                    dataGroup = kindGroup.create_group(str(j))
+                    dataGroup.attrs["dataFile"] = dataFile
+                    for ext, path in paths.items():
+                        dataGroup.attrs[ext] = _relative(path, outputDir)
+    os.replace(tmp, target)
+    return target
+
+
+class GudrunArchive:
+    """
+    Class to read an archive of the outputs of a Gudrun run.
+    The file is opened on first access, and datasets are only
+    read when requested.
+
+    ...
+
+    Attributes
+    ----------
+    path : str
+        Path to the archive.
+    outputDir : str
+        Directory the outputs are addressed by.
+    """
+
+    def __init__(self, path: str, outputDir: str = ""):
+        self.path = path
+        self.outputDir = outputDir or os.path.splitext(path)[0]
+        self._file = None
+
+    @property
+    def file(self) -> h5.File:
+        if self._file is None:
+            try:
+                self._file = h5.File(self.path, "r")
+            except OSError as e:
+                raise ParserException(
+                    f"Could not open output archive {self.path}. {e}"
+                ) from e
+        return self._file
+
+    def __getstate__(self):
+        # Copies open the file again when needed
+        state = self.__dict__.copy()
+        state["_file"] = None
+        return state
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def relative(self, path: str) -> str:
+        """Returns the key of an output, given its path
+        """
+        return _relative(path, self.outputDir)
+
+    def absolute(self, key: str) -> str:
+        """Returns the path of an output, given its key
+        """
+        if not key:
+            return ""
+        return os.path.join(self.outputDir, *key.split("/"))
+
+    def dataset(self, path: str) -> h5.Dataset:
+        try:
+            dataset = self.file[self.relative(path)]
+        except KeyError:
+            raise ParserException(f"{path} is not in {self.path}")
+        if not isinstance(dataset, h5.Dataset):
+            raise ParserException(f"{path} is not a file of {self.path}")
+        return dataset
+
+    def __contains__(self, path: str) -> bool:
+        return isinstance(self.file.get(self.relative(path)), h5.Dataset)
+
+    def readArray(self, path: str) -> typ.Tuple[typ.List[str], np.ndarray]:
+        """Reads a numeric output
+
+        Parameters
+        ----------
+        path : str
+            Path of the output
+
+        Returns
+        -------
+        tuple[str[], np.ndarray]
+            Header lines, and array of shape (rows, columns)
+        """
+        dataset = self.dataset(path)
+        if dataset.attrs["kind"] != "numeric":
+            raise ParserException(f"{path} is not a numeric output")
+        header = dataset.attrs["header"].splitlines(keepends=True)
+        return header, dataset[()]
+
+    def readText(self, path: str) -> str:
+        """Reads a text output. Numeric outputs are written back
+        in the default NumPy format.
+        """
+        dataset = self.dataset(path)
+        kind = dataset.attrs["kind"]
+        if kind == "text":
+            return b"".join(dataset[()].tolist()).decode(
+                "utf-8", errors="replace")
+        if kind == "numeric":
+            lines = [dataset.attrs["header"]]
+            lines.extend(
+                " ".join(repr(v) for v in row) + "\n"
+                for row in dataset[()].tolist()
+            )
+            return "".join(lines)
+        return dataset[()].tobytes().decode("utf-8", errors="replace")
+
+    def curve(self, path: str) -> CurveFile:
+        """Reads an output curve
+        """
+        header, array = self.readArray(path)
+        if array.shape[1] < 3:
+            raise ParserException(f"{path} does not have 3 columns")
+        data = np.ascontiguousarray(array[:, :3].T)
+        return CurveFile.fromData(path, header, data)
+
+    def gudFile(self, path: str) -> GudFile:
+        """Reads a .gud file
+        """
+        text = self.readText(path)
+        return GudFile(path, text.splitlines(keepends=True))
+
+    def sampleOutputs(self) -> typ.Dict[str, dict]:
+        """Reads the mapping of samples to their outputs
+
+        Returns
+        -------
+        Dict[str, dict]
+            Dictionary mapping sample names to their sample file,
+            and their outputs and diagnostics by data file
+        """
+        sampleOutputs = {}
+        mapping = self.file[f"{MAPPING_GROUP}/sampleOutputs"]
+        for i in sorted(mapping, key=int):
+            group = mapping[i]
+            entry = {"sampleFile": self.absolute(group.attrs["sampleFile"])}
+            for kind in ("outputs", "diagnostics"):
+                entry[kind] = {}
+                for j in sorted(group[kind], key=int):
+                    attrs = dict(group[kind][j].attrs)
+                    dataFile = attrs.pop("dataFile")
+                    entry[kind][dataFile] = {
+                        ext: self.absolute(key) for ext, key in attrs.items()
+                    }
+            sampleOutputs[group.attrs["name"]] = entry
+        return sampleOutputs
+
+    def inputFilePath(self) -> str:
+        return self.absolute(self.file.attrs["inputFilePath"])
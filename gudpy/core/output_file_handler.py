@@ -1,3 +1,4 @@
+import json
 import os
 import shutil
 import typing
@@ -5,8 +6,18 @@ from dataclasses import dataclass
 import tempfile
 
 import core.utils as utils
-from core.gud_file import GudFile
+from core import enums
+from core.curve_cache import loadCurve
+from core.curve_file import CurveFile
+from core.gud_file import GudFile, parseGudFiles
+from core.exception import ParserException
 from core.gudrun_file import GudrunFile
+from core.output_archive import GudrunArchive, archivePath, writeArchive
+
+# File recording the fingerprints of the inputs of the samples
+# whose outputs are in an output directory
+MANIFEST = "fingerprints.json"
+MANIFEST_VERSION = 1
 
 
 @dataclass
@@ -22,20 +33,72 @@ class GudrunOutput:
     path: str
     inputFilePath: str
     sampleOutputs: typing.Dict[str, SampleOutput]
+    # Archive the outputs are read from, if the directory was not kept
+    archive: GudrunArchive = None
+
+    @classmethod
+    def fromArchive(cls, path: str, outputDir: str = ""):
+        """Reads the outputs of a run from its archive. Only the mapping
+        of samples to outputs is read; files are read when requested.
+
+        Parameters
+        ----------
+        path : str
+            Path to the archive
+        outputDir : str, optional
+            Directory the outputs were organised into, by default
+            the path of the archive without its extension
+
+        Returns
+        -------
+        GudrunOutput
+        """
+        archive = GudrunArchive(path, outputDir)
+        sampleOutputs = {
+            name: SampleOutput(
+                entry["sampleFile"], None,
+                entry["outputs"], entry["diagnostics"]
+            )
+            for name, entry in archive.sampleOutputs().items()
+        }
+        return cls(path=archive.outputDir,
+                   inputFilePath=archive.inputFilePath(),
+                   sampleOutputs=sampleOutputs,
+                   archive=archive)
+
+    def directory(self) -> str:
+        """Returns the directory holding the outputs, or the archive
+        if the directory was not kept
+        """
+        if self.archive and not os.path.isdir(self.path):
+            return os.path.dirname(self.archive.path)
+        return self.path
 
     def gudFiles(self) -> list[str]:
-        return [so.gudFile for so in self.sampleOutputs.values()]
+        return [self._gudFile(so) for so in self.sampleOutputs.values()]
 
     def gudFile(self, idx: int = None, *, name: str = None) -> GudFile:
         try:
             if idx is not None:
                 asList = list(self.sampleOutputs.values())
-                return asList[idx].gudFile
+                return self._gudFile(asList[idx])
             elif name is not None:
-                return self.sampleOutputs[name].gudFile
+                return self._gudFile(self.sampleOutputs[name])
         except KeyError:
             return None
 
+    def _gudFile(self, sampleOutput: SampleOutput) -> GudFile:
+        """Returns the GudFile of a sample, reading it from the
+        archive on first access
+        """
+        if sampleOutput.gudFile is None and self.archive:
+            for outputs in sampleOutput.outputs.values():
+                if ".gud" in outputs:
+                    sampleOutput.gudFile = self.archive.gudFile(
+                        outputs[".gud"])
+                    break
+        return sampleOutput.gudFile
+
     def output(self, name: str, dataFile: str, type: str) -> str:
         try:
             if type in GudrunOutputHandler.outputExts:
@@ -45,6 +108,68 @@ class GudrunOutput:
         except KeyError:
             return None
 
+    def curve(self, name: str, dataFile: str, type: str) -> CurveFile:
+        """Returns an output curve of a sample, from the archive
+        or the output directory
+        """
+        path = self.output(name, dataFile, type)
+        if not path:
+            return None
+        if self.archive:
+            return self.archive.curve(path)
+        return loadCurve(path)
+
+
+def readManifest(
+    outputDir: str
+) -> typing.Dict[str, typing.Tuple[str, SampleOutput]]:
+    """
+    Reads the fingerprints and outputs of the samples recorded in an
+    output directory. The .gud files are not read.
+
+    Parameters
+    ----------
+    outputDir : str
+        Output directory to read the manifest of
+
+    Returns
+    -------
+    Dict[str, Tuple[str, SampleOutput]]
+        Sample names mapped to their fingerprints and outputs, empty if
+        the directory has no readable manifest
+    """
+    def absolute(path):
+        return os.path.join(outputDir, path) if path else ""
+
+    try:
+        with open(
+            os.path.join(outputDir, MANIFEST), "r", encoding="utf-8"
+        ) as fp:
+            manifest = json.load(fp)
+        if manifest["version"] != MANIFEST_VERSION:
+            return {}
+        return {
+            name: (
+                sample["fingerprint"],
+                SampleOutput(
+                    absolute(sample["sampleFile"]), None,
+                    {
+                        dataFile: {
+                            ext: absolute(p) for ext, p in paths.items()}
+                        for dataFile, paths in sample["outputs"].items()
+                    },
+                    {
+                        dataFile: {
+                            ext: absolute(p) for ext, p in paths.items()}
+                        for dataFile, paths in sample["diagnostics"].items()
+                    }
+                )
+            )
+            for name, sample in manifest["samples"].items()
+        }
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        return {}
+
 
 class OutputHandler:
     """Class to organise output files
@@ -109,7 +234,10 @@ class GudrunOutputHandler(OutputHandler):
         self,
         gudrunFile: GudrunFile,
         head: str = "",
-        overwrite: bool = True
+        overwrite: bool = True,
+        archive: enums.OutputArchive = enums.OutputArchive.NONE,
+        carried: typing.Dict[str, SampleOutput] = None,
+        fingerprints: typing.Dict[str, str] = None
     ):
         """
         Initialise `GudrunOutputHandler`
@@ -123,6 +251,16 @@ class GudrunOutputHandler(OutputHandler):
         overwrite : bool, optional
             Whether or not to overwrite previous output directiory,
             by default True
+        archive : OutputArchive, optional
+            Whether to also, or only, write the outputs into a single
+            HDF5 archive, by default OutputArchive.NONE
+        carried : Dict[str, SampleOutput], optional
+            Outputs of samples which were not run again, to be carried
+            over from the previous output directory, by default None
+        fingerprints : Dict[str, str], optional
+            Fingerprints of the inputs of the samples, recorded in the
+            output directory so that unchanged samples can be carried
+            over by the next run, by default None
         """
 
         super().__init__(
@@ -132,6 +270,9 @@ class GudrunOutputHandler(OutputHandler):
         )
 
         self.overwrite = overwrite
+        self.archive = archive
+        self.carried = carried or {}
+        self.fingerprints = fingerprints or {}
         # Append head to path
         self.outputDir = os.path.join(self.outputDir, f"{head}")
 
@@ -167,29 +308,70 @@ class GudrunOutputHandler(OutputHandler):
         GudrunOutput : GudrunOutput
             Dataclass containing information about important paths
         """
+        # A run which keeps the previous outputs is given its own
+        # directory and archive
+        if not self.overwrite:
+            self.outputDir = self._uniqueOutputDir()
+        # List the outputs once, grouped by the run they belong to
+        self.filesByStem = self._indexFiles()
         # Create normalisation and sample background folders
         self._createNormDir(self.tempOutDir)
         self._createSampleBgDir(self.tempOutDir)
         # Create sample folders
         sampleOutputs = self._createSampleDir(self.tempOutDir)
+        if self.carried:
+            sampleOutputs = self._carrySampleDirs(
+                self.tempOutDir, sampleOutputs)
         # Create additonal output folders
         inputFilePath = self._createAddOutDir(self.tempOutDir, exclude)
-
-        # If overwrite, move previous directory
-        if self.overwrite and os.path.exists(
-                os.path.join(self.gudrunFile.projectDir, "Gudrun")):
-            with tempfile.TemporaryDirectory() as tmp:
-                shutil.move(os.path.join(self.gudrunFile.projectDir, "Gudrun"),
-                            os.path.join(tmp, "prev"))
+        if self.fingerprints:
+            self._writeManifest(self.tempOutDir, sampleOutputs)
+
+        # If overwrite, move previous directory and remove its archive
+        if self.overwrite:
+            gudrunDir = os.path.join(self.gudrunFile.projectDir, "Gudrun")
+            if os.path.exists(gudrunDir):
+                with tempfile.TemporaryDirectory() as tmp:
+                    shutil.move(gudrunDir, os.path.join(tmp, "prev"))
+            if os.path.isfile(archivePath(gudrunDir)):
+                os.remove(archivePath(gudrunDir))
+
+        if self.archive != enums.OutputArchive.NONE:
+            utils.makeDir(os.path.dirname(os.path.normpath(self.outputDir)))
+            path = writeArchive(
+                self.tempOutDir, self.outputDir,
+                inputFilePath, sampleOutputs
+            )
+            if self.archive == enums.OutputArchive.ONLY:
+                shutil.rmtree(self.tempOutDir)
+                return GudrunOutput.fromArchive(path, self.outputDir)
 
         # Move over folders to output directory
-        shutil.move(self.tempOutDir, utils.uniquify(self.outputDir))
+        shutil.move(self.tempOutDir, self.outputDir)
 
         return GudrunOutput(path=self.outputDir,
                             inputFilePath=inputFilePath,
                             sampleOutputs=sampleOutputs
                             )
 
+    def _uniqueOutputDir(self) -> str:
+        """
+        Returns an output directory which is not used by a directory
+        or by an archive.
+
+        Returns
+        -------
+        outputDir : str
+            Path to the output directory
+        """
+        outputDir = os.path.normpath(self.outputDir)
+        path = outputDir
+        count = 1
+        while os.path.exists(path) or os.path.exists(archivePath(path)):
+            path = f"{outputDir}_{count}"
+            count += 1
+        return path
+
     def _createNormDir(self, dest: str):
         """
         Creates directories for normalisation background
@@ -255,10 +437,10 @@ class GudrunOutputHandler(OutputHandler):
 
         """
         sampleOutputs = {}
+        gudPaths = {}
         # Create sample folders within background folders
         for sample in self.samples:
             sampleFile = ""
-            gudFile = None
             sampleOutput = {}
             sampleDiag = {}
 
@@ -268,13 +450,13 @@ class GudrunOutputHandler(OutputHandler):
             )
             # Move datafiles to sample folder
             for idx, dataFile in enumerate(sample.dataFiles):
-                out, diag, gf = self._copyOutputsByExt(
+                out, diag, gudPath = self._copyOutputsByExt(
                     dataFile,
                     samplePath,
                     utils.replace_unwanted_chars(sample.name)
                 )
-                if idx == 0:
-                    gudFile = gf
+                if idx == 0 and gudPath:
+                    gudPaths[sample.name] = gudPath
                 sampleOutput[dataFile] = out
                 sampleDiag[dataFile] = diag
 
@@ -295,7 +477,7 @@ class GudrunOutputHandler(OutputHandler):
                 sample.pathName())
 
             sampleOutputs[sample.name] = SampleOutput(
-                sampleFile, gudFile, sampleOutput, sampleDiag)
+                sampleFile, None, sampleOutput, sampleDiag)
 
             # Create container folders within sample folder
             for container in sample.containers:
@@ -309,8 +491,96 @@ class GudrunOutputHandler(OutputHandler):
                         dataFile,
                         containerPath
                     )
+
+        # Parse the .gud file of each sample concurrently
+        gudFiles, errors = parseGudFiles(list(gudPaths.values()))
+        if errors:
+            raise ParserException("\n".join(
+                f"{path}: {error}" for path, error in errors.items()))
+        for name, path in gudPaths.items():
+            sampleOutputs[name].gudFile = gudFiles[path]
         return sampleOutputs
 
+    def _carrySampleDirs(self, dest: str, sampleOutputs):
+        """
+        Copies the output directories of samples which were not run
+        again from the previous output directory, before it is replaced.
+
+        Parameters
+        ----------
+        dest : str
+            Path to target output directory
+        sampleOutputs : Dict[str, SampleOutput]
+            Outputs of the samples which were run
+
+        Returns
+        --------
+        sampleOutputs : Dict[str, SampleOutput]
+            Outputs of the samples which were run and of those carried
+            over, in the order of the samples
+        """
+        gudPaths = {}
+        for name, sampleOutput in self.carried.items():
+            dirName = utils.replace_unwanted_chars(name)
+            shutil.copytree(
+                os.path.join(self.outputDir, dirName),
+                os.path.join(dest, dirName),
+                dirs_exist_ok=True
+            )
+            if sampleOutput.gudFile is None:
+                for outputs in sampleOutput.outputs.values():
+                    if ".gud" in outputs:
+                        gudPaths[name] = outputs[".gud"]
+                        break
+        # Read the .gud files of samples carried over from a manifest
+        gudFiles, _ = parseGudFiles(list(gudPaths.values()))
+        for name, path in gudPaths.items():
+            self.carried[name].gudFile = gudFiles.get(path)
+        merged = {}
+        for sampleBackground in self.gudrunFile.sampleBackgrounds:
+            for sample in sampleBackground.samples:
+                if sample.name in sampleOutputs:
+                    merged[sample.name] = sampleOutputs[sample.name]
+                elif sample.name in self.carried:
+                    merged[sample.name] = self.carried[sample.name]
+        return merged
+
+    def _writeManifest(self, dest: str, sampleOutputs):
+        """
+        Records the fingerprints of the samples and the paths of their
+        outputs, relative to the output directory.
+
+        Parameters
+        ----------
+        dest : str
+            Path to target output directory
+        sampleOutputs : Dict[str, SampleOutput]
+            Outputs of the samples
+        """
+        def relative(path):
+            return os.path.relpath(path, self.outputDir) if path else ""
+
+        samples = {}
+        for name, sampleOutput in sampleOutputs.items():
+            if name not in self.fingerprints:
+                continue
+            samples[name] = {
+                "fingerprint": self.fingerprints[name],
+                "sampleFile": relative(sampleOutput.sampleFile),
+                "outputs": {
+                    dataFile: {ext: relative(p) for ext, p in paths.items()}
+                    for dataFile, paths in sampleOutput.outputs.items()
+                },
+                "diagnostics": {
+                    dataFile: {ext: relative(p) for ext, p in paths.items()}
+                    for dataFile, paths in sampleOutput.diagnostics.items()
+                }
+            }
+        with open(
+            os.path.join(dest, MANIFEST), "w", encoding="utf-8"
+        ) as fp:
+            json.dump({"version": MANIFEST_VERSION, "samples": samples}, fp)
+
     def _createAddOutDir(self, dest: str, exclude: list[str] = []):
         """
         Copy over all files that haven't been copied over,
@@ -349,6 +619,21 @@ class GudrunOutputHandler(OutputHandler):
                     continue
         return inputFile
 
+    def _indexFiles(self):
+        """
+        Groups the files in the Gudrun directory by their name,
+        without extension, preserving the order they are listed in.
+
+        Returns
+        -------
+        filesByStem : Dict[str, str[]]
+            Dictionary mapping names to filenames
+        """
+        filesByStem = {}
+        for f in os.listdir(self.gudrunDir):
+            filesByStem.setdefault(os.path.splitext(f)[0], []).append(f)
+        return filesByStem
+
     def _copyOutputs(self, fpath, dest):
         """
         Copy all files with the same basename
@@ -366,18 +651,17 @@ class GudrunOutputHandler(OutputHandler):
         fname = os.path.splitext(fpath)[0]
         runDir = os.path.join(dest, fname)
         dirCreated = False
-        for f in os.listdir(self.gudrunDir):
-            # Get files with the same filename but not the same
-            # extension
-            if os.path.splitext(f)[0] == fname:
-                if not dirCreated:
-                    utils.makeDir(runDir)
-                    dirCreated = True
-                shutil.copyfile(
-                    os.path.join(self.gudrunDir, f),
-                    os.path.join(runDir, f)
-                )
-                self.copiedFiles.append(f)
+        # Get files with the same filename but not the same
+        # extension
+        for f in self.filesByStem.get(fname, []):
+            if not dirCreated:
+                utils.makeDir(runDir)
+                dirCreated = True
+            shutil.copyfile(
+                os.path.join(self.gudrunDir, f),
+                os.path.join(runDir, f)
+            )
+            self.copiedFiles.append(f)
 
     def _copyOutputsByExt(self, fpath, dest, folderName):
         """
@@ -412,31 +696,31 @@ class GudrunOutputHandler(OutputHandler):
 
         outputs = {}
         diagnostics = {}
-        gudFile = None
-
-        for f in os.listdir(self.gudrunDir):
-            # If the file has the same name as requested filename
-            fn, ext = os.path.splitext(f)
-            if fn == fname:
-                if not dirCreated:
-                    # Path to folder which will hold Gudrun outputs
-                    outDir = utils.makeDir(os.path.join(runDir, "Outputs"))
-                    # Path to folder which will hold Gudrun diagnostic outputs
-                    diagDir = utils.makeDir(
-                        os.path.join(runDir, "Diagnostics"))
-                # Set dir depending on file extension
-                dir = outDir if ext in self.outputExts else diagDir
-                if dir == outDir:
-                    if ext == ".gud":
-                        gudFile = GudFile(os.path.join(self.gudrunDir, f))
-                    outputs[ext] = os.path.join(
-                        self.outputDir, folderName, fname, "Outputs", f)
-                else:
-                    diagnostics[ext] = os.path.join(
-                        self.outputDir, folderName, fname, "Diagnostics", f)
-                shutil.copyfile(
-                    os.path.join(self.gudrunDir, f),
-                    os.path.join(dir, f)
-                )
-                self.copiedFiles.append(f)
-        return (outputs, diagnostics, gudFile)
+        gudPath = ""
+
+        # Files with the same name as requested filename
+        for f in self.filesByStem.get(fname, []):
+            ext = os.path.splitext(f)[1]
+            if not dirCreated:
+                # Path to folder which will hold Gudrun outputs
+                outDir = utils.makeDir(os.path.join(runDir, "Outputs"))
+                # Path to folder which will hold Gudrun diagnostic outputs
+                diagDir = utils.makeDir(
+                    os.path.join(runDir, "Diagnostics"))
+                dirCreated = True
+            # Set dir depending on file extension
+            dir = outDir if ext in self.outputExts else diagDir
+            if dir == outDir:
+                if ext == ".gud":
+                    gudPath = os.path.join(self.gudrunDir, f)
+                outputs[ext] = os.path.join(
+                    self.outputDir, folderName, fname, "Outputs", f)
+            else:
+                diagnostics[ext] = os.path.join(
+                    self.outputDir, folderName, fname, "Diagnostics", f)
+            shutil.copyfile(
+                os.path.join(self.gudrunDir, f),
+                os.path.join(dir, f)
+            )
+            self.copiedFiles.append(f)
+        return (outputs, diagnostics, gudPath)
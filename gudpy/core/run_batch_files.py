@@ -1,4 +1,3 @@
-from copy import deepcopy
 import os
 from core.enums import IterationModes
 from core import iterators
@@ -11,10 +10,10 @@ class BatchProcessor:
     def batch(self, batchSize, stepSize, separateFirstBatch, offset=0):
 
         if not separateFirstBatch:
-            batch = deepcopy(self.gudrunFile)
+            batch = self.gudrunFile.clone()
             batch.sampleBackgrounds = []
             for sampleBackground in self.gudrunFile.sampleBackgrounds:
-                batchedSampleBackground = deepcopy(sampleBackground)
+                batchedSampleBackground = sampleBackground.clone()
                 batchedSampleBackground.samples = []
                 maxDataFiles = max(
                     [
@@ -24,7 +23,7 @@ class BatchProcessor:
                 )
                 for sample in sampleBackground.samples:
                     for i in range(offset, maxDataFiles, stepSize):
-                        batchedSample = deepcopy(sample)
+                        batchedSample = sample.clone()
                         batchedSample.dataFiles.dataFiles = sample.dataFiles[
                             i: i + batchSize
                         ]
@@ -33,13 +32,13 @@ class BatchProcessor:
 
             return batch
         else:
-            first = deepcopy(self.gudrunFile)
+            first = self.gudrunFile.clone()
             first.sampleBackgrounds = []
             for sampleBackground in self.gudrunFile.sampleBackgrounds:
-                batchedSampleBackground = deepcopy(sampleBackground)
+                batchedSampleBackground = sampleBackground.clone()
                 batchedSampleBackground.samples = []
                 for sample in sampleBackground.samples:
-                    batchedSample = deepcopy(sample)
+                    batchedSample = sample.clone()
                     batchedSample.dataFiles.dataFiles = (
                         sample.dataFiles[:batchSize]
                     )
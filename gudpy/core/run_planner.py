@@ -0,0 +1,324 @@
+import json
+import os
+import statistics
+import threading
+import typing as typ
+from dataclasses import dataclass, field
+
+from core import fingerprint
+from core import nexus_index
+from core.gudrun_file import GudrunFile
+
+# Default history of the command line interface and GUI
+HISTORY_PATH = os.path.join(
+    os.path.expanduser("~"), ".gudpy", "run_history.jsonl"
+)
+# Runs may be recorded from several threads at once
+_recordLock = threading.Lock()
+
+
+def runSamples(gudrunFile: GudrunFile) -> list:
+    """Returns the samples which gudrun_dcs will process
+    """
+    return [
+        sample
+        for sampleBackground in gudrunFile.sampleBackgrounds
+        for sample in sampleBackground.samples
+        if sample.runThisSample
+    ]
+
+
+def runDataFiles(gudrunFile: GudrunFile) -> int:
+    """Returns the number of sample data files which gudrun_dcs will process
+    """
+    return sum(len(sample.dataFiles) for sample in runSamples(gudrunFile))
+
+
+def directorySize(path: str) -> int:
+    """Returns the total size of the files within a directory, in bytes
+    """
+    return sum(
+        os.path.getsize(os.path.join(root, f))
+        for root, _, files in os.walk(path)
+        for f in files
+    )
+
+
+@dataclass
+class RunPlan:
+    """
+    Plan of the gudrun_dcs invocations implied by a task.
+
+    Attributes
+    ----------
+    task : str
+        Name of the task being planned
+    instrument : str
+        Name of the instrument
+    runs : list[int]
+        Number of samples processed by each invocation of gudrun_dcs
+    upperBound : bool
+        Whether the task may finish early, making `runs` an upper bound
+    duration : float
+        Estimated wall time in seconds, None if there is no history
+    diskUsage : int
+        Estimated size of the outputs in bytes, None if there is no history
+    """
+    task: str
+    instrument: str
+    runs: typ.List[int] = field(default_factory=list)
+    upperBound: bool = False
+    duration: float = None
+    diskUsage: int = None
+
+    @property
+    def nRuns(self) -> int:
+        return len(self.runs)
+
+    @property
+    def nSamples(self) -> int:
+        return sum(self.runs)
+
+
+class RunHistory:
+    """
+    Class to record the duration and output size of previous
+    gudrun_dcs runs, and to estimate the cost of planned runs from them.
+    Each run is appended as a line of JSON to the history file.
+    A history without a file neither records nor estimates runs.
+
+    ...
+
+    Attributes
+    ----------
+    path : str
+        Path to the history file, or None.
+    """
+
+    def __init__(self, path: str = None):
+        self.path = path
+
+    def record(
+        self,
+        instrument: str,
+        nSamples: int,
+        duration: float,
+        size: int,
+        nDataFiles: int = None
+    ):
+        """Appends a run to the history file
+
+        Parameters
+        ----------
+        instrument : str
+            Name of the instrument
+        nSamples : int
+            Number of samples processed
+        duration : float
+            Wall time of the run in seconds
+        size : int
+            Size of the outputs in bytes
+        nDataFiles : int, optional
+            Number of sample data files processed, by default None
+        """
+        if not self.path:
+            return
+        line = json.dumps({
+            "instrument": instrument,
+            "samples": nSamples,
+            "duration": duration,
+            "size": size,
+            "dataFiles": nDataFiles
+        }) + "\n"
+        with _recordLock:
+            os.makedirs(
+                os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as fp:
+                fp.write(line)
+
+    def entries(self, instrument: str = None) -> typ.List[dict]:
+        """Returns the recorded runs of an instrument, or of all
+        instruments if none is given, skipping any unreadable lines
+        """
+        if not self.path or not os.path.exists(self.path):
+            return []
+        entries = []
+        with open(self.path, "r", encoding="utf-8") as fp:
+            for line in fp:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if instrument is None or entry.get("instrument") == instrument:
+                    entries.append(entry)
+        return entries
+
+    @staticmethod
+    def _estimate(entries: typ.List[dict], key: str, nSamples: int):
+        """Estimates `key` for a run of `nSamples` samples. Runs with the
+        same number of samples are used if any were recorded, otherwise
+        the mean cost per sample is scaled.
+        """
+        exact = [e[key] for e in entries if e["samples"] == nSamples]
+        if exact:
+            return statistics.mean(exact)
+        perSample = [e[key] / e["samples"] for e in entries if e["samples"]]
+        if perSample:
+            return statistics.mean(perSample) * nSamples
+        return None
+
+    def estimate(self, plan: RunPlan) -> RunPlan:
+        """Fills in the estimated duration and disk usage of a plan
+
+        Parameters
+        ----------
+        plan : RunPlan
+            Plan to estimate
+
+        Returns
+        -------
+        RunPlan
+            The same plan, with `duration` and `diskUsage` set
+            if there is sufficient history
+        """
+        entries = self.entries(plan.instrument)
+        if not entries:
+            return plan
+        plan.duration = sum(
+            self._estimate(entries, "duration", n) for n in plan.runs)
+        plan.diskUsage = int(sum(
+            self._estimate(entries, "size", n) for n in plan.runs))
+        return plan
+
+
+def batchSampleCount(
+    gudrunFile: GudrunFile, batchSize: int, stepSize: int, offset: int
+) -> int:
+    """Returns the number of samples in a batched input file,
+    formed as in `BatchProcessing.batch`, including batches formed
+    by proton charge from NeXus data files
+    """
+    index = nexus_index.indexFor(gudrunFile.instrument)
+    nSamples = 0
+    for sampleBackground in gudrunFile.sampleBackgrounds:
+        if not sampleBackground.samples:
+            continue
+        maxDataFiles = max(
+            len(sample.dataFiles) for sample in sampleBackground.samples)
+        for sample in sampleBackground.samples:
+            if not sample.runThisSample:
+                continue
+            nSamples += len(nexus_index.batchWindows(
+                index, gudrunFile.instrument, sample.dataFiles,
+                maxDataFiles, batchSize, stepSize, offset
+            ))
+    return nSamples
+
+
+def planGudrun(gudrunFile: GudrunFile, iterator=None) -> RunPlan:
+    """Plans a single run of gudrun_dcs, or an iteration of it
+
+    Parameters
+    ----------
+    gudrunFile : GudrunFile
+        Input file to run
+    iterator : iterators.Iterator, optional
+        Iterator to apply, by default None
+
+    Returns
+    -------
+    RunPlan
+        Plan of the task
+    """
+    nSamples = len(runSamples(gudrunFile))
+    instrument = gudrunFile.instrument.name.name
+    if not iterator:
+        return RunPlan("gudrun", instrument, [nSamples])
+    nRuns = iterator.nTotal + (1 if iterator.requireDefault else 0)
+    return RunPlan(
+        f"iterate {iterator.name}".strip(), instrument, [nSamples] * nRuns
+    )
+
+
+def planComposition(gudrunFile: GudrunFile, iterator) -> RunPlan:
+    """Plans an iteration by composition. Two single sample runs
+    are made per iteration, and the search may converge early.
+
+    Parameters
+    ----------
+    gudrunFile : GudrunFile
+        Input file to run
+    iterator : iterators.Composition
+        Composition iterator to apply
+
+    Returns
+    -------
+    RunPlan
+        Plan of the task
+    """
+    return RunPlan(
+        "iterate composition",
+        gudrunFile.instrument.name.name,
+        [1] * (2 * iterator.nTotal * len(iterator.sampleArgs)),
+        upperBound=True
+    )
+
+
+def planBatchProcessing(
+    gudrunFile: GudrunFile,
+    iterator=None,
+    batchSize=1,
+    stepSize=1,
+    offset: int = 0,
+    rtol=0.0,
+    separateFirstBatch=False,
+    slidingWindow=False,
+    fileOutputs: typ.Dict[str, str] = None,
+    purgeFiles: typ.List[str] = ()
+) -> RunPlan:
+    """Plans batch processing. Arguments are as in
+    `GudPy.batchProcessing`. `fileOutputs` are the cached per-file
+    outputs of a previous sliding window run, keyed by
+    `fingerprint.dataFileFingerprints` of the project and
+    the outputs of purge_det, `purgeFiles`.
+
+    Returns
+    -------
+    RunPlan
+        Plan of the task
+    """
+    instrument = gudrunFile.instrument.name.name
+    if slidingWindow:
+        fileOutputs = fileOutputs or {}
+        fileKeys = fingerprint.dataFileFingerprints(gudrunFile, purgeFiles)
+        nFiles = len([
+            (sample.name, dataFile)
+            for sample in runSamples(gudrunFile)
+            for dataFile in sample.dataFiles
+            if not os.path.exists(fileOutputs.get(
+                fileKeys.get((sample.name, dataFile)), "") or "")
+        ])
+        # Windows are formed from the per-file outputs, so only
+        # the data files not yet reduced require a run
+        return RunPlan(
+            "sliding window batch processing",
+            instrument,
+            [nFiles] if nFiles else []
+        )
+
+    nIterations = 1
+    if iterator:
+        nIterations = iterator.nTotal + (1 if iterator.requireDefault else 0)
+    runs = []
+    if separateFirstBatch:
+        runs.extend([len(runSamples(gudrunFile))] * nIterations)
+    runs.extend(
+        [batchSampleCount(gudrunFile, batchSize, stepSize, offset)]
+        * nIterations
+    )
+    return RunPlan(
+        "batch processing",
+        instrument,
+        runs,
+        upperBound=bool(iterator) and rtol > 0.0
+    )
@@ -0,0 +1,127 @@
+import copy
+
+from core.copy_on_write import fields
+from core.fingerprint import canonical
+
+# Fields holding the model objects which are merged one by one
+STRUCTURE = frozenset({
+    "instrument", "beam", "normalisation", "sampleBackgrounds", "samples",
+    "containers"
+})
+# Fields which are not part of the project
+IGNORE = frozenset({
+    "yaml", "sectionCache", "gudrunOutput", "output", "stream"
+})
+
+
+def _objects(gudrunFile) -> dict:
+    """Returns the model objects of a GudrunFile which are merged,
+    by their path from it
+    """
+    objects = {
+        (): gudrunFile,
+        ("instrument",): gudrunFile.instrument,
+        ("beam",): gudrunFile.beam,
+        ("normalisation",): gudrunFile.normalisation,
+    }
+    for i, sampleBackground in enumerate(gudrunFile.sampleBackgrounds):
+        sbPath = ("sampleBackgrounds", i)
+        objects[sbPath] = sampleBackground
+        for j, sample in enumerate(sampleBackground.samples):
+            samplePath = sbPath + ("samples", j)
+            objects[samplePath] = sample
+            for k, container in enumerate(sample.containers):
+                objects[samplePath + ("containers", k)] = container
+    return objects
+
+
+class RunSnapshot:
+    """
+    Class to represent a copy of a project taken when a run is launched.
+    The run works on its own copy, so the project can be edited while it
+    runs. On completion, the changes the run made are merged back into
+    the project, field by field. Fields which were also edited since the
+    launch keep their edited values.
+
+    ...
+
+    Attributes
+    ----------
+    original : GudrunFile
+        Project the snapshot was taken of.
+    gudrunFile : GudrunFile
+        Copy of the project for the run to work on.
+    base : GudrunFile
+        Copy of the project as it was at the launch, left unchanged.
+    """
+
+    def __init__(self, gudrunFile):
+        self.original = gudrunFile
+        self.base = gudrunFile.clone()
+        self.gudrunFile = gudrunFile.clone()
+        # Objects of the project at the launch, which are merged into
+        # even if they have since been moved
+        self.originalObjects = _objects(gudrunFile)
+        self.baseObjects = _objects(self.base)
+
+    def originalOf(self, obj):
+        """
+        Returns the object of the project which an object of the copy
+        was taken from.
+
+        Parameters
+        ----------
+        obj
+            Model object of the copy the run was given
+
+        Returns
+        -------
+        Model object of the project at the same position at the
+        launch, or None if there is none.
+        """
+        for path, copied in _objects(self.gudrunFile).items():
+            if copied is obj:
+                return self.originalObjects.get(path)
+        return None
+
+    def merge(self, result=None) -> list:
+        """
+        Merges the changes a run made into the project.
+
+        Parameters
+        ----------
+        result : GudrunFile, optional
+            Project as the run left it, by default the copy the run
+            was given. Objects are matched to those of the project by
+            their position at the launch.
+
+        Returns
+        -------
+        tuple[tuple, str][]
+            Path to each object and name of each field changed by the
+            run, which was not merged as it was also edited.
+        """
+        if result is None:
+            result = self.gudrunFile
+        conflicts = []
+        for path, obj in _objects(result).items():
+            original = self.originalObjects.get(path)
+            base = self.baseObjects.get(path)
+            if (
+                original is None or type(base) is not type(obj)
+                or type(original) is not type(obj)
+            ):
+                continue
+            baseFields = fields(base)
+            originalFields = fields(original)
+            for name, value in fields(obj).items():
+                if name in STRUCTURE or name in IGNORE:
+                    continue
+                before = canonical(baseFields.get(name))
+                if canonical(value) == before:
+                    continue
+                if canonical(originalFields.get(name)) != before:
+                    conflicts.append((path, name))
+                    continue
+                setattr(original, name, copy.deepcopy(value))
+        return conflicts
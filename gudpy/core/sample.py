@@ -7,9 +7,10 @@ from core.enums import (
 )
 from core import utils
 from core import config
+from core.copy_on_write import CopyOnWrite
 
 
-class Sample:
+class Sample(CopyOnWrite):
     """
     Class to represent a Sample.
 
@@ -98,6 +99,23 @@ class Sample:
     -------
     """
 
+    __slots__ = (
+        "name", "periodNumber", "dataFiles", "forceCalculationOfCorrections",
+        "composition", "geometry", "upstreamThickness", "downstreamThickness",
+        "angleOfRotation", "sampleWidth", "innerRadius", "outerRadius",
+        "sampleHeight", "density", "densityUnits", "tempForNormalisationPC",
+        "totalCrossSectionSource", "crossSectionFilename",
+        "sampleTweakFactor", "topHatW", "FTMode", "minRadFT", "grBroadening",
+        "resonanceValues", "exponentialValues",
+        "normalisationCorrectionFactor", "fileSelfScattering", "normaliseTo",
+        "maxRadFT", "outputUnits", "powerForBroadening", "stepSize",
+        "runThisSample", "scatteringFraction", "attenuationCoefficient",
+        "containers",
+        # Only set on copies shown in the output tree
+        "output"
+    )
+    yamlignore = frozenset()
+
     def __init__(self):
         """
         Constructs all the necessary attributes for the Sample object.
@@ -144,10 +162,6 @@ class Sample:
 
         self.containers = []
 
-        self.yamlignore = {
-            "yamlignore"
-        }
-
     def pathName(self):
         return utils.replace_unwanted_chars(self.name).translate(
             {ord(x): '' for x in r'/\!*~,&|[]'}
@@ -1,7 +1,8 @@
 from core.data_files import DataFiles
+from core.copy_on_write import CopyOnWrite
 
 
-class SampleBackground:
+class SampleBackground(CopyOnWrite):
     """
     Class to represent a SampleBackground.
 
@@ -18,6 +19,10 @@ class SampleBackground:
     Methods
     -------
     """
+
+    __slots__ = ("periodNumber", "dataFiles", "samples", "writeAllSamples")
+    yamlignore = frozenset({"writeAllSamples"})
+
     def __init__(self):
         """
         Constructs all the necessary attributes for the
@@ -32,11 +37,6 @@ class SampleBackground:
         self.samples = []
         self.writeAllSamples = True
 
-        self.yamlignore = {
-            "writeAllSamples",
-            "yamlignore"
-        }
-
     def __str__(self):
         """
         Returns the string representation of the SampleBackground object.
@@ -45,38 +45,69 @@ class SampleBackground:
         ----------
         None
 
+        Returns
+        -------
+        string : str
+            String representation of SampleBackground.
+        """
+        return self.toString()
+
+    def toString(self, samples=None, containersOf=None, render=None):
+        """
+        Returns the string representation of the SampleBackground object,
+        optionally holding only some of its samples.
+
+        Parameters
+        ----------
+        samples : Sample[], optional
+            Samples to write, by default all of them, or only those
+            to be run if `writeAllSamples` is False.
+        containersOf : Sample[], optional
+            Samples whose containers which run as samples are written,
+            by default `samples`, or all samples if `samples` is None.
+        render : callable, optional
+            Function rendering a model object, given the object and the
+            function to render it with, such as SectionCache.render.
+
         Returns
         -------
         string : str
             String representation of SampleBackground.
         """
         TAB = "          "
+        if samples is None:
+            if self.writeAllSamples:
+                samples = self.samples
+            else:
+                samples = [x for x in self.samples if x.runThisSample]
+            containersOf = self.samples
+            self.writeAllSamples = True
+        elif containersOf is None:
+            containersOf = samples
+        if render is None:
+            render = _render
+
         CONV_SAMPLES = [
-            str(c.convertToSample())
-            for s in self.samples
+            render(c, _convertedStr)
+            for s in containersOf
             for c in s.containers
             if c.runAsSample
         ]
-        if self.writeAllSamples:
-            samples = [str(x) for x in self.samples]
-        else:
-            samples = [str(x) for x in self.samples if x.runThisSample]
-        SAMPLES = "\n".join([*samples, *CONV_SAMPLES])
-        self.writeAllSamples = True
+        parts = [
+            f'SAMPLE BACKGROUND{TAB}{{\n\n',
+            f'{len(self.dataFiles)}  {self.periodNumber}{TAB}',
+            'Number of  files and period number\n',
+        ]
+        if len(self.dataFiles) > 0:
+            parts.append(f'{str(self.dataFiles)}\n')
+        parts.append('\n}\n')
+        parts.append("\n".join([*(render(x) for x in samples), *CONV_SAMPLES]))
+        return "".join(parts)
+
+
+def _render(obj, toString=str):
+    return toString(obj)
+
 
-        dataFilesLine = (
-            f'{str(self.dataFiles)}\n'
-            if len(self.dataFiles) > 0
-            else
-            ''
-        )
-
-        return (
-            f'SAMPLE BACKGROUND{TAB}{{\n\n'
-            f'{len(self.dataFiles)}  {self.periodNumber}{TAB}'
-            f'Number of  files and period number\n'
-            f'{dataFilesLine}\n'
-            f'}}\n'
-            f'{SAMPLES}'
-
-        )
+def _convertedStr(container):
+    return str(container.convertToSample())
@@ -0,0 +1,153 @@
+import heapq
+import threading
+import typing as typ
+
+from core import run_planner
+from core.gudrun_file import GudrunFile
+
+
+def jobSignature(gudrunFile: GudrunFile) -> typ.Tuple[str, int, int]:
+    """Returns the signature of a gudrun_dcs job, used to look up
+    the duration of similar jobs.
+
+    Parameters
+    ----------
+    gudrunFile : GudrunFile
+        Input file of the job
+
+    Returns
+    -------
+    tuple[str, int, int]
+        Instrument name, number of sample data files and number of samples
+    """
+    return (
+        gudrunFile.instrument.name.name,
+        run_planner.runDataFiles(gudrunFile),
+        len(run_planner.runSamples(gudrunFile))
+    )
+
+
+class TimingHistory:
+    """
+    Class to keep the mean duration of gudrun_dcs jobs per signature,
+    and estimate the duration of queued jobs from it.
+    Durations are updated as jobs finish, and may be used from
+    several threads.
+    """
+
+    def __init__(self):
+        # Maps signature to (mean duration, number of jobs)
+        self.timings: typ.Dict[typ.Tuple[str, int, int],
+                               typ.Tuple[float, int]] = {}
+        self.lock = threading.Lock()
+
+    @classmethod
+    def fromRunHistory(cls, history: run_planner.RunHistory):
+        """Creates a timing history from recorded runs
+
+        Parameters
+        ----------
+        history : run_planner.RunHistory
+            Recorded runs
+
+        Returns
+        -------
+        TimingHistory
+            Timing history containing the recorded runs
+        """
+        timings = cls()
+        for entry in history.entries():
+            if entry.get("dataFiles") is None:
+                continue
+            timings.update(
+                (entry["instrument"], entry["dataFiles"], entry["samples"]),
+                entry["duration"]
+            )
+        return timings
+
+    def update(self, signature: typ.Tuple[str, int, int], duration: float):
+        """Adds the duration of a finished job
+
+        Parameters
+        ----------
+        signature : tuple[str, int, int]
+            Signature of the job
+        duration : float
+            Wall time of the job in seconds
+        """
+        with self.lock:
+            mean, n = self.timings.get(signature, (0.0, 0))
+            self.timings[signature] = (
+                (mean * n + duration) / (n + 1), n + 1
+            )
+
+    def estimate(self, signature: typ.Tuple[str, int, int]) -> float:
+        """Estimates the duration of a job. Jobs with the same signature
+        are used if any have finished, otherwise the mean duration per
+        data file of the instrument (or of all instruments) is scaled.
+        With no timings at all, the number of data files is returned,
+        which still orders jobs by size.
+
+        Parameters
+        ----------
+        signature : tuple[str, int, int]
+            Signature of the job
+
+        Returns
+        -------
+        float
+            Estimated duration of the job
+        """
+        instrument, nDataFiles, _ = signature
+        with self.lock:
+            if signature in self.timings:
+                return self.timings[signature][0]
+            for match in (lambda s: s[0] == instrument, lambda s: True):
+                perFile = [
+                    mean / s[1]
+                    for s, (mean, _) in self.timings.items()
+                    if s[1] and match(s)
+                ]
+                if perFile:
+                    return sum(perFile) / len(perFile) * nDataFiles
+        return float(nDataFiles)
+
+
+def order(estimates: typ.List[float]) -> typ.List[int]:
+    """Orders jobs longest first (LPT)
+
+    Parameters
+    ----------
+    estimates : list[float]
+        Estimated duration of each job
+
+    Returns
+    -------
+    list[int]
+        Indices of the jobs, in the order they should be started
+    """
+    return sorted(
+        range(len(estimates)), key=lambda i: estimates[i], reverse=True)
+
+
+def makespan(estimates: typ.List[float], nWorkers: int) -> float:
+    """Calculates the expected time for `nWorkers` workers to finish
+    all jobs, when each job is started longest first on the first
+    free worker.
+
+    Parameters
+    ----------
+    estimates : list[float]
+        Estimated duration of each job
+    nWorkers : int
+        Number of workers
+
+    Returns
+    -------
+    float
+        Expected makespan
+    """
+    loads = [0.0] * max(1, min(nWorkers, len(estimates)))
+    for i in order(estimates):
+        heapq.heapreplace(loads, loads[0] + estimates[i])
+    return max(loads)
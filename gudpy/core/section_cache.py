@@ -0,0 +1,73 @@
+from core import config
+from core.copy_on_write import changedSince, clock, trackedObjects
+
+
+class SectionCache:
+    """
+    Class to memoise the text of the sections of an input file, such as
+    the instrument or a sample. The text of a section is reused until one
+    of the model objects or lists it was rendered from is changed.
+    Changes are seen as long as they are made through the model objects
+    and their lists, including lists nested in lists such as the rows
+    of a table, as required for copies of the model.
+
+    ...
+
+    Attributes
+    ----------
+    entries : dict
+        Rendered sections, by the id of their object and renderer.
+    used : set
+        Keys of the entries used since the cache was last pruned.
+    """
+
+    def __init__(self):
+        self.entries = {}
+        self.used = set()
+
+    def render(self, obj, toString=str) -> str:
+        """
+        Returns the text of a section, rendering it only if it changed
+        since it was last rendered.
+
+        Parameters
+        ----------
+        obj : CopyOnWrite
+            Model object of the section.
+        toString : callable, optional
+            Function rendering the section, by default str.
+
+        Returns
+        -------
+        str
+            Text of the section.
+        """
+        key = (id(obj), toString)
+        self.used.add(key)
+        entry = self.entries.get(key)
+        if (
+            entry is not None
+            and entry[0] is obj
+            and entry[1] == config.geometry
+            and not changedSince(entry[2], entry[3])
+        ):
+            return entry[4]
+
+        time = clock()
+        geometry = config.geometry
+        text = toString(obj)
+        self.entries[key] = (obj, geometry, trackedObjects(obj), time, text)
+        return text
+
+    def prune(self):
+        """
+        Forgets the sections which were not used since the last prune.
+        """
+        self.entries = {
+            k: v for k, v in self.entries.items() if k in self.used
+        }
+        self.used = set()
+
+    def __reduce__(self):
+        # Copies start out empty
+        return (SectionCache, ())
@@ -0,0 +1,122 @@
+import os
+
+import numpy as np
+
+from core import utils
+from core.curve_cache import loadCurve
+
+
+def windows(nFiles: int, batchSize: int, stepSize: int, offset: int = 0):
+    """Computes the bounds of each window over a list of data files.
+    Windows are formed in the same way as `BatchProcessing.batch`.
+
+    Parameters
+    ----------
+    nFiles : int
+        Number of data files
+    batchSize : int
+        Number of data files in each window
+    stepSize : int
+        Number of data files between the start of consecutive windows
+    offset : int, optional
+        Index of the first data file to use, by default 0
+
+    Returns
+    -------
+    list[tuple[int, int]]
+        List of (start, stop) indices of each window
+    """
+    return [
+        (i, min(i + batchSize, nFiles))
+        for i in range(offset, nFiles, stepSize)
+    ]
+
+
+def weightedSum(curves):
+    """Combines curves sharing the same x-axis, weighting each point
+    by its inverse variance. Points with no error are given no weight,
+    unless no point has an error, in which case the mean is taken.
+
+    Parameters
+    ----------
+    curves : list[tuple[np.ndarray, np.ndarray, np.ndarray]]
+        List of (x, y, error) arrays
+
+    Returns
+    -------
+    tuple[np.ndarray, np.ndarray, np.ndarray]
+        Combined (x, y, error) arrays
+
+    Raises
+    ------
+    ValueError
+        Raised if the curves do not share the same x-axis
+    """
+    x = curves[0][0]
+    for curve in curves[1:]:
+        if curve[0].shape != x.shape or not np.allclose(curve[0], x):
+            raise ValueError("Curves do not share the same x-axis.")
+
+    ys = np.stack([curve[1] for curve in curves])
+    errs = np.stack([curve[2] for curve in curves])
+
+    weights = np.zeros_like(errs)
+    np.divide(1.0, errs ** 2, out=weights, where=errs > 0)
+    totalWeight = weights.sum(axis=0)
+    weighted = totalWeight > 0
+
+    y = ys.mean(axis=0)
+    np.divide(
+        (weights * ys).sum(axis=0), totalWeight, out=y, where=weighted
+    )
+    err = np.zeros_like(y)
+    np.divide(1.0, np.sqrt(totalWeight), out=err, where=weighted)
+    return x, y, err
+
+
+def writeCurve(path: str, header, x, y, err):
+    """Writes a curve in the column format used by Gudrun
+
+    Parameters
+    ----------
+    path : str
+        Path to write to
+    header : list[str]
+        Header lines, written as-is
+    x, y, err : np.ndarray
+        Columns to write
+    """
+    utils.makeDir(os.path.dirname(path))
+    with open(path, "w", encoding="utf-8") as fp:
+        fp.writelines(header)
+        np.savetxt(fp, np.column_stack((x, y, err)), fmt="%15.7E")
+
+
+def mergeCurves(paths, target: str):
+    """Merges the output curves of individual data files into a single
+    curve, written to `target`. The header of the first curve is kept.
+
+    Parameters
+    ----------
+    paths : list[str]
+        Paths of the curves to merge
+    target : str
+        Path to write the merged curve to
+
+    Returns
+    -------
+    str
+        Path of the merged curve
+
+    Raises
+    ------
+    ValueError
+        Raised if the curves cannot be merged
+    ParserException
+        Raised if a curve cannot be read
+    """
+    curves = [loadCurve(path) for path in paths]
+    x, y, err = weightedSum(
+        [(curve.x, curve.y, curve.err) for curve in curves])
+    writeCurve(target, curves[0].header, x, y, err)
+    return target
@@ -0,0 +1,203 @@
+import enum
+import hashlib
+import hmac
+import io
+import json
+import os
+import pickle
+import secrets
+import typing as typ
+
+from core.beam import Beam
+from core.composition import Component, Composition
+from core.container import Container
+from core import copy_on_write
+from core.gui_config import GUIConfig
+from core.instrument import Instrument
+from core.normalisation import Normalisation
+from core.sample import Sample
+from core.sample_background import SampleBackground
+
+# Increment when the model or the snapshot layout changes in a way
+# that the field names alone do not capture
+SCHEMA_VERSION = 3
+SNAPSHOT_EXT = ".snapshot"
+PICKLE_PROTOCOL = 5
+# Per-user key signing snapshots, so that only snapshots written by
+# the same user are ever unpickled
+KEY_PATH = os.path.join(os.path.expanduser("~"), ".gudpy", "snapshot.key")
+# Builtins which may be referenced by a snapshot
+SAFE_BUILTINS = frozenset({
+    "set", "frozenset", "complex", "slice", "range", "bytearray"
+})
+
+
+def schemaVersion() -> str:
+    """Returns the version of the model schema. This combines
+    SCHEMA_VERSION with a digest of the fields of each model class,
+    so that adding, removing or renaming a field invalidates
+    existing snapshots.
+    """
+    fields = [
+        f"{type(obj).__name__}:{','.join(sorted(copy_on_write.fields(obj)))}"
+        for obj in (
+            Instrument(), Beam(), Normalisation(), SampleBackground(),
+            Sample(), Container(), Composition(""), Component(),
+            GUIConfig()
+        )
+    ]
+    digest = hashlib.sha1(";".join(fields).encode("utf-8")).hexdigest()
+    return f"{SCHEMA_VERSION}-{digest[:12]}"
+
+
+def snapshotPath(path: str) -> str:
+    """Returns the path of the snapshot of a YAML input file
+    """
+    return f"{os.path.splitext(path)[0]}{SNAPSHOT_EXT}"
+
+
+def _sourceStat(path: str) -> typ.Tuple[int, int]:
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _key() -> bytes:
+    """Returns the key snapshots are signed with, creating it
+    on first use
+    """
+    try:
+        with open(KEY_PATH, "rb") as fp:
+            key = fp.read()
+        if key:
+            return key
+    except FileNotFoundError:
+        pass
+    os.makedirs(os.path.dirname(KEY_PATH), exist_ok=True)
+    key = secrets.token_bytes(32)
+    fd = os.open(KEY_PATH, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "wb") as fp:
+        fp.write(key)
+    return key
+
+
+def _sign(payload: bytes) -> str:
+    return hmac.new(_key(), payload, hashlib.sha256).hexdigest()
+
+
+class _ModelUnpickler(pickle.Unpickler):
+    """Unpickler which only creates the model classes of GudPy,
+    their enums and a few plain builtins
+    """
+
+    def find_class(self, module, name):
+        if module == "builtins" and name in SAFE_BUILTINS:
+            return super().find_class(module, name)
+        if module.startswith("core."):
+            cls = super().find_class(module, name)
+            if isinstance(cls, type) and issubclass(cls, (
+                copy_on_write.CopyOnWrite, copy_on_write.CopyOnWriteList,
+                enum.Enum
+            )):
+                return cls
+        raise pickle.UnpicklingError(
+            f"{module}.{name} is not allowed in a snapshot")
+
+
+def writeSnapshot(path: str, parsed: tuple):
+    """Writes a binary snapshot of a parsed YAML input file next to it.
+    The snapshot records the modification time and size of the YAML
+    file, so it is only used while the YAML file is unchanged. These
+    are written as a line of JSON ahead of the pickled file, with a
+    digest of it keyed by the user, so the snapshot can be checked
+    without loading it.
+
+    Parameters
+    ----------
+    path : str
+        Path to the YAML input file, which must already be written
+    parsed : tuple
+        Parsed input file, as returned by YAML.parseYaml
+    """
+    target = snapshotPath(path)
+    tmp = f"{target}.tmp"
+    payload = pickle.dumps(parsed, protocol=PICKLE_PROTOCOL)
+    header = {
+        "schema": schemaVersion(),
+        "source": _sourceStat(path),
+        "digest": _sign(payload),
+    }
+    with open(tmp, "wb") as fp:
+        fp.write(json.dumps(header).encode("utf-8") + b"\n")
+        fp.write(payload)
+    os.replace(tmp, target)
+
+
+def _readPayload(path: str) -> typ.Union[bytes, None]:
+    """Returns the pickled file of the snapshot of a YAML input file,
+    if it was written from the current YAML file, with the current
+    schema version and by this user, or None
+    """
+    target = snapshotPath(path)
+    if os.path.getmtime(target) < os.path.getmtime(path):
+        return None
+    with open(target, "rb") as fp:
+        header = json.loads(fp.readline())
+        payload = fp.read()
+    if (
+        header["schema"] != schemaVersion()
+        or tuple(header["source"]) != _sourceStat(path)
+        or not hmac.compare_digest(header["digest"], _sign(payload))
+    ):
+        return None
+    return payload
+
+
+def hasSnapshot(path: str) -> bool:
+    """Checks whether a YAML input file has a valid binary snapshot,
+    without unpickling it.
+
+    Parameters
+    ----------
+    path : str
+        Path to the YAML input file
+
+    Returns
+    -------
+    bool
+        Whether `readSnapshot` would use the snapshot
+    """
+    try:
+        return _readPayload(path) is not None
+    except Exception:
+        # A missing, stale or unreadable snapshot is ignored
+        return False
+
+
+def readSnapshot(path: str) -> typ.Union[tuple, None]:
+    """Reads the binary snapshot of a YAML input file. The snapshot is
+    only used if it was written from the current YAML file, with the
+    current schema version and by this user; YAML remains the source
+    of truth. Only model classes are unpickled from it.
+
+    Parameters
+    ----------
+    path : str
+        Path to the YAML input file
+
+    Returns
+    -------
+    tuple | None
+        Parsed input file, as returned by YAML.parseYaml,
+        or None if there is no valid snapshot
+    """
+    try:
+        payload = _readPayload(path)
+        if payload is None:
+            return None
+        parsed = _ModelUnpickler(io.BytesIO(payload)).load()
+    except Exception:
+        # A missing, stale, unreadable or disallowed snapshot is ignored
+        return None
+
+    parsed[0].GudrunInputFileDir = os.path.dirname(os.path.abspath(path))
+    return parsed
@@ -0,0 +1,99 @@
+import codecs
+import io
+import typing as typ
+
+from core.exception import ParserException
+
+# Number of bytes sampled when the encoding has to be detected
+DETECTION_PREFIX = 64 * 1024
+
+
+def detectEncoding(data: bytes) -> str:
+    """Detects the encoding of some bytes, sampling only a bounded
+    prefix of them.
+
+    Parameters
+    ----------
+    data : bytes
+        Bytes to detect the encoding of
+
+    Returns
+    -------
+    str
+        Name of the detected encoding, "latin-1" if none is detected
+    """
+    import chardet
+    encoding = chardet.detect(data[:DETECTION_PREFIX])["encoding"]
+    return encoding or "latin-1"
+
+
+def decode(data: bytes, path: str = "") -> str:
+    """Decodes the contents of a text file. Strict ASCII and UTF-8
+    decoding are tried first, and the encoding is only detected
+    if both fail. Decoding is strict, so undecodable bytes are
+    reported rather than replaced.
+
+    Parameters
+    ----------
+    data : bytes
+        Contents of the file
+    path : str, optional
+        Path to the file, named in errors
+
+    Returns
+    -------
+    str
+        Decoded contents
+
+    Raises
+    ------
+    ParserException
+        Raised if the contents cannot be decoded
+    """
+    if data.isascii():
+        return data.decode("ascii")
+    # The byte order mark is skipped, so that offsets are of the file
+    start = 0
+    if data.startswith(codecs.BOM_UTF8):
+        start = len(codecs.BOM_UTF8)
+        encoding = "utf-8"
+    else:
+        try:
+            return data.decode("utf-8")
+        except UnicodeDecodeError:
+            encoding = detectEncoding(data)
+    try:
+        return data[start:].decode(encoding)
+    except LookupError:
+        return data.decode("latin-1")
+    except UnicodeDecodeError as e:
+        offset = start + e.start
+        raise ParserException(
+            f"{path or 'File'}: cannot decode byte {data[offset]:#04x}"
+            f" at offset {offset} as {encoding}"
+        ) from e
+
+
+def readLines(path: str) -> typ.List[str]:
+    """Reads a text file once, and returns its lines ready to be
+    tokenised. Line endings are translated to "\\n", as when the
+    file is opened in text mode.
+
+    Parameters
+    ----------
+    path : str
+        Path to the file
+
+    Returns
+    -------
+    str[]
+        Lines of the file, including their line endings
+
+    Raises
+    ------
+    ParserException
+        Raised if the file cannot be decoded
+    """
+    with open(path, "rb") as fp:
+        data = fp.read()
+    return io.StringIO(decode(data, path), newline=None).readlines()
@@ -0,0 +1,62 @@
+import typing as typ
+
+
+class TokenStream:
+    """
+    Class to represent the lines of an input file being parsed.
+    Lines are consumed by advancing a cursor, rather than removing
+    them from the front of a list, so consuming a token is O(1).
+
+    ...
+
+    Attributes
+    ----------
+    lines : str[]
+        Lines of the input file.
+    cursor : int
+        Index of the next line to be consumed.
+    Methods
+    -------
+    next()
+        Consumes and returns the next line.
+    peek()
+        Returns the next line without consuming it.
+    """
+
+    def __init__(self, lines: typ.Iterable[str]):
+        self.lines = list(lines)
+        self.cursor = 0
+
+    def __len__(self):
+        return len(self.lines) - self.cursor
+
+    def __bool__(self):
+        return self.cursor < len(self.lines)
+
+    def next(self) -> typ.Union[str, None]:
+        """
+        Consumes the next line and returns it.
+
+        Returns
+        -------
+        str | None
+            The next line, or None if the stream is exhausted.
+        """
+        if self.cursor >= len(self.lines):
+            return None
+        line = self.lines[self.cursor]
+        self.cursor += 1
+        return line
+
+    def peek(self) -> typ.Union[str, None]:
+        """
+        Returns the next line, without consuming it.
+
+        Returns
+        -------
+        str | None
+            The next line, or None if the stream is exhausted.
+        """
+        if self.cursor >= len(self.lines):
+            return None
+        return self.lines[self.cursor]
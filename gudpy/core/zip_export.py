@@ -0,0 +1,132 @@
+import os
+import time
+import typing as typ
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from zipfile import ZIP_DEFLATED, ZIP_STORED, ZipFile, ZipInfo
+
+# Members larger than this are streamed from disk by the writing
+# thread, rather than read into memory by a worker
+STREAM_THRESHOLD = 64 * 1024 * 1024
+
+
+@dataclass
+class ExportMember:
+    """
+    File to be written into an export archive.
+
+    Attributes
+    ----------
+    arcname : str
+        Name of the member within the archive
+    path : str
+        Path to the file to read, if `data` is not given
+    data : bytes
+        Contents of the member, if not read from a file
+    """
+    arcname: str
+    path: str = ""
+    data: bytes = None
+
+    def size(self) -> int:
+        if self.data is not None:
+            return len(self.data)
+        return os.path.getsize(self.path)
+
+
+def _read(member: ExportMember) -> typ.Tuple[ZipInfo, bytes]:
+    """Reads a member, returning its entry and its contents
+    """
+    if member.data is not None:
+        zinfo = ZipInfo(
+            member.arcname, date_time=time.localtime(time.time())[:6])
+        zinfo.external_attr = 0o644 << 16
+        return zinfo, member.data
+    with open(member.path, "rb") as fp:
+        data = fp.read()
+    return ZipInfo.from_file(member.path, arcname=member.arcname), data
+
+
+def exportZip(
+    members: typ.Iterable[ExportMember],
+    exportTo: str,
+    store: bool = False,
+    maxWorkers: int = None,
+    progress: typ.Callable[[int, int], None] = None,
+    compresslevel: int = zlib.Z_DEFAULT_COMPRESSION,
+    streamThreshold: int = STREAM_THRESHOLD
+) -> str:
+    """Writes files into a ZIP archive. Members are read concurrently
+    by a pool of threads, while the members already read are compressed
+    and written in the order given, so that the archive does not depend
+    on scheduling. Only a bounded number of members is held in memory
+    at once.
+
+    Parameters
+    ----------
+    members : ExportMember[]
+        Files to write, in order
+    exportTo : str
+        Path to the archive
+    store : bool, optional
+        Whether to store members without compression, for data which is
+        already compact, by default False
+    maxWorkers : int, optional
+        Number of threads, by default chosen by ThreadPoolExecutor
+    progress : Callable[[int, int], None], optional
+        Called with the number of members written and the total
+        number of members, after each member is written
+    compresslevel : int, optional
+        zlib compression level
+    streamThreshold : int, optional
+        Size above which members are streamed from disk instead
+
+    Returns
+    -------
+    str
+        Path to the archive
+    """
+    members = list(members)
+    compression = ZIP_STORED if store else ZIP_DEFLATED
+
+    # Default of ThreadPoolExecutor
+    maxWorkers = maxWorkers or min(32, (os.cpu_count() or 1) + 4)
+
+    with ThreadPoolExecutor(maxWorkers) as pool, \
+            ZipFile(
+                exportTo, "w", compression, compresslevel=compresslevel
+            ) as zipFile:
+        window = 2 * maxWorkers
+        pending = deque()
+        queued = iter(members)
+
+        def submit():
+            member = next(queued, None)
+            if member is None:
+                return
+            if member.data is None and member.size() > streamThreshold:
+                pending.append((member, None))
+            else:
+                pending.append((member, pool.submit(_read, member)))
+
+        for _ in range(window):
+            submit()
+
+        written = 0
+        while pending:
+            member, future = pending.popleft()
+            submit()
+            if future is None:
+                zipFile.write(member.path, arcname=member.arcname)
+            else:
+                zinfo, data = future.result()
+                zipFile.writestr(
+                    zinfo, data, compress_type=compression,
+                    compresslevel=compresslevel)
+            written += 1
+            if progress:
+                progress(written, len(members))
+
+    return exportTo
@@ -5,19 +5,21 @@ import sys
 from core import gudpy as gp
 from core import enums
 from core import config
+from core import iterators
+from core import run_planner
 
 
-def loadProject(ctx, project):
+def loadProject(ctx, project, history):
     if not project:
         project = click.prompt("Path to project", type=click.Path())
         return
-    ctx.obj = gp.GudPy()
+    ctx.obj = gp.GudPy(runHistory=history)
     ctx.obj.loadFromProject(project)
     echoIndent(click.style(u"\u2714", fg="green", bold=True) +
                f" GudPy project sucessfuly loaded at {project}")
 
 
-def loadFile(ctx, value):
+def loadFile(ctx, value, history):
     print(value)
     file, format = value
     if not file:
@@ -34,13 +36,13 @@ def loadFile(ctx, value):
             return
     if not file or format:
         return
-    ctx.obj = gp.GudPy()
+    ctx.obj = gp.GudPy(runHistory=history)
     ctx.obj.loadFromFile(file, format)
     click.echo(click.style(u"\u2714", fg="green", bold=True) +
                f" GudPy input file {file} sucessfuly loaded")
 
 
-def loadConfig(ctx, cfg):
+def loadConfig(ctx, cfg, history):
     configDir = (
         os.path.join(sys._MEIPASS, "bin", "configs", "instruments")
         if hasattr(sys, "_MEIPASS")
@@ -55,7 +57,7 @@ def loadConfig(ctx, cfg):
     else:
         return
 
-    ctx.obj = gp.GudPy()
+    ctx.obj = gp.GudPy(runHistory=history)
     ctx.obj.loadFromFile(cfg, enums.Format.TXT, config=True)
 
 
@@ -72,6 +74,48 @@ def echoProcess(name):
     click.secho("\n  " + f">>  {name}\n", bold=True, fg='cyan')
 
 
+def formatDuration(seconds):
+    if seconds is None:
+        return "unknown (no run history)"
+    minutes, seconds = divmod(int(round(seconds)), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h {minutes:02d}m {seconds:02d}s"
+
+
+def formatSize(size):
+    if size is None:
+        return "unknown (no run history)"
+    for unit in ["B", "KB", "MB", "GB"]:
+        if size < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} TB"
+
+
+ITERATORS = {
+    "tweak-factor": iterators.TweakFactor,
+    "thickness": iterators.Thickness,
+    "inner-radius": lambda n: iterators.Radius(n, "inner"),
+    "outer-radius": lambda n: iterators.Radius(n, "outer"),
+    "density": iterators.Density,
+    "inelasticity": iterators.InelasticitySubtraction,
+}
+
+
+def findComponents(gudrunFile, names):
+    """Returns the components of a project with the given names
+    """
+    if len(names) > 2:
+        raise click.BadParameter(
+            "at most two components may be given", param_hint="--composition")
+    components = {c.name: c for c in gudrunFile.components.components}
+    for name in names:
+        if name not in components:
+            raise click.BadParameter(
+                f"no component named '{name}'", param_hint="--composition")
+    return [components[name] for name in names]
+
+
 @click.group()
 @click.option(
     "--project", "-p",
@@ -89,8 +133,21 @@ def echoProcess(name):
     type=click.Choice(["NIMROD2012", "SANDALS2011"]),
     help="Loads from a config file"
 )
+@click.option(
+    "--history",
+    type=click.Path(dir_okay=False),
+    default=run_planner.HISTORY_PATH,
+    show_default=True,
+    help="File runs are recorded to and estimated from"
+)
+@click.option(
+    "--no-history",
+    is_flag=True,
+    default=False,
+    help="Neither record runs nor estimate them from past runs"
+)
 @click.pass_context
-def cli(ctx, project, file, config):
+def cli(ctx, project, file, config, history, no_history):
     click.echo("============================================================"
                "============================================================")
     click.secho("                                                       "
@@ -99,12 +156,13 @@ def cli(ctx, project, file, config):
                "============================================================"
                "\n")
 
+    history = run_planner.RunHistory(None if no_history else history)
     if project:
-        loadProject(ctx, project)
+        loadProject(ctx, project, history)
     elif file:
-        loadFile(ctx, file)
+        loadFile(ctx, file, history)
     elif config:
-        loadConfig(ctx, config)
+        loadConfig(ctx, config, history)
     else:
         click.echo(
             "Error: no project path, file or config provided. "
@@ -118,10 +176,16 @@ def cli(ctx, project, file, config):
     default=False,
     help="Run processes verbosely, displaying the output"
 )
+@click.option(
+    "--incremental",
+    is_flag=True,
+    default=False,
+    help="Only run the samples whose inputs changed since the last run"
+)
 @click.pass_context
-def gudrun(ctx, verbose):
+def gudrun(ctx, verbose, incremental):
     echoProcess("gudrun_dcs")
-    ctx.obj.runGudrun()
+    ctx.obj.runGudrun(incremental=incremental)
     if verbose:
         click.echo_via_pager(ctx.obj.gudrun.output)
     echoIndent(click.style(u"\u2714", fg="green", bold=True) +
@@ -153,5 +217,74 @@ def purge(ctx, verbose):
             f"{thresh}", fg="yellow", bold=True)
 
 
+@cli.command()
+@click.option(
+    "--iterate", "-i",
+    type=click.Choice(list(ITERATORS.keys())),
+    help="Iterator to plan for"
+)
+@click.option(
+    "--iterations", "-n",
+    type=int,
+    default=5,
+    show_default=True,
+    help="Number of iterations"
+)
+@click.option(
+    "--batch-size",
+    type=int,
+    help="Plan batch processing with batches of this size"
+)
+@click.option("--step-size", type=int, default=1, show_default=True)
+@click.option("--offset", type=int, default=0, show_default=True)
+@click.option("--separate-first-batch", is_flag=True, default=False)
+@click.option("--sliding-window", is_flag=True, default=False)
+@click.option(
+    "--composition", "-c", "components",
+    multiple=True,
+    help="Plan an iteration by composition, tweaking the named component."
+    " Give two components to tweak the ratio between them"
+)
+@click.pass_context
+def plan(ctx, iterate, iterations, batch_size, step_size, offset,
+         separate_first_batch, sliding_window, components):
+    iterator = ITERATORS[iterate](iterations) if iterate else None
+    if components:
+        if iterate or batch_size:
+            raise click.UsageError(
+                "--composition cannot be combined with"
+                " --iterate or --batch-size")
+        runPlan = ctx.obj.planComposition(iterators.Composition(
+            ctx.obj.gudrunFile,
+            nTotal=iterations,
+            components=findComponents(ctx.obj.gudrunFile, components)
+        ))
+    elif batch_size:
+        runPlan = ctx.obj.planBatchProcessing(
+            iterator=iterator,
+            batchSize=batch_size,
+            stepSize=step_size,
+            offset=offset,
+            separateFirstBatch=separate_first_batch,
+            slidingWindow=sliding_window
+        )
+    else:
+        runPlan = ctx.obj.planGudrun(iterator)
+
+    echoProcess(f"Plan: {runPlan.task}")
+    echoIndent("Instrument: " + click.style(runPlan.instrument, bold=True))
+    echoIndent(
+        "gudrun_dcs runs: "
+        + click.style(
+            f"{'up to ' if runPlan.upperBound else ''}{runPlan.nRuns}",
+            bold=True)
+        + f" ({runPlan.nSamples} samples in total)"
+    )
+    echoIndent("Estimated wall time: " + click.style(
+        formatDuration(runPlan.duration), bold=True))
+    echoIndent("Estimated disk usage: " + click.style(
+        formatSize(runPlan.diskUsage), bold=True))
+
+
 if __name__ == '__main__':
     cli()
@@ -1,6 +1,5 @@
 
-import os
-
+from core.exception import ParserException
 from gui.widgets.charts.sample_plot_data import (
     DCSLevel, Mdcs01Plot,
     Mdor01Plot, Mgor01Plot, Mint01Plot
@@ -16,20 +15,26 @@ class SamplePlotConfig():
         self.parent = parent
         self.constructDataSets(offsetX, offsetY)
 
+    def curve(self, ext):
+        """Returns the path of an output of the sample's first data
+        file and its curve, read from the output directory or archive
+        """
+        path = self.gudrunOutput.output(
+            name=self.sample.name,
+            dataFile=self.sample.dataFiles[0],
+            type=ext
+        )
+        try:
+            return path, self.gudrunOutput.curve(
+                self.sample.name, self.sample.dataFiles[0], ext)
+        except (OSError, ParserException):
+            return path, None
+
     def constructDataSets(self, offsetX, offsetY):
         if len(self.sample.dataFiles):
             # mint01 dataset.
-            mintPath = self.gudrunOutput.output(
-                name=self.sample.name,
-                dataFile=self.sample.dataFiles[0],
-                type=".mint01"
-            )
-            hasMintData = False
-
-            if mintPath and os.path.exists(mintPath):
-                hasMintData = True
-
-            self.mint01DataSet = Mint01Plot(mintPath, hasMintData)
+            mintPath, mintCurve = self.curve(".mint01")
+            self.mint01DataSet = Mint01Plot(mintPath, mintCurve)
             self.mint01Series = self.mint01DataSet.toLineSeries(
                 self.parent, offsetX, offsetY
             )
@@ -37,17 +42,10 @@ class SamplePlotConfig():
                 self.mint01Series.setName(f"{self.sample.name} mint01")
 
             # mdcs01 dataset.
-            mdcsPath = self.gudrunOutput.output(
-                name=self.sample.name,
-                dataFile=self.sample.dataFiles[0],
-                type=".mdcs01"
-            )
-            hasMdcsData = False
+            mdcsPath, mdcsCurve = self.curve(".mdcs01")
+            hasMdcsData = mdcsCurve is not None
 
-            if mdcsPath and os.path.exists(mdcsPath):
-                hasMdcsData = True
-
-            self.mdcs01DataSet = Mdcs01Plot(mdcsPath, hasMdcsData)
+            self.mdcs01DataSet = Mdcs01Plot(mdcsPath, mdcsCurve)
             self.mdcs01Series = self.mdcs01DataSet.toLineSeries(
                 self.parent, offsetX, offsetY
             )
@@ -55,19 +53,14 @@ class SamplePlotConfig():
                 self.mdcs01Series.setName(f"{self.sample.name} mdcs01")
 
             # gud data, for dcs level.
-            gudFile = self.gudrunOutput.gudFile(
-                name=self.sample.name
-            )
-            hasDCSData = False
-
-            if gudFile and os.path.exists(gudFile.path):
-                hasDCSData = True
-                self.dcsLevel = DCSLevel(gudFile.path, hasDCSData)
-            else:
-                self.dcsLevel = DCSLevel("", hasDCSData)
+            try:
+                gudFile = self.gudrunOutput.gudFile(name=self.sample.name)
+            except ParserException:
+                gudFile = None
+            self.dcsLevel = DCSLevel(gudFile)
             if hasMdcsData:
                 self.dcsLevel.extend(
-                    [p.x() for p in self.mdcs01Series.points()]
+                    (self.mdcs01DataSet.dataSet.x + offsetX).tolist()
                 )
             self.dcsSeries = self.dcsLevel.toLineSeries(self.parent)
             if self.dcsSeries:
@@ -76,17 +69,8 @@ class SamplePlotConfig():
                 )
 
             # mdor01 dataset.
-            mdorPath = self.gudrunOutput.output(
-                name=self.sample.name,
-                dataFile=self.sample.dataFiles[0],
-                type=".mdor01"
-            )
-            hasMdorData = False
-
-            if mdorPath and os.path.exists(mdorPath):
-                hasMdorData = True
-
-            self.mdor01DataSet = Mdor01Plot(mdorPath, hasMdorData)
+            mdorPath, mdorCurve = self.curve(".mdor01")
+            self.mdor01DataSet = Mdor01Plot(mdorPath, mdorCurve)
             self.mdor01Series = self.mdor01DataSet.toLineSeries(
                 self.parent, offsetX, offsetY
             )
@@ -94,17 +78,8 @@ class SamplePlotConfig():
                 self.mdor01Series.setName(f"{self.sample.name} mdor01")
 
             # mgor01 dataset.
-            mgorPath = self.gudrunOutput.output(
-                name=self.sample.name,
-                dataFile=self.sample.dataFiles[0],
-                type=".mgor01"
-            )
-            hasMgorData = False
-
-            if mgorPath and os.path.exists(mgorPath):
-                hasMgorData = True
-
-            self.mgor01DataSet = Mgor01Plot(mgorPath, hasMgorData)
+            mgorPath, mgorCurve = self.curve(".mgor01")
+            self.mgor01DataSet = Mgor01Plot(mgorPath, mgorCurve)
             self.mgor01Series = self.mgor01DataSet.toLineSeries(
                 self.parent, offsetX, offsetY
             )
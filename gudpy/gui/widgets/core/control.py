@@ -20,6 +20,8 @@ from gui.widgets import dialogs
 from core import iterators
 from core import exception as exc
 from core import gudpy as gp
+from core import run_planner
+from core.run_snapshot import RunSnapshot
 
 
 class GudPyController(QtCore.QObject):
@@ -29,18 +31,23 @@ class GudPyController(QtCore.QObject):
         Calls initComponents() to load the UI file.
         """
         super().__init__()
-        self.gudpy: gp.GudPy = gp.GudPy()
+        # History runs are recorded to and estimated from
+        self.runHistory = run_planner.RunHistory(run_planner.HISTORY_PATH)
+        self.gudpy: gp.GudPy = gp.GudPy(runHistory=self.runHistory)
         self.mainWidget: QtWidgets.QMainWindow = GudPyMainWindow()
         self.purged: bool = False
 
         # Current process thread running
         self.workerThread: QtCore.QThread = None
+        # Processes launched while another was running, started in turn
+        self.queue: typ.List[QtCore.QThread] = []
 
         self.connectUiSlots()
 
     def connectUiSlots(self):
         self.mainWidget.ui.runPurge.triggered.connect(self.runPurge)
-        self.mainWidget.ui.runGudrun.triggered.connect(self.runGudrun)
+        self.mainWidget.ui.runGudrun.triggered.connect(
+            lambda: self.runGudrun())
         self.mainWidget.ui.iterateInelasticitySubtractions.triggered.connect(
             lambda: self.iterateGudrun(
                 dialogs.iterators.InelasticitySubtractionIterationDialog)
@@ -159,7 +166,7 @@ class GudPyController(QtCore.QObject):
             filter = "YAML (*.yaml)"
         fmt = filters[filter]
         try:
-            gudpy = gp.GudPy()
+            gudpy = gp.GudPy(runHistory=self.runHistory)
             gudpy.loadFromFile(loadFile=filename, format=fmt)
             self.gudpy = gudpy
         except (FileNotFoundError, exc.ParserException) as e:
@@ -182,11 +189,12 @@ class GudPyController(QtCore.QObject):
             return
 
         try:
-            self.gudpy.loadFromProject(projectDir=projectDir)
+            # The GUI writes snapshots of its projects when saving
+            self.gudpy.loadFromProject(projectDir=projectDir, snapshot=True)
             autosave = self.tryLoadAutosaved(projectDir)
             if autosave:
                 filename = autosave
-                gudpy = gp.GudPy()
+                gudpy = gp.GudPy(runHistory=self.runHistory)
                 gudpy.loadFromFile(loadFile=filename)
                 self.gudpy = gudpy
         except (FileNotFoundError, exc.ParserException) as e:
@@ -216,7 +224,7 @@ class GudPyController(QtCore.QObject):
         result = configurationDialog.widget.exec()
 
         if not configurationDialog.cancelled and result:
-            self.gudpy = gp.GudPy()
+            self.gudpy = gp.GudPy(runHistory=self.runHistory)
             self.gudpy.loadFromFile(
                 loadFile=configurationDialog.configuration,
                 format=enums.Format.TXT,
@@ -255,7 +263,7 @@ class GudPyController(QtCore.QObject):
             # If not, call save dialog
             if not self.setSaveLocation():
                 return
-        self.gudpy.save()
+        self.gudpy.save(snapshot=True)
         self.mainWidget.setUnModified()
 
     def saveAs(self):
@@ -302,7 +310,7 @@ class GudPyController(QtCore.QObject):
         exportDialog.widget.exec()
 
     def autosave(self):
-        if self.gudpy.checkSaveLocation() and not self.workerThread:
+        if self.gudpy.checkSaveLocation():
             self.gudpy.save(path=self.gudpy.autosaveLocation)
 
     """
@@ -359,10 +367,12 @@ class GudPyController(QtCore.QObject):
             self.mainWidget.setControlsEnabled(True)
             return False
 
-        self.gudpy.purgeFile = PurgeFile(self.gudpy.gudrunFile)
+        # Purge works on a copy, as the project may be edited meanwhile
+        gudrunFile = self.gudpy.gudrunFile.clone()
+        self.gudpy.purgeFile = PurgeFile(gudrunFile)
         self.gudpy.purge = worker.PurgeWorker(
             purgeFile=self.gudpy.purgeFile,
-            gudrunFile=self.gudpy.gudrunFile,
+            gudrunFile=gudrunFile,
         )
         self.connectProcessSignals(
             process=self.gudpy.purge, onFinish=self.purgeFinished
@@ -418,10 +428,42 @@ class GudPyController(QtCore.QObject):
         self.workerThread.purge = self.gudpy.purge
         self.workerThread.start()
 
+    def launchProcess(self, process: QtCore.QThread) -> None:
+        """Starts a process, or queues it if another is running.
+        Processes work on snapshots of the project, so it can be edited
+        while they run.
+        """
+        if self.workerThread:
+            self.queue.append(process)
+            return
+        self.workerThread = process
+        self.startProcess()
+
+    def processFinished(self) -> None:
+        """Starts the next queued process, if any
+        """
+        self.workerThread = None
+        if self.queue:
+            self.launchProcess(self.queue.pop(0))
+
+    def mergeSnapshot(self, snapshot: RunSnapshot, result=None) -> None:
+        """Merges the changes a process made to its snapshot into
+        the project, warning of those which were not merged
+        """
+        conflicts = snapshot.merge(result)
+        if conflicts:
+            self.mainWidget.sendWarning(
+                "The following were edited while Gudrun was running, "
+                "so the values it found were not applied:\n"
+                + "\n".join(
+                    f"{'/'.join(str(p) for p in path)}: {name}"
+                    for path, name in conflicts
+                )
+            )
+
     def runPurge(self) -> bool:
         if self.createPurgeProcess():
-            self.workerThread = self.gudpy.purge
-            self.startProcess()
+            self.launchProcess(self.gudpy.purge)
 
     def purgeFinished(self, exitcode):
         self.purged = True
@@ -450,22 +492,32 @@ class GudPyController(QtCore.QObject):
         )
 
         if isinstance(self.workerThread, gp.Purge):
-            self.workerThread = None
+            self.processFinished()
 
-    def runGudrun(self, gudrunFile=None):
-        if not gudrunFile:
-            gudrunFile = self.gudpy.gudrunFile
+    def runGudrun(self, runMode=None):
+        """Runs Gudrun on a snapshot of the project
 
+        Parameters
+        ----------
+        runMode : callable, optional
+            Builds the GudrunFile to run from the snapshot, such as
+            `RunModes.partition`, by default the snapshot is run
+        """
         if not self.prepareRun():
             return
 
-        self.gudpy.gudrun = worker.GudrunWorker(gudrunFile, self.gudpy.purge)
+        snapshot = RunSnapshot(self.gudpy.gudrunFile)
+        gudrunFile = snapshot.gudrunFile
+        if runMode:
+            gudrunFile = runMode(gudrunFile)
+
+        process = worker.GudrunWorker(
+            gudrunFile, self.gudpy.purge, incremental=not runMode,
+            snapshot=snapshot, history=self.runHistory)
         self.connectProcessSignals(
-            process=self.gudpy.gudrun, onFinish=self.gudrunFinished
+            process=process, onFinish=self.gudrunFinished
         )
-
-        self.workerThread = self.gudpy.gudrun
-        self.startProcess()
+        self.launchProcess(process)
 
     def iterateGudrun(self, dialog):
         iterationDialog = dialog(
@@ -475,96 +527,121 @@ class GudPyController(QtCore.QObject):
             return
         if not self.prepareRun():
             return
+        snapshot = RunSnapshot(self.gudpy.gudrunFile)
         # If it is a Composition iteration, the gudrunFile must be specified
         if iterationDialog.iteratorType == iterators.Composition:
-            iterationDialog.params["gudrunFile"] = self.gudpy.gudrunFile
+            iterationDialog.params["gudrunFile"] = snapshot.gudrunFile
 
         self.gudpy.iterator = iterationDialog.iteratorType(
             **iterationDialog.params)
 
         # If Composition iterator, initialise Composition Worker
         if iterationDialog.iteratorType == iterators.Composition:
-            self.gudpy.gudrunIterator = worker.CompositionWorker(
-                self.gudpy.iterator, self.gudpy.gudrunFile, self.gudpy.purge)
+            process = worker.CompositionWorker(
+                self.gudpy.iterator, snapshot.gudrunFile, self.gudpy.purge,
+                snapshot=snapshot)
             self.connectProcessSignals(
-                process=self.gudpy.gudrunIterator,
+                process=process,
                 onFinish=self.compositionIterationFinished
             )
         # Else use standard GudrunIteratorWorker
         else:
-            self.gudpy.gudrunIterator = worker.GudrunIteratorWorker(
-                self.gudpy.iterator, self.gudpy.gudrunFile, self.gudpy.purge)
+            process = worker.GudrunIteratorWorker(
+                self.gudpy.iterator, snapshot.gudrunFile, self.gudpy.purge,
+                snapshot=snapshot)
             self.connectProcessSignals(
-                process=self.gudpy.gudrunIterator,
+                process=process,
                 onFinish=self.gudrunFinished
             )
-
-        self.workerThread = self.gudpy.gudrunIterator
-        self.startProcess()
+        self.launchProcess(process)
 
     def gudrunFinished(self, exitcode):
-        if self.workerThread == self.gudpy.gudrunIterator:
-            if self.gudpy.gudrunIterator.exitcode[0] != 0:
+        process = self.workerThread
+        if isinstance(process, worker.BatchWorker):
+            if exitcode != 0:
+                self.mainWidget.sendError(
+                    f"Batch Processing failed with the following output: "
+                    f"\n{process.error}"
+                )
+            self.processFinished()
+            return
+        if isinstance(process, worker.IteratorBaseWorker):
+            self.gudpy.gudrunIterator = process
+            if process.exitcode[0] != 0:
                 self.mainWidget.sendError(
                     f"Gudrun Iteration failed with the following output: "
-                    f"\n{self.gudpy.gudrunIterator.error}"
+                    f"\n{process.error}"
                 )
+                self.processFinished()
                 return
 
+            if process.snapshot:
+                self.mergeSnapshot(process.snapshot, process.gudrunFile)
+            self.gudpy.gudrunOutput = process.gudrunOutput
             self.mainWidget.outputSlots.setOutput(
-                self.gudpy.gudrunIterator.output,
-                f"Gudrun {self.gudpy.gudrunIterator.iterator.name}")
+                process.output,
+                f"Gudrun {process.iterator.name}")
             self.mainWidget.sampleSlots.setSample(
                 self.mainWidget.sampleSlots.sample)
             self.mainWidget.iterationResultsDialog(
-                self.gudpy.gudrunIterator.result,
-                self.gudpy.gudrunIterator.iterator.name)
+                process.result,
+                process.iterator.name)
             self.mainWidget.updateWidgets(
-                gudrunFile=self.gudpy.gudrunIterator.gudrunFile,
-                gudrunOutput=self.gudpy.gudrunIterator.gudrunOutput
+                gudrunFile=self.gudpy.gudrunFile,
+                gudrunOutput=process.gudrunOutput
             )
-        elif self.workerThread == self.gudpy.gudrun:
+        elif isinstance(process, worker.GudrunWorker):
+            self.gudpy.gudrun = process
             if exitcode != 0:
                 self.mainWidget.sendError(
                     f"Gudrun failed with the following output: "
-                    f"\n{self.gudpy.gudrun.error}"
+                    f"\n{process.error}"
                 )
+                self.processFinished()
                 return
+            if process.gudrunFile is not process.snapshot.gudrunFile:
+                # Runs of a GudrunFile built from the snapshot only
+                # change where the inputs of the project were written
+                process.snapshot.gudrunFile.setGudrunDir(
+                    process.gudrunOutput.directory())
+            self.mergeSnapshot(process.snapshot)
+            self.gudpy.gudrunOutput = process.gudrunOutput
             self.mainWidget.outputSlots.setOutput(
-                self.gudpy.gudrun.output, "Gudrun")
+                process.output, "Gudrun")
             self.mainWidget.updateWidgets(
                 gudrunFile=self.gudpy.gudrunFile,
-                gudrunOutput=self.gudpy.gudrun.gudrunOutput
+                gudrunOutput=process.gudrunOutput
             )
-        self.workerThread = None
+        self.processFinished()
 
     def compositionIterationFinished(self, exitcode):
         if exitcode != 0:
             self.gudrunFinished(exitcode)
             return
 
-        for original, new in self.gudrunIterator.compositionMap.items():
+        process = self.workerThread
+        self.gudpy.gudrunIterator = process
+        # The map is from the samples of the snapshot, so accepted
+        # compositions are set on the samples they were taken from
+        for sample, new in process.iterator.compositionMap.items():
+            original = process.snapshot.originalOf(sample)
+            if original is None:
+                continue
             d = dialogs.composition_acceptance.CompositionAcceptanceDialog(
-                new, self.gudrunIterator.gudrunFile, self.mainWidget.ui)
+                new, process.gudrunFile, self.mainWidget.ui)
             result = d.widget.exec()
             if result:
                 original.composition = new.composition
                 if self.mainWidget.sampleSlots.sample == original:
                     self.mainWidget.sampleSlots.setSample(original)
+        self.processFinished()
 
     def runContainersAsSamples(self):
-        if not self.prepareRun():
-            return
-        gudrunFile = self.gudpy.runModes.convertContainersToSample(
-            self.gudpy.gudrunFile
-        )
-        self.runGudrun(gudrunFile=gudrunFile)
+        self.runGudrun(
+            runMode=self.gudpy.runModes.convertContainersToSample)
 
     def runFilesIndividually(self):
-        if not self.prepareRun():
-            return
-        gudrunFile = self.gudpy.runModes.partition(self.gudpy.gudrunFile)
-        self.runGudrun(gudrunFile=gudrunFile)
+        self.runGudrun(runMode=self.gudpy.runModes.partition)
 
     def runBatchProcessing(self):
         if not self.prepareRun():
@@ -572,8 +649,8 @@ class GudPyController(QtCore.QObject):
         dialog = dialogs.batch.BatchProcessingDialog(
             self.mainWidget
         )
-        self.gudpy.gudrunIterator = worker.BatchWorker(
-            gudrunFile=self.gudpy.gudrunFile,
+        process = worker.BatchWorker(
+            gudrunFile=self.gudpy.gudrunFile.clone(),
             purge=self.gudpy.purge,
             iterator=dialog.iterator,
             batchSize=dialog.batchSize,
@@ -584,13 +661,13 @@ class GudPyController(QtCore.QObject):
         )
 
         self.connectProcessSignals(
-            process=self.gudpy.gudrunIterator,
+            process=process,
             onFinish=self.gudrunFinished
         )
-        self.workerThread = self.gudpy.gudrunIterator
-        self.startProcess()
+        self.launchProcess(process)
 
     def stopProcess(self):
+        self.queue.clear()
         if self.workerThread:
             self.workerThread.requestInterruption()
             self.workerThread.wait()
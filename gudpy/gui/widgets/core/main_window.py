@@ -334,7 +334,9 @@ class GudPyMainWindow(QtWidgets.QMainWindow):
         self.ui.currentTaskLabel.setText("No task running.")
 
     def processStarted(self):
-        self.setControlsEnabled(False)
+        # Processes run on snapshots, so the project can still be
+        # edited, but not replaced
+        self.setProjectActionsEnabled(False)
         self.ui.progressBar.setValue(0)
 
     def autosaveMessage(
@@ -767,6 +769,11 @@ class GudPyMainWindow(QtWidgets.QMainWindow):
         self.ui.exportInputFile.setEnabled(state)
         self.ui.exportArchive.setEnabled(state)
 
+    def setProjectActionsEnabled(self, state):
+        self.ui.loadInputFile.setEnabled(state)
+        self.ui.loadProject.setEnabled(state)
+        self.ui.new_.setEnabled(state)
+
     def setTreeActionsEnabled(self, state):
         self.ui.insertSampleBackground.setEnabled(state)
         self.ui.insertSample.setEnabled(state)
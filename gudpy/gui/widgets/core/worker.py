@@ -6,8 +6,9 @@ from core import gudpy
 import core.exception as exc
 from core.gudrun_file import GudrunFile
 from core.purge_file import PurgeFile
+from core.run_snapshot import RunSnapshot
 from core.iterators import Iterator
-from core import iterators, config
+from core import iterators, config, run_planner
 
 SUFFIX = ".exe" if os.name == "nt" else ""
 
@@ -77,12 +78,19 @@ class GudrunWorker(Worker, gudpy.Gudrun):
             self,
             gudrunFile: GudrunFile,
             purge: PurgeWorker = None,
-            iterator: Iterator = None
+            iterator: Iterator = None,
+            incremental: bool = False,
+            snapshot: RunSnapshot = None,
+            history: run_planner.RunHistory = None
     ):
         super().__init__()
         self.name = "Gudrun"
+        self.history = history or run_planner.RunHistory()
         self.gudrunFile = gudrunFile
         self.iterator = iterator
+        self.incremental = incremental
+        # Snapshot the GudrunFile was taken from, to merge back
+        self.snapshot = snapshot
         self.purge = purge
         self.purge = None
         self.progress = 0
@@ -121,7 +129,8 @@ class GudrunWorker(Worker, gudpy.Gudrun):
     def run(self):
         exitcode = self.gudrun(
             gudrunFile=self.gudrunFile,
-            purge=self.purge, iterator=self.iterator)
+            purge=self.purge, iterator=self.iterator,
+            incremental=self.incremental)
         self.finished.emit(exitcode)
 
 
@@ -135,10 +144,13 @@ class IteratorBaseWorker(QThread):
         iterator: iterators.Iterator,
         gudrunFile: GudrunFile,
         purge: PurgeWorker = None,
+        snapshot: RunSnapshot = None
     ):
         super().__init__(iterator=iterator, gudrunFile=gudrunFile)
         self.gudrunObjects = []
         self.purge = purge
+        # Snapshot the GudrunFile was taken from, to merge back
+        self.snapshot = snapshot
         self.output = {}
         self.error = ""
 
@@ -178,8 +190,10 @@ class GudrunIteratorWorker(IteratorBaseWorker, gudpy.GudrunIterator):
         iterator: iterators.Iterator,
         gudrunFile: GudrunFile,
         purge: PurgeWorker = None,
+        snapshot: RunSnapshot = None
     ):
-        super().__init__(iterator=iterator, gudrunFile=gudrunFile, purge=purge)
+        super().__init__(iterator=iterator, gudrunFile=gudrunFile, purge=purge,
+                         snapshot=snapshot)
 
 
 class CompositionWorker(IteratorBaseWorker, gudpy.CompositionIterator):
@@ -188,8 +202,11 @@ class CompositionWorker(IteratorBaseWorker, gudpy.CompositionIterator):
         iterator: iterators.Composition,
         gudrunFile: GudrunFile,
         purge: PurgeWorker = None,
+        snapshot: RunSnapshot = None
     ):
-        super().__init__(iterator=iterator, gudrunFile=gudrunFile, purge=purge)
+        super().__init__(
+            iterator=iterator, gudrunFile=gudrunFile, purge=purge,
+            snapshot=snapshot)
 
     def run(self):
         exitcode, error = self.iterate(purge=self.purge)
@@ -209,9 +226,12 @@ class BatchWorker(IteratorBaseWorker, gudpy.BatchProcessing):
         rtol=0.0,
         separateFirstBatch=False
     ):
-        super().__init__(
+        # The iterator is optional, so the Gudrun objects of
+        # IteratorBaseWorker are not created
+        QThread.__init__(self)
+        gudpy.BatchProcessing.__init__(
+            self,
             gudrunFile=gudrunFile,
-            purge=purge,
             iterator=iterator,
             batchSize=batchSize,
             stepSize=stepSize,
@@ -219,19 +239,28 @@ class BatchWorker(IteratorBaseWorker, gudpy.BatchProcessing):
             rtol=rtol,
             separateFirstBatch=separateFirstBatch
         )
+        self.gudrunObjects = []
+        self.purge = purge
+        self.snapshot = None
+        self.output = {}
+        self.error = ""
         self.name = "Batch Processing " + iterator.name if iterator else ""
 
         # Iterate through gudrun iterators and connect the signals
-        for gudrunIterator in self.gudrunIterators.items():
+        for gudrunIterator in self.gudrunIterators.values():
             if not gudrunIterator:
                 continue
             # Create GudrunWorker objects to replace Gudrun objects
             gudrunIterator.gudrunObjects = []
-            for _ in range(self.iterator.nTotal):
-                worker = GudrunWorker(self.firstBatch, gudrunIterator.iterator)
+            for _ in range(
+                self.iterator.nTotal
+                + (1 if self.iterator.requireDefault else 0)
+            ):
+                worker = GudrunWorker(
+                    gudrunIterator.gudrunFile, gudrunIterator.iterator)
                 worker.outputChanged.connect(self._outputChanged)
                 worker.progressChanged.connect(self._progressChanged)
-                gudrunIterator.append(worker)
+                gudrunIterator.gudrunObjects.append(worker)
 
     def run(self):
         try:
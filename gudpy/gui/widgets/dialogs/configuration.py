@@ -5,6 +5,7 @@ from PySide6.QtWidgets import QDialog
 from PySide6.QtUiTools import QUiLoader
 
 from core import config
+from core import text_file
 
 
 class ConfigurationDialog(QDialog):
@@ -105,7 +106,7 @@ class ConfigurationDialog(QDialog):
             )
         )
         self.widget.configDescriptionTextEdit.setText(
-            open(self.configuration, "r").readlines()[-1]
+            text_file.readLines(self.configuration)[-1]
         )
 
     def handleDataFileTypeChanged(self, comboText):
@@ -87,23 +87,23 @@ class CompositionModel(GudPyTableModel):
                 elif value not in massData.keys():
                     return False
                 if not sears91.isIsotope(
-                    value, self._data[row].__dict__[self.attrs[1]]
+                    value, getattr(self._data[row], self.attrs[1])
                 ):
-                    self._data[row].__dict__[self.attrs[1]] = 0
+                    setattr(self._data[row], self.attrs[1], 0)
                     self.dataChanged.emit(
                         self.index(row, 1, QModelIndex()),
                         self.index(row, 1, QModelIndex())
                     )
             if col == 1:
                 if (
-                    self._data[row].__dict__[self.attrs[0]]
+                    getattr(self._data[row], self.attrs[0])
                     and not sears91.isIsotope(
-                        self._data[row].__dict__[self.attrs[0]],
+                        getattr(self._data[row], self.attrs[0]),
                         value
                     )
                 ):
                     return False
-            self._data[row].__dict__[self.attrs[col]] = value
+            setattr(self._data[row], self.attrs[col], value)
             self.dataChanged.emit(index, index)
 
     def insertRow(self):
@@ -149,10 +149,10 @@ class CompositionModel(GudPyTableModel):
                 sears91 = Sears91()
                 isotope = sears91.findIsotope(
                     self.data(self.index(row, 0), Qt.EditRole),
-                    self._data[row].__dict__[self.attrs[1]]
+                    getattr(self._data[row], self.attrs[1])
                 )
                 return sears91.isotope(isotope)
-            return self._data[row].__dict__[self.attrs[col]]
+            return getattr(self._data[row], self.attrs[col])
 
 
 class CompositionTable(QTableView):
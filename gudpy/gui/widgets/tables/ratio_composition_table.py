@@ -320,7 +320,7 @@ class RatioCompositionTable(QTableView):
         )
         self.makeModel(
             self.gudrunFile,
-            composition.weightedComponents,
+            self.parentObject.composition.weightedComponents,
             self.parentObject
         )
 
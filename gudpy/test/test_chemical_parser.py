@@ -226,3 +226,35 @@ class TestChemicalParser(TestCase):
                 "  -    H_3, H[3]\n",
                 str(cm.exception)
             )
+
+    def testRepeatedParseGivesNewElements(self):
+
+        first = Component("H2O")
+        first.parse()
+        first.elements[0].abundance = 5.0
+
+        second = Component("H2O")
+        second.parse()
+        self.assertEqual(second.elements[0].abundance, 2.0)
+        self.assertIsNot(first.elements[0], second.elements[0])
+
+    def testRepeatedInvalidParse(self):
+
+        for _ in range(2):
+            with self.assertRaises(ChemicalFormulaParserException):
+                Component("H[4]").parse()
+            self.assertFalse(Component("H2Xx").parse(persistent=False))
+
+    def testParseLongFormula(self):
+
+        formula = "C[13]2.5H[2]3O" * 200
+        component = Component(formula)
+        component.parse()
+
+        self.assertEqual(len(component.elements), 600)
+        self.assertEqual(component.elements[-3].atomicSymbol, "C")
+        self.assertEqual(component.elements[-3].massNo, 13)
+        self.assertEqual(component.elements[-3].abundance, 2.5)
+        self.assertEqual(component.elements[-2].massNo, 2)
+        self.assertEqual(component.elements[-2].abundance, 3.0)
+        self.assertEqual(component.elements[-1].abundance, 1.0)
@@ -0,0 +1,97 @@
+import random
+from unittest import TestCase
+
+from core.composition import (
+    Component, Composition, WeightedComponent
+)
+from core.composition_engine import Abundances
+from core.element import Element
+
+
+def referenceTranslate(weightedComponents):
+    """Translates weighted components one element at a time"""
+    elements = []
+    target = []
+    for wc in weightedComponents:
+        elements.extend(wc.translate())
+    for element in elements:
+        exists = False
+        for element_ in target:
+            if (
+                element.atomicSymbol == element_.atomicSymbol
+                and element.massNo == element_.massNo
+            ):
+                element_.abundance += element.abundance
+                exists = True
+        if not exists:
+            target.append(element)
+    return target
+
+
+def asTuples(elements):
+    return [(el.atomicSymbol, el.massNo, el.abundance) for el in elements]
+
+
+class TestCompositionEngine(TestCase):
+
+    def randomComposition(self, rng):
+        isotopes = [("H", 0), ("H", 2), ("O", 0), ("C", 0), ("N", 0)]
+        composition = Composition("Sample")
+        for i in range(rng.randrange(1, 5)):
+            component = Component(f"C{i}", [
+                Element(*rng.choice(isotopes), rng.uniform(0.1, 10.0))
+                for _ in range(rng.randrange(1, 6))
+            ])
+            composition.weightedComponents.append(
+                WeightedComponent(component, rng.uniform(0.0, 5.0)))
+        return composition
+
+    def testTranslateMatchesReference(self):
+        rng = random.Random(3)
+        for _ in range(200):
+            composition = self.randomComposition(rng)
+            expected = asTuples(
+                referenceTranslate(composition.weightedComponents))
+            composition.translate()
+            self.assertEqual(asTuples(composition.elements), expected)
+
+    def testShallowTranslate(self):
+        composition = self.randomComposition(random.Random(5))
+        composition.elements = [Element("V", 0, 1.0)]
+        elements = composition.shallowTranslate()
+        self.assertEqual(
+            asTuples(elements),
+            asTuples(referenceTranslate(composition.weightedComponents))
+        )
+        self.assertEqual(asTuples(composition.elements), [("V", 0, 1.0)])
+
+    def testSumAndMutate(self):
+        target = [Element("H", 0, 1.0), Element("O", 0, 2.0)]
+        elements = [
+            Element("O", 0, 0.5), Element("C", 0, 1.0), Element("C", 0, 2.0)
+        ]
+        Composition.sumAndMutate(elements, target)
+        self.assertEqual(
+            asTuples(target),
+            [("H", 0, 1.0), ("O", 0, 2.5), ("C", 0, 3.0)]
+        )
+
+    def testFromElements(self):
+        abundances = Abundances.fromElements([
+            Element("H", 2, 1.0), Element("O", 0, 1.0), Element("H", 2, 1.0)
+        ])
+        self.assertEqual(abundances.keys, [("H", 2), ("O", 0)])
+        self.assertEqual(abundances.values.tolist(), [2.0, 1.0])
+        self.assertEqual(
+            abundances.expectedDCSLevel(),
+            Composition.calculateExpectedDCSLevel(abundances.toElements())
+        )
+
+    def testUnknownIsotope(self):
+        abundances = Abundances.fromElements([Element("H", 7, 1.0)])
+        with self.assertRaises(KeyError):
+            abundances.expectedDCSLevel()
+        self.assertEqual(
+            Composition.calculateExpectedDCSLevel([Element("H", 7, 0.0)]),
+            0.0
+        )
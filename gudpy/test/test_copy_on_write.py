@@ -0,0 +1,233 @@
+import os
+import pickle
+import random
+import threading
+from copy import deepcopy
+from unittest import TestCase
+
+import numpy as np
+
+from core import gudpy as gp
+from core.container import Container
+from core.copy_on_write import CopyOnWriteList, fields
+from core.element import Element
+from core.enums import Format
+from core.gudpy_yaml import YAML
+
+
+def snapshot(gudrunFile):
+    """Returns an independent copy, made without structural sharing
+    """
+    return pickle.loads(pickle.dumps(gudrunFile))
+
+
+class TestCopyOnWrite(TestCase):
+    def setUp(self) -> None:
+        gudpy = gp.GudPy()
+        gudpy.loadFromFile(
+            loadFile=os.path.join(
+                os.path.dirname(__file__),
+                "TestData/NIMROD-water/water.txt"
+            ),
+            format=Format.TXT
+        )
+        self.gudrunFile = gudpy.gudrunFile
+        self.yaml = YAML()
+        return super().setUp()
+
+    def assertSameModel(self, a, b):
+        self.assertEqual(self.yaml.toYamlDict(a), self.yaml.toYamlDict(b))
+
+    def testCopyUnaffectedBySource(self):
+        expected = snapshot(self.gudrunFile)
+        copy = deepcopy(self.gudrunFile)
+
+        sample = self.gudrunFile.sampleBackgrounds[0].samples[0]
+        sample.name = "Changed"
+        sample.composition.elements[0].abundance = 99.0
+        sample.containers.append(Container())
+        self.gudrunFile.sampleBackgrounds[0].samples.pop()
+        self.gudrunFile.instrument.groupingParameterPanel.append(
+            (1, 0.0, 0.0, 0.0))
+
+        self.assertSameModel(copy, expected)
+
+    def testCopyUnaffectedByNestedEdit(self):
+        sample = self.gudrunFile.sampleBackgrounds[0].samples[0]
+        sample.exponentialValues = [[0.0, 1.5, 0]]
+        sample.resonanceValues.append([0.1, 0.2])
+        self.assertIsInstance(sample.exponentialValues[0], CopyOnWriteList)
+        self.assertIsInstance(sample.resonanceValues[0], CopyOnWriteList)
+        expected = snapshot(self.gudrunFile)
+        copy = deepcopy(self.gudrunFile)
+
+        # Tables edit their rows in place
+        sample.exponentialValues[0][0] = 7.5
+        sample.resonanceValues[0][1] = 0.3
+
+        self.assertSameModel(copy, expected)
+        copied = copy.sampleBackgrounds[0].samples[0]
+        self.assertEqual(copied.exponentialValues, [[0.0, 1.5, 0]])
+        self.assertEqual(copied.resonanceValues, [[0.1, 0.2]])
+
+    def testSourceUnaffectedByCopy(self):
+        expected = snapshot(self.gudrunFile)
+        copy = deepcopy(self.gudrunFile)
+
+        sample = copy.sampleBackgrounds[0].samples[0]
+        sample.name = "Changed"
+        sample.composition.elements.append(Element("H", 0, 1.0))
+        copy.sampleBackgrounds[0].samples.clear()
+
+        self.assertSameModel(self.gudrunFile, expected)
+
+    def testSharedObjectsStayShared(self):
+        sample = self.gudrunFile.sampleBackgrounds[0].samples[0]
+        sample.containers.append(sample.containers[0])
+        copy = deepcopy(self.gudrunFile)
+        copied = copy.sampleBackgrounds[0].samples[0]
+        self.assertIs(copied.containers[0], copied.containers[-1])
+        self.assertIsNot(copied.containers[0], sample.containers[0])
+
+    def testCopyOfCopy(self):
+        first = deepcopy(self.gudrunFile)
+        first.sampleBackgrounds[0].samples[0].name = "First"
+        expected = snapshot(first)
+        second = deepcopy(first)
+        first.sampleBackgrounds[0].samples[0].name = "Changed"
+        self.assertSameModel(second, expected)
+
+    def testPickle(self):
+        copy = deepcopy(self.gudrunFile)
+        unpickled = pickle.loads(pickle.dumps(copy))
+        self.assertSameModel(unpickled, self.gudrunFile)
+        self.assertNotIn("_cowModified", fields(unpickled.instrument))
+
+    def testCopyIsMadeAtOnce(self):
+        copy = deepcopy(self.gudrunFile)
+        sample = self.gudrunFile.sampleBackgrounds[0].samples[0]
+        copied = copy.sampleBackgrounds[0].samples[0]
+        self.assertIsNot(copied, sample)
+        self.assertIsNot(copied.composition, sample.composition)
+        self.assertIsNot(copy.instrument, self.gudrunFile.instrument)
+
+    def testCopyUnaffectedByDictEdit(self):
+        gudrunFile = self.gudrunFile
+        gudrunFile.extra = {"rows": [1, 2]}
+        gudrunFile.array = np.zeros(3)
+        copy = deepcopy(self.gudrunFile)
+
+        # Values other than lists are changed in place untracked
+        gudrunFile.extra["rows"].append(3)
+        gudrunFile.extra["new"] = True
+        gudrunFile.array[0] = 1.0
+
+        self.assertEqual(copy.extra, {"rows": [1, 2]})
+        self.assertEqual(list(copy.array), [0.0, 0.0, 0.0])
+
+    def testCopyRacingEdits(self):
+        samples = self.gudrunFile.sampleBackgrounds[0].samples
+        names = [s.name for s in samples]
+        stop = threading.Event()
+
+        def edit():
+            i = 0
+            while not stop.is_set():
+                sample = samples[i % len(samples)]
+                sample.name = f"Edited {i}"
+                sample.exponentialValues[0][0] = float(i)
+                i += 1
+
+        copies = [deepcopy(self.gudrunFile) for _ in range(5)]
+        thread = threading.Thread(target=edit)
+        thread.start()
+        try:
+            # A copy made before the edits started never sees them
+            for _ in range(20):
+                for copy in copies[:5]:
+                    self.assertEqual(
+                        [s.name for s in copy.sampleBackgrounds[0].samples],
+                        names
+                    )
+                copies.append(deepcopy(self.gudrunFile))
+        finally:
+            stop.set()
+            thread.join()
+        # Copies made during the edits are consistent with themselves
+        for copy in copies[5:]:
+            self.assertSameModel(copy, pickle.loads(pickle.dumps(copy)))
+
+    def testRandomEdits(self):
+        self.checkRandomEdits(random.Random(42))
+
+    def testCloneIsIndependent(self):
+        expected = snapshot(self.gudrunFile)
+        clone = self.gudrunFile.clone()
+        self.assertSameModel(clone, expected)
+
+        sample = clone.sampleBackgrounds[0].samples[0]
+        sample.name = "Changed"
+        sample.composition.elements[0].abundance = 99.0
+        clone.sampleBackgrounds[0].samples.pop()
+        self.assertSameModel(self.gudrunFile, expected)
+
+    def testCloneSharesImmutables(self):
+        sample = self.gudrunFile.sampleBackgrounds[0].samples[0]
+        clone = sample.clone()
+        self.assertIsNot(clone, sample)
+        self.assertIsNot(clone.composition, sample.composition)
+        self.assertIs(clone.name, sample.name)
+        self.assertIs(clone.normaliseTo, sample.normaliseTo)
+
+    def testCloneSharedObjectsStayShared(self):
+        sample = self.gudrunFile.sampleBackgrounds[0].samples[0]
+        sample.containers.append(sample.containers[0])
+        clone = self.gudrunFile.clone()
+        cloned = clone.sampleBackgrounds[0].samples[0]
+        self.assertIs(cloned.containers[0], cloned.containers[-1])
+        self.assertIsNot(cloned.containers[0], sample.containers[0])
+
+    def testCloneOfCopy(self):
+        copy = deepcopy(self.gudrunFile)
+        clone = copy.clone()
+        copy.sampleBackgrounds[0].samples[0].name = "Changed"
+        self.assertSameModel(clone, self.gudrunFile)
+
+    def testCloneIgnoresFields(self):
+        clone = self.gudrunFile.clone()
+        self.assertNotIn("yaml", fields(clone))
+
+    def checkRandomEdits(self, rng):
+        """Applies the same random edits to copies and to independent
+        snapshots, and checks that they agree
+        """
+        models = [(self.gudrunFile, snapshot(self.gudrunFile))]
+
+        def edit(gudrunFile):
+            samples = gudrunFile.sampleBackgrounds[0].samples
+            choice = rng.randrange(5)
+            if choice == 0 and samples:
+                samples[rng.randrange(len(samples))].name = str(rng.random())
+            elif choice == 1 and samples:
+                sample = samples[rng.randrange(len(samples))]
+                if sample.composition.elements:
+                    sample.composition.elements[0].abundance = rng.random()
+            elif choice == 2 and len(samples) > 1:
+                samples.pop(rng.randrange(len(samples)))
+            elif choice == 3 and samples:
+                samples.append(samples[0])
+            else:
+                gudrunFile.instrument.wavelengthMin = rng.random()
+
+        for _ in range(200):
+            i = rng.randrange(len(models))
+            if rng.random() < 0.2:
+                models.append((deepcopy(models[i][0]), snapshot(models[i][1])))
+            else:
+                state = rng.getstate()
+                edit(models[i][0])
+                rng.setstate(state)
+                edit(models[i][1])
+
+        for model, expected in models:
+            self.assertSameModel(model, expected)
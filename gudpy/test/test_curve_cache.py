@@ -0,0 +1,81 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+import numpy as np
+
+from core import curve_cache
+from core.curve_cache import CurveCache
+from core.exception import ParserException
+
+WATER_REF = os.path.join(
+    os.path.dirname(__file__), "TestData", "water-ref", "plain"
+)
+
+
+class TestCurveCache(TestCase):
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.paths = []
+        for ext in (".mint01", ".mgor01"):
+            name = f"NIMROD00016608_H2O_in_N9{ext}"
+            path = os.path.join(self.tempdir.name, name)
+            shutil.copyfile(os.path.join(WATER_REF, name), path)
+            self.paths.append(path)
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        self.tempdir.cleanup()
+        return super().tearDown()
+
+    def testMemoryHit(self):
+        cache = CurveCache()
+        curve = cache.load(self.paths[0])
+        self.assertIs(cache.load(self.paths[0]), curve)
+        self.assertEqual(cache.size, curve.data.nbytes)
+
+    def testSidecar(self):
+        curve = CurveCache().load(self.paths[0])
+        npyPath, jsonPath = CurveCache.sidecarPaths(self.paths[0])
+        self.assertTrue(os.path.exists(npyPath))
+        self.assertTrue(os.path.exists(jsonPath))
+
+        # A new cache reopens the sidecar with memory mapping
+        cached = CurveCache().load(self.paths[0])
+        self.assertIsInstance(cached.data, np.memmap)
+        self.assertTrue(np.array_equal(cached.data, curve.data))
+        self.assertEqual(cached.header, curve.header)
+        self.assertEqual(cached.metadata, curve.metadata)
+
+    def testModifiedFileReparsed(self):
+        cache = CurveCache()
+        cache.load(self.paths[0])
+        with open(self.paths[0], "w", encoding="utf-8") as fp:
+            fp.write("# new\n 1.0 2.0 3.0\n")
+        for c in (cache, CurveCache()):
+            curve = c.load(self.paths[0])
+            self.assertEqual(curve.header, ["# new\n"])
+            self.assertTrue(np.array_equal(curve.data, [[1.0], [2.0], [3.0]]))
+
+    def testMemoryBudget(self):
+        sizes = [CurveCache().load(path).data.nbytes for path in self.paths]
+        cache = CurveCache(memoryBudget=max(sizes))
+        cache.load(self.paths[0])
+        cache.load(self.paths[1])
+        self.assertEqual(list(cache.entries), [self.paths[1]])
+        self.assertLessEqual(cache.size, cache.memoryBudget)
+
+        cache = CurveCache(memoryBudget=0)
+        cache.load(self.paths[0])
+        self.assertEqual(cache.size, 0)
+
+    def testNoPersist(self):
+        CurveCache(persist=False).load(self.paths[0])
+        self.assertFalse(os.path.exists(os.path.join(
+            self.tempdir.name, curve_cache.CACHE_DIRNAME)))
+
+    def testMissingFile(self):
+        with self.assertRaises(ParserException):
+            CurveCache().load(
+                os.path.join(self.tempdir.name, "missing.mint01"))
@@ -0,0 +1,85 @@
+import os
+import tempfile
+from unittest import TestCase
+
+import numpy as np
+
+from core.curve_file import CurveFile
+from core.exception import ParserException
+
+WATER_REF = os.path.join(
+    os.path.dirname(__file__), "TestData", "water-ref", "plain"
+)
+
+
+class TestCurveFile(TestCase):
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        self.tempdir.cleanup()
+        return super().tearDown()
+
+    def write(self, name, text):
+        path = os.path.join(self.tempdir.name, name)
+        with open(path, "w", encoding="utf-8") as fp:
+            fp.write(text)
+        return path
+
+    def testMint01(self):
+        path = os.path.join(WATER_REF, "NIMROD00016608_H2O_in_N9.mint01")
+        curve = CurveFile(path)
+
+        expected = []
+        with open(path, "r", encoding="utf-8") as fp:
+            for line in fp:
+                if not line.startswith("#"):
+                    expected.append([float(n) for n in line.split()[:3]])
+        expected = np.array(expected)
+
+        self.assertEqual(len(curve), len(expected))
+        self.assertTrue(np.array_equal(curve.x, expected[:, 0]))
+        self.assertTrue(np.array_equal(curve.y, expected[:, 1]))
+        self.assertTrue(np.array_equal(curve.err, expected[:, 2]))
+        self.assertTrue(curve.x.flags["C_CONTIGUOUS"])
+
+        self.assertEqual(len(curve.header), 14)
+        self.assertEqual(curve.name, "NIMROD00016608_H2O_in_N9.mint01")
+        self.assertTrue(curve.title.startswith("H2O in 1mm TiZr Can N9"))
+        self.assertEqual(curve.metadata["author"], "T. G. A. Youngs, D.")
+        self.assertEqual(curve.metadata["stamp"], "23-OCT-2012 17:45:25")
+
+    def testMgor01(self):
+        curve = CurveFile(
+            os.path.join(WATER_REF, "NIMROD00016608_H2O_in_N9.mgor01"))
+        self.assertEqual(
+            curve.metadata, {"name": "NIMROD00016608_H2O_in_N9.mgor01"})
+        self.assertEqual(curve.x[1], 0.03)
+
+    def testExtraColumnsAndComments(self):
+        curve = CurveFile(self.write(
+            "a.mdcs01",
+            "# a.mdcs01\n"
+            " 1.0 2.0 0.1 9.0\n"
+            "# comment\n"
+            " 2.0 4.0 0.2 9.0\n"
+        ))
+        self.assertTrue(np.array_equal(curve.data,
+                                       [[1.0, 2.0], [2.0, 4.0], [0.1, 0.2]]))
+
+    def testEmptyCurve(self):
+        curve = CurveFile(self.write("a.mdor01", "# a.mdor01\n"))
+        self.assertEqual(len(curve), 0)
+        self.assertEqual(curve.data.shape, (3, 0))
+
+    def testInvalidCurves(self):
+        self.assertRaises(ParserException, CurveFile, "")
+        self.assertRaises(
+            ParserException, CurveFile,
+            os.path.join(self.tempdir.name, "missing.mint01"))
+        self.assertRaises(
+            ParserException, CurveFile, self.write("a.txt", "1 2 3\n"))
+        self.assertRaises(
+            ParserException, CurveFile,
+            self.write("b.mint01", "1.0 2.0 x\n"))
@@ -0,0 +1,99 @@
+import os
+import tempfile
+from unittest import TestCase
+
+import h5py as h5
+import numpy as np
+
+from core import event_slicer
+from core import gudpy as gp
+from core.enums import Format
+
+
+class TestEventSlicer(TestCase):
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tempdir.name, "events.nxs")
+        rng = np.random.default_rng(0)
+        self.events = {
+            "1": rng.uniform(0, 100, 1000),
+            "2": rng.uniform(0, 100, 250),
+        }
+        with h5.File(self.path, "w") as fp:
+            for name, events in self.events.items():
+                fp.create_dataset(name, data=events, chunks=(64,))
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        self.tempdir.cleanup()
+        return super().tearDown()
+
+    def testIterChunks(self):
+        with h5.File(self.path, "r") as fp:
+            chunks = list(event_slicer.iterChunks(fp["1"], 100))
+        self.assertTrue(all(len(c) <= 100 for c in chunks))
+        self.assertTrue(np.array_equal(np.concatenate(chunks),
+                                       self.events["1"]))
+
+    def testCounts(self):
+        edges = [0, 25, 50, 100]
+        slicer = event_slicer.EventSlicer(self.path, edges, chunkSize=100)
+        counts = slicer.counts()
+        for name, events in self.events.items():
+            expected, _ = np.histogram(events, edges)
+            self.assertTrue(np.array_equal(counts[name], expected))
+
+    def testSlice(self):
+        edges = [10, 40, 70]
+        progress = []
+        slicer = event_slicer.EventSlicer(self.path, edges, chunkSize=100)
+        paths = slicer.slice(
+            os.path.join(self.tempdir.name, "slices"), progress.append)
+
+        self.assertEqual(len(paths), 2)
+        self.assertEqual(progress[-1], 100)
+        self.assertEqual(progress, sorted(progress))
+        for i, path in enumerate(paths):
+            with h5.File(path, "r") as fp:
+                self.assertEqual(fp.attrs["start"], edges[i])
+                for name, events in self.events.items():
+                    expected = events[
+                        (events >= edges[i]) & (events < edges[i + 1])]
+                    self.assertTrue(np.array_equal(fp[name][()], expected))
+
+    def testInvalidEdges(self):
+        with self.assertRaises(ValueError):
+            event_slicer.EventSlicer(self.path, [0])
+        with self.assertRaises(ValueError):
+            event_slicer.EventSlicer(self.path, [0, 10, 5])
+
+    def testUniformEdges(self):
+        edges = event_slicer.uniformEdges(self.path, 4, chunkSize=100)
+        self.assertEqual(len(edges), 5)
+        counts = event_slicer.EventSlicer(self.path, edges).counts()
+        self.assertEqual(sum(c.sum() for c in counts.values()), 1250)
+
+    def testSliceSample(self):
+        gudpy = gp.GudPy()
+        gudpy.loadFromFile(
+            loadFile=os.path.join(
+                os.path.dirname(__file__),
+                "TestData/NIMROD-water/water.txt"
+            ),
+            format=Format.TXT
+        )
+        gudrunFile = gudpy.gudrunFile
+        gudrunFile.instrument.dataFileDir = self.tempdir.name
+        gudrunFile.projectDir = os.path.join(self.tempdir.name, "project")
+        sample = gudrunFile.sampleBackgrounds[0].samples[0]
+        sample.dataFiles.dataFiles = ["events.nxs"]
+
+        inputs = event_slicer.sliceSample(gudrunFile, sample, [0, 50, 100])
+        self.assertEqual(len(inputs), 2)
+        self.assertEqual(len({i.projectDir for i in inputs}), 2)
+        slicedSample = inputs[1].sampleBackgrounds[0].samples[0]
+        self.assertEqual(
+            slicedSample.dataFiles.dataFiles,
+            [os.path.join("EventSlices", "events_slice2.nxs")]
+        )
+        self.assertEqual(sample.dataFiles.dataFiles, ["events.nxs"])
@@ -0,0 +1,296 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+from core import config
+from core import fingerprint
+from core import gudpy as gp
+from core import utils
+from core.enums import CrossSectionSource, Format, Geometry
+from core.output_file_handler import (
+    MANIFEST, GudrunOutputHandler, SampleOutput
+)
+from test.test_output_archive import (
+    DATA_FILE, SAMPLE, WATER_REF, writeGudFile
+)
+
+
+def loadWater():
+    gudpy = gp.GudPy()
+    gudpy.loadFromFile(
+        loadFile=os.path.join(
+            os.path.dirname(__file__),
+            "TestData/NIMROD-water/water.txt"
+        ),
+        format=Format.TXT
+    )
+    return gudpy
+
+
+class TestFingerprint(TestCase):
+    def setUp(self) -> None:
+        self.gudrunFile = loadWater().gudrunFile
+        self.samples = self.gudrunFile.sampleBackgrounds[0].samples
+        self.fingerprints = fingerprint.sampleFingerprints(self.gudrunFile)
+        self.geometry = config.geometry
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        config.geometry = self.geometry
+        return super().tearDown()
+
+    def changed(self):
+        """Returns the names of the samples whose fingerprints changed
+        """
+        fingerprints = fingerprint.sampleFingerprints(self.gudrunFile)
+        self.assertEqual(list(fingerprints), list(self.fingerprints))
+        return [
+            name for name in fingerprints
+            if fingerprints[name] != self.fingerprints[name]
+        ]
+
+    def testSamples(self):
+        self.assertEqual(
+            list(self.fingerprints), [s.name for s in self.samples])
+        self.assertEqual(
+            fingerprint.sampleFingerprints(self.gudrunFile.clone()),
+            self.fingerprints
+        )
+
+    def testSampleChange(self):
+        self.samples[0].density = 0.5
+        self.samples[1].composition.elements[0].abundance = 9.0
+        self.samples[2].containers[0].density = 0.5
+        self.assertEqual(
+            self.changed(),
+            [self.samples[0].name, self.samples[1].name,
+             self.samples[2].name]
+        )
+
+    def testSharedChange(self):
+        self.gudrunFile.beam.noSlices = 5
+        self.assertEqual(len(self.changed()), len(self.samples))
+
+    def testGeometryChange(self):
+        config.geometry = (
+            Geometry.CYLINDRICAL if config.geometry == Geometry.FLATPLATE
+            else Geometry.FLATPLATE
+        )
+        self.assertEqual(len(self.changed()), len(self.samples))
+
+    def testIgnoredChange(self):
+        self.gudrunFile.setGudrunDir(tempfile.gettempdir())
+        self.assertEqual(self.changed(), [])
+
+    def testDataFileChange(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            self.gudrunFile.instrument.dataFileDir = tmp
+            path = os.path.join(tmp, self.samples[1].dataFiles[0])
+            with open(path, "w", encoding="utf-8") as fp:
+                fp.write("counts")
+            self.fingerprints = fingerprint.sampleFingerprints(
+                self.gudrunFile)
+            with open(path, "a", encoding="utf-8") as fp:
+                fp.write("more counts")
+            self.assertEqual(self.changed(), [self.samples[1].name])
+
+    def testInputFileChange(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            instrument = self.gudrunFile.instrument
+            instrument.GudrunStartFolder = tmp
+            path = os.path.join(tmp, instrument.detectorCalibrationFileName)
+            os.makedirs(os.path.dirname(path))
+            with open(path, "w", encoding="utf-8") as fp:
+                fp.write("calibration")
+            self.fingerprints = fingerprint.sampleFingerprints(
+                self.gudrunFile)
+            with open(path, "w", encoding="utf-8") as fp:
+                fp.write("recalibration")
+            self.assertEqual(len(self.changed()), len(self.samples))
+
+    def testCrossSectionFileChange(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "cross_section.txt")
+            with open(path, "w", encoding="utf-8") as fp:
+                fp.write("1.0")
+            sample = self.samples[2]
+            sample.totalCrossSectionSource = CrossSectionSource.FILE
+            sample.crossSectionFilename = path
+            self.fingerprints = fingerprint.sampleFingerprints(
+                self.gudrunFile)
+            with open(path, "w", encoding="utf-8") as fp:
+                fp.write("2.0")
+            self.assertEqual(self.changed(), [sample.name])
+
+    def testPurgeOutputChange(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "spec.bad")
+            with open(path, "w", encoding="utf-8") as fp:
+                fp.write("1 2")
+            purged = fingerprint.sampleFingerprints(self.gudrunFile, [path])
+            for name, value in purged.items():
+                self.assertNotEqual(value, self.fingerprints[name])
+            with open(path, "w", encoding="utf-8") as fp:
+                fp.write("1 2 3")
+            repurged = fingerprint.sampleFingerprints(
+                self.gudrunFile, [path])
+            for name, value in repurged.items():
+                self.assertNotEqual(value, purged[name])
+            self.assertNotEqual(
+                fingerprint.dataFileFingerprints(self.gudrunFile, [path]),
+                fingerprint.dataFileFingerprints(self.gudrunFile)
+            )
+
+    def testDuplicateNames(self):
+        self.samples[1].name = self.samples[0].name
+        self.assertEqual(
+            list(fingerprint.sampleFingerprints(self.gudrunFile)),
+            [s.name for s in self.samples[2:]]
+        )
+
+    def testDataFileFingerprints(self):
+        fingerprints = fingerprint.dataFileFingerprints(self.gudrunFile)
+        self.assertEqual(
+            list(fingerprints),
+            [(s.name, df) for s in self.samples for df in s.dataFiles]
+        )
+        self.assertEqual(len(set(fingerprints.values())), len(fingerprints))
+
+        # Other data files of the sample are not part of the inputs
+        sample = self.samples[0]
+        sample.dataFiles.dataFiles.append("NIMROD00099999.raw")
+        self.samples[1].density = 0.5
+        changed = fingerprint.dataFileFingerprints(self.gudrunFile)
+        for key, value in fingerprints.items():
+            if key[0] == self.samples[1].name:
+                self.assertNotEqual(changed[key], value)
+            else:
+                self.assertEqual(changed[key], value)
+
+    def testSlidingWindowCache(self):
+        with tempfile.NamedTemporaryFile() as mint:
+            sample = self.samples[0]
+            dataFile = sample.dataFiles[0]
+            fileOutputs = {
+                fingerprint.dataFileFingerprints(self.gudrunFile)[
+                    (sample.name, dataFile)]: mint.name
+            }
+            batchProcessor = gp.SlidingWindowBatchProcessing(
+                self.gudrunFile, fileOutputs=fileOutputs)
+            self.assertTrue(batchProcessor.cached(sample, dataFile))
+
+            # Outputs of a data file are not reused once its inputs change
+            sample.density = 0.5
+            batchProcessor = gp.SlidingWindowBatchProcessing(
+                self.gudrunFile, fileOutputs=fileOutputs)
+            self.assertFalse(batchProcessor.cached(sample, dataFile))
+
+    def testUnchangedOutputs(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            outputDir = os.path.join(tmp, "Gudrun")
+            # The outputs of the last sample have been removed
+            for sample in self.samples[:-1]:
+                os.makedirs(os.path.join(
+                    outputDir, utils.replace_unwanted_chars(sample.name)))
+            sampleOutputs = {
+                s.name: SampleOutput(
+                    os.path.join(outputDir, s.pathName()), None,
+                    {s.dataFiles[0]: {".gud": os.path.join(
+                        outputDir, s.dataFiles[0] + ".gud")}}, {})
+                for s in self.samples
+            }
+            self.gudrunFile.projectDir = tmp
+            self.gudrunFile.instrument.GudrunInputFileDir = tmp
+            handler = GudrunOutputHandler(
+                self.gudrunFile, fingerprints=self.fingerprints)
+            handler._writeManifest(outputDir, sampleOutputs)
+            self.samples[0].density = 0.5
+            fingerprints = fingerprint.sampleFingerprints(self.gudrunFile)
+
+            unchanged = fingerprint.unchangedOutputs(fingerprints, outputDir)
+            self.assertEqual(
+                list(unchanged), [s.name for s in self.samples[1:-1]])
+            for name, sampleOutput in unchanged.items():
+                self.assertEqual(sampleOutput, sampleOutputs[name])
+
+            self.assertEqual(fingerprint.unchangedOutputs(
+                fingerprints, os.path.join(tmp, "Other")), {})
+            # A manifest which cannot be read carries nothing over
+            with open(os.path.join(outputDir, MANIFEST), "w") as fp:
+                fp.write("{")
+            self.assertEqual(
+                fingerprint.unchangedOutputs(fingerprints, outputDir), {})
+
+
+class TestCarriedOutputs(TestCase):
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.projectDir = os.path.join(self.tempdir.name, "water")
+        self.procDir = os.path.join(self.tempdir.name, "proc")
+        os.makedirs(self.projectDir)
+        os.makedirs(self.procDir)
+
+        gudpy = loadWater()
+        gudpy.setSaveLocation(self.projectDir)
+        self.gudrunFile = gudpy.gudrunFile
+        self.gudrunFile.instrument.GudrunInputFileDir = self.procDir
+        for f in os.listdir(WATER_REF):
+            shutil.copyfile(
+                os.path.join(WATER_REF, f), os.path.join(self.procDir, f))
+        writeGudFile(
+            os.path.join(self.procDir, "NIMROD00016608_H2O_in_N9.gud"))
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        self.tempdir.cleanup()
+        return super().tearDown()
+
+    def testCarriedOver(self):
+        fingerprints = fingerprint.sampleFingerprints(self.gudrunFile)
+        previous = GudrunOutputHandler(
+            self.gudrunFile, fingerprints=fingerprints).organiseOutput()
+        mintPath = previous.output(SAMPLE, DATA_FILE, ".mint01")
+        outputDir = os.path.join(self.projectDir, "Gudrun")
+        carried = fingerprint.unchangedOutputs(fingerprints, outputDir)
+        self.assertEqual(list(carried), list(previous.sampleOutputs))
+
+        # Only the other samples are run again, so gudrun_dcs
+        # does not write the outputs of the first
+        runFile = self.gudrunFile.clone()
+        runFile.sampleBackgrounds[0].samples[0].runThisSample = False
+        for f in os.listdir(self.procDir):
+            if f.startswith("NIMROD00016608"):
+                os.remove(os.path.join(self.procDir, f))
+        output = GudrunOutputHandler(
+            runFile, carried={SAMPLE: carried[SAMPLE]},
+            fingerprints=fingerprints
+        ).organiseOutput()
+
+        self.assertEqual(
+            list(output.sampleOutputs), list(previous.sampleOutputs))
+        sampleOutput = output.sampleOutputs[SAMPLE]
+        self.assertEqual(
+            sampleOutput.outputs, previous.sampleOutputs[SAMPLE].outputs)
+        # The .gud file is read from the carried directory
+        self.assertIsNotNone(sampleOutput.gudFile)
+        self.assertEqual(
+            output.output(SAMPLE, DATA_FILE, ".mint01"), mintPath)
+        self.assertTrue(os.path.isfile(mintPath))
+        # The manifest of the new directory records the carried sample
+        self.assertEqual(
+            list(fingerprint.unchangedOutputs(fingerprints, outputDir)),
+            list(previous.sampleOutputs))
+
+    def testRunWithoutFingerprints(self):
+        GudrunOutputHandler(
+            self.gudrunFile,
+            fingerprints=fingerprint.sampleFingerprints(self.gudrunFile)
+        ).organiseOutput()
+        outputDir = os.path.join(self.projectDir, "Gudrun")
+        self.assertTrue(os.path.isfile(os.path.join(outputDir, MANIFEST)))
+        # A run which does not record fingerprints, such as an
+        # iteration, replaces the directory and its manifest
+        GudrunOutputHandler(self.gudrunFile).organiseOutput()
+        self.assertEqual(fingerprint.unchangedOutputs(
+            fingerprint.sampleFingerprints(self.gudrunFile), outputDir), {})
@@ -1,8 +1,9 @@
 import os
+import tempfile
 from unittest import TestCase
 
 from core.exception import ParserException
-from core.gud_file import GudFile
+from core.gud_file import GudFile, parseGudFiles
 from core import gudpy
 from test.test_gudpy_workflows import GudPyContext
 
@@ -380,3 +381,82 @@ class TestParseGudFile(TestCase):
 
             for v1, v2 in zip(gf.__dict__.values(), gf1.__dict__.values()):
                 self.assertEqual(v1, v2)
+
+
+class TestParseGudFiles(TestCase):
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        gudFile = GudFile.__new__(GudFile)
+        gudFile.name = "NIMROD00016608_H2O_in_N9.gud"
+        gudFile.title = "H2O in 1mm TiZr Can N9"
+        gudFile.author = "T. G. A. Youngs, D."
+        gudFile.stamp = "23-OCT-2012 17:45:25"
+        gudFile.atomicDensity = 0.1
+        gudFile.chemicalDensity = 0.99717
+        gudFile.averageScatteringLength = -0.05583
+        gudFile.averageScatteringLengthSquared = 0.00311736
+        gudFile.averageSquareOfScatteringLength = 0.20545
+        gudFile.coherentRatio = 65.9
+        gudFile.expectedDCS = 4.46355
+        gudFile.groupsTable = "".join(
+            f"   {i}     0.0173    4.0723     4.51058    -0.6170\n"
+            for i in range(1, 4)
+        )
+        gudFile.noGroups = 3
+        gudFile.averageLevelMergedDCS = 4.4
+        gudFile.gradient = "-0.5106%"
+        gudFile.err = ""
+        gudFile.result = " The DCS level is   98.0% of expected level.\n"
+        gudFile.suggestedTweakFactor = "1.01443"
+
+        self.goodPaths = []
+        for i in range(3):
+            path = os.path.join(self.tempdir.name, f"good{i}.gud")
+            gudFile.write_out(path)
+            self.goodPaths.append(path)
+        self.badPath = os.path.join(self.tempdir.name, "bad.gud")
+        with open(self.badPath, "w", encoding="utf-8") as fp:
+            fp.write(" bad.gud\n\n not a gud file\n")
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        self.tempdir.cleanup()
+        return super().tearDown()
+
+    def testParseGudFile(self):
+        gudFile = GudFile(self.goodPaths[0])
+        self.assertEqual(gudFile.title, "H2O in 1mm TiZr Can N9")
+        self.assertEqual(gudFile.atomicDensity, 0.1)
+        self.assertEqual(gudFile.expectedDCS, 4.46355)
+        self.assertEqual(gudFile.noGroups, 3)
+        self.assertEqual(len(gudFile.groupsTable.splitlines()), 3)
+        self.assertEqual(gudFile.averageLevelMergedDCS, 4.4)
+        self.assertEqual(gudFile.gradient, -0.5106)
+        self.assertEqual(gudFile.suggestedTweakFactor, "1.01443")
+        self.assertIsNone(gudFile.stream)
+
+    def testParseGudFiles(self):
+        gudFiles, errors = parseGudFiles(
+            self.goodPaths + [self.badPath, self.goodPaths[0]],
+            maxWorkers=2
+        )
+        self.assertEqual(list(gudFiles.keys()), self.goodPaths)
+        self.assertEqual(list(errors.keys()), [self.badPath])
+        self.assertIsInstance(errors[self.badPath], ParserException)
+        for path, gudFile in gudFiles.items():
+            self.assertEqual(gudFile.path, path)
+            self.assertEqual(gudFile.output, "-2.0%")
+
+    def testParseUnreadableGudFiles(self):
+        unreadablePath = os.path.join(self.tempdir.name, "unreadable.gud")
+        with open(unreadablePath, "wb") as fp:
+            fp.write(b" unreadable.gud\n\n\xff\xfe\n")
+        gudFiles, errors = parseGudFiles(
+            [self.goodPaths[0], unreadablePath, self.badPath])
+        self.assertEqual(list(gudFiles.keys()), [self.goodPaths[0]])
+        self.assertEqual(
+            list(errors.keys()), [unreadablePath, self.badPath])
+        self.assertIsInstance(errors[unreadablePath], ValueError)
+
+    def testParseNoGudFiles(self):
+        self.assertEqual(parseGudFiles([]), ({}, {}))
@@ -25,6 +25,12 @@ from core.enums import (
     Geometry, Format
 )
 from core import gudpy as gp
+from core.copy_on_write import fields
+
+
+def setFields(obj, values):
+    for k, v in values.items():
+        setattr(obj, k, v)
 
 
 class GudPyContext:
@@ -128,14 +134,7 @@ class TestGudPyIO(TestCase):
             "logarithmicStepSize": 0.04,
             "hardGroupEdges": True,
             "nxsDefinitionFile": "",
-            "goodDetectorThreshold": 0,
-            "yamlignore": {
-                "GudrunInputFileDir",
-                "GudrunStartFolder",
-                "startupFileFolder",
-                "goodDetectorThreshold",
-                "yamlignore"
-            }
+            "goodDetectorThreshold": 0
         }
 
         self.expectedBeam = {
@@ -157,10 +156,7 @@ class TestGudPyIO(TestCase):
                 "StartupFiles/NIMROD/spectrum000.dat",
             "overallBackgroundFactor": 1.0,
             "sampleDependantBackgroundFactor": 0.0,
-            "shieldingAttenuationCoefficient": 0.0,
-            "yamlignore": {
-                "yamlignore"
-            }
+            "shieldingAttenuationCoefficient": 0.0
         }
 
         self.expectedNormalisation = {
@@ -194,10 +190,7 @@ class TestGudPyIO(TestCase):
             "normalisationDifferentialCrossSectionFile": "*",
             "lowerLimitSmoothedNormalisation": 0.01,
             "normalisationDegreeSmoothing": 1.00,
-            "minNormalisationSignalBR": 0.0,
-            "yamlignore": {
-                "yamlignore"
-            }
+            "minNormalisationSignalBR": 0.0
         }
 
         self.expectedContainerA = {
@@ -236,18 +229,7 @@ class TestGudPyIO(TestCase):
             "maxRadFT": 0.0,
             "grBroadening": 0.0,
             "powerForBroadening": 0.0,
-            "stepSize": 0.0,
-            "yamlignore": {
-                "runAsSample",
-                "topHatW",
-                "FTMode",
-                "minRadFT",
-                "maxRadFT",
-                "grBroadening",
-                "powerForBroadening",
-                "stepSize",
-                "yamlignore"
-            }
+            "stepSize": 0.0
         }
 
         self.expectedContainerA["composition"].elements = [
@@ -291,18 +273,7 @@ class TestGudPyIO(TestCase):
             "maxRadFT": 0.0,
             "grBroadening": 0.0,
             "powerForBroadening": 0.0,
-            "stepSize": 0.0,
-            "yamlignore": {
-                "runAsSample",
-                "topHatW",
-                "FTMode",
-                "minRadFT",
-                "maxRadFT",
-                "grBroadening",
-                "powerForBroadening",
-                "stepSize",
-                "yamlignore"
-            }
+            "stepSize": 0.0
         }
 
         self.expectedContainerB["composition"].elements = [
@@ -341,18 +312,7 @@ class TestGudPyIO(TestCase):
             "maxRadFT": 0.0,
             "grBroadening": 0.0,
             "powerForBroadening": 0.0,
-            "stepSize": 0.0,
-            "yamlignore": {
-                "runAsSample",
-                "topHatW",
-                "FTMode",
-                "minRadFT",
-                "maxRadFT",
-                "grBroadening",
-                "powerForBroadening",
-                "stepSize",
-                "yamlignore"
-            }
+            "stepSize": 0.0
         }
 
         self.expectedContainerC["composition"].elements = [
@@ -391,18 +351,7 @@ class TestGudPyIO(TestCase):
             "maxRadFT": 0.0,
             "grBroadening": 0.0,
             "powerForBroadening": 0.0,
-            "stepSize": 0.0,
-            "yamlignore": {
-                "runAsSample",
-                "topHatW",
-                "FTMode",
-                "minRadFT",
-                "maxRadFT",
-                "grBroadening",
-                "powerForBroadening",
-                "stepSize",
-                "yamlignore"
-            }
+            "stepSize": 0.0
         }
 
         self.expectedContainerD["composition"].elements = [
@@ -454,10 +403,7 @@ class TestGudPyIO(TestCase):
             "runThisSample": True,
             "scatteringFraction": 1.0,
             "attenuationCoefficient": 0.0,
-            "containers": [self.expectedContainerA],
-            "yamlignore": {
-                "yamlignore",
-            }
+            "containers": [self.expectedContainerA]
         }
 
         self.expectedSampleA["composition"].elements = [
@@ -509,10 +455,7 @@ class TestGudPyIO(TestCase):
             "runThisSample": True,
             "scatteringFraction": 1.0,
             "attenuationCoefficient": 0.0,
-            "containers": [self.expectedContainerB],
-            "yamlignore": {
-                "yamlignore"
-            }
+            "containers": [self.expectedContainerB]
         }
 
         self.expectedSampleB["composition"].elements = [
@@ -564,10 +507,7 @@ class TestGudPyIO(TestCase):
             "runThisSample": True,
             "scatteringFraction": 1.0,
             "attenuationCoefficient": 0.0,
-            "containers": [self.expectedContainerC],
-            "yamlignore": {
-                "yamlignore"
-            }
+            "containers": [self.expectedContainerC]
         }
 
         self.expectedSampleC["composition"].elements = [
@@ -620,10 +560,7 @@ class TestGudPyIO(TestCase):
             "runThisSample": True,
             "scatteringFraction": 1.0,
             "attenuationCoefficient": 0.0,
-            "containers": [self.expectedContainerD],
-            "yamlignore": {
-                "yamlignore"
-            }
+            "containers": [self.expectedContainerD]
         }
 
         self.expectedSampleD["composition"].elements = [
@@ -646,19 +583,15 @@ class TestGudPyIO(TestCase):
                 self.expectedSampleB,
                 self.expectedSampleC,
             ],
-            "writeAllSamples": True,
-            "yamlignore": {
-                "writeAllSamples",
-                "yamlignore"
-            }
+            "writeAllSamples": True
         }
 
         self.goodInstrument = Instrument()
-        self.goodInstrument.__dict__ = self.expectedInstrument
+        setFields(self.goodInstrument, self.expectedInstrument)
         self.goodBeam = Beam()
-        self.goodBeam.__dict__ = self.expectedBeam
+        setFields(self.goodBeam, self.expectedBeam)
         self.goodNormalisation = Normalisation()
-        self.goodNormalisation.__dict__ = self.expectedNormalisation
+        setFields(self.goodNormalisation, self.expectedNormalisation)
         self.goodSampleBackground = SampleBackground()
         self.goodSampleBackground.periodNumber = (
             self.expectedSampleBackground["periodNumber"]
@@ -667,13 +600,15 @@ class TestGudPyIO(TestCase):
             "dataFiles"
         ]
         self.goodSampleBackground.samples.append(Sample())
-        self.goodSampleBackground.samples[0].__dict__ = deepcopy(
-            self.expectedSampleBackground["samples"][0]
+        setFields(
+            self.goodSampleBackground.samples[0],
+            deepcopy(self.expectedSampleBackground["samples"][0])
         )
         self.goodSampleBackground.samples[0].containers[0] = Container()
-        self.goodSampleBackground.samples[0].containers[
-            0
-        ].__dict__ = self.expectedContainerA
+        setFields(
+            self.goodSampleBackground.samples[0].containers[0],
+            self.expectedContainerA
+        )
 
         self.dicts = [
             self.expectedInstrument,
@@ -702,7 +637,7 @@ class TestGudPyIO(TestCase):
         with GudPyContext() as gudpy:
             self.assertIsInstance(gudpy.gudrunFile, GudrunFile)
 
-            instrumentAttrsDict = gudpy.gudrunFile.instrument.__dict__
+            instrumentAttrsDict = fields(gudpy.gudrunFile.instrument)
 
             for key in instrumentAttrsDict.keys():
                 pathKeys = ["GudrunInputFileDir", "dataFileDir"]
@@ -714,12 +649,12 @@ class TestGudPyIO(TestCase):
                         self.expectedInstrument[key], instrumentAttrsDict[key]
                     )
 
-            beamAttrsDict = gudpy.gudrunFile.beam.__dict__
+            beamAttrsDict = fields(gudpy.gudrunFile.beam)
 
             for key in beamAttrsDict.keys():
                 self.assertEqual(self.expectedBeam[key], beamAttrsDict[key])
 
-            normalisationAttrsDict = gudpy.gudrunFile.normalisation.__dict__
+            normalisationAttrsDict = fields(gudpy.gudrunFile.normalisation)
 
             for key in normalisationAttrsDict.keys():
                 if isinstance(
@@ -738,27 +673,26 @@ class TestGudPyIO(TestCase):
             self.assertEqual(len(gudpy.gudrunFile.sampleBackgrounds), 1)
 
             sampleBackgroundsAttrsDict = (
-                gudpy.gudrunFile.sampleBackgrounds[0].__dict__)
+                fields(gudpy.gudrunFile.sampleBackgrounds[0]))
 
             for key in sampleBackgroundsAttrsDict.keys():
                 if key == "samples":
                     for i, sample in enumerate(
                             self.expectedSampleBackground[key]):
                         sampleAttrsDict = (
-                            deepcopy(
+                            deepcopy(fields(
                                 gudpy.gudrunFile.sampleBackgrounds[
-                                    0].samples[i].__dict__
-                            )
+                                    0].samples[i]
+                            ))
                         )
                         for key_ in sampleAttrsDict.keys():
 
                             if key_ == "containers":
                                 for j, container in enumerate(sample[key_]):
-                                    containerAttrsDict = (
+                                    containerAttrsDict = fields(
                                         gudpy.gudrunFile.sampleBackgrounds[0]
                                         .samples[i]
                                         .containers[j]
-                                        .__dict__
                                     )
 
                                     for _key in containerAttrsDict.keys():
@@ -963,6 +897,36 @@ class TestGudPyIO(TestCase):
                 "\n".join(str(gudpy.gudrunFile).splitlines(keepends=True)[:-5])
             )
 
+    def testWriteParameterFiles(self):
+        with GudPyContext() as gudpy:
+            gudrunFile = gudpy.gudrunFile
+            gudrunFile.sampleBackgrounds[0].samples[0].runThisSample = False
+            gudrunFile.write_out(gudrunFile.loadFile, overwrite=True)
+
+            def withoutDate(string):
+                return [
+                    line for line in string.splitlines()
+                    if not line.startswith("Date and time last written")
+                ]
+
+            for sb in gudrunFile.sampleBackgrounds:
+                for s in sb.samples:
+                    path = os.path.join(
+                        gudrunFile.instrument.GudrunInputFileDir,
+                        s.pathName()
+                    )
+                    if not s.runThisSample:
+                        self.assertFalse(os.path.exists(path))
+                        continue
+                    expected = deepcopy(gudrunFile)
+                    expected.sampleBackgrounds = [deepcopy(sb)]
+                    expected.sampleBackgrounds[0].samples = [deepcopy(s)]
+                    with open(path, encoding="utf-8") as f:
+                        self.assertEqual(
+                            withoutDate(f.read()),
+                            withoutDate(str(expected))
+                        )
+
     def testLoadEmptyGudrunFile(self):
         f = open("test_data.txt", "w", encoding="utf-8")
         f.close()
@@ -1097,7 +1061,6 @@ class TestGudPyIO(TestCase):
         expectedInstrument.pop("nxsDefinitionFile", None)
         expectedInstrument.pop("groupingParameterPanel", None)
         expectedInstrument.pop("goodDetectorThreshold", None)
-        expectedInstrument.pop("yamlignore", None)
         for i in range(len(expectedInstrument.keys())):
 
             badInstrument = str(self.goodInstrument).split("\n")
@@ -1129,7 +1092,6 @@ class TestGudPyIO(TestCase):
         expectedInstrument.pop("nxsDefinitionFile", None)
         expectedInstrument.pop("groupingParameterPanel", None)
         expectedInstrument.pop("goodDetectorThreshold", None)
-        expectedInstrument.pop("yamlignore", None)
         for i in range(50):
 
             key = random.choice(list(expectedInstrument))
@@ -1163,7 +1125,6 @@ class TestGudPyIO(TestCase):
         expectedBeam.pop("scatteredBeamBottomEdge", None)
         expectedBeam.pop("stepSizeMS", None)
         expectedBeam.pop("noSlices", None)
-        expectedBeam.pop("yamlignore", None)
 
         for i in range(len(expectedBeam.keys())):
             badBeam = str(self.goodBeam).split("\n")
@@ -1198,7 +1159,6 @@ class TestGudPyIO(TestCase):
         expectedBeam.pop("scatteredBeamBottomEdge", None)
         expectedBeam.pop("stepSizeMS", None)
         expectedBeam.pop("noSlices", None)
-        expectedBeam.pop("yamlignore", None)
 
         for _ in range(50):
 
@@ -1237,7 +1197,6 @@ class TestGudPyIO(TestCase):
         expectedNormalisation.pop("outerRadius", None)
         expectedNormalisation.pop("sampleHeight", None)
         expectedNormalisation.pop("crossSectionFilename")
-        expectedNormalisation.pop("yamlignore", None)
 
         self.goodNormalisation.dataFiles = DataFiles([], "")
         self.goodNormalisation.composition = (
@@ -1282,7 +1241,6 @@ class TestGudPyIO(TestCase):
         expectedNormalisation.pop("outerRadius", None)
         expectedNormalisation.pop("sampleHeight", None)
         expectedNormalisation.pop("crossSectionFilename")
-        expectedNormalisation.pop("yamlignore", None)
 
         self.goodNormalisation.dataFiles = DataFiles([], "")
         self.goodNormalisation.composition = (
@@ -1360,7 +1318,6 @@ class TestGudPyIO(TestCase):
         expectedSampleA.pop("exponentialValues", None)
         expectedSampleA.pop("crossSectionFilename", None)
         expectedSampleA.pop("FTMode", None)
-        expectedSampleA.pop("yamlignore", None)
 
         self.goodSampleBackground.samples[0].dataFiles = DataFiles([], "")
         self.goodSampleBackground.samples[0].composition = (
@@ -1415,7 +1372,6 @@ class TestGudPyIO(TestCase):
         expectedSampleA.pop("exponentialValues", None)
         expectedSampleA.pop("crossSectionFilename", None)
         expectedSampleA.pop("FTMode", None)
-        expectedSampleA.pop("yamlignore", None)
 
         self.goodSampleBackground.samples[0].dataFiles = DataFiles([], "")
         self.goodSampleBackground.samples[0].composition = (
@@ -1479,7 +1435,6 @@ class TestGudPyIO(TestCase):
         expectedContainerA.pop("grBroadening", None)
         expectedContainerA.pop("powerForBroadening", None)
         expectedContainerA.pop("stepSize", None)
-        expectedContainerA.pop("yamlignore", None)
 
         self.goodSampleBackground.samples[0].containers[0].dataFiles = (
             DataFiles([], "")
@@ -1556,7 +1511,6 @@ class TestGudPyIO(TestCase):
         expectedContainerA.pop("grBroadening", None)
         expectedContainerA.pop("powerForBroadening", None)
         expectedContainerA.pop("stepSize", None)
-        expectedContainerA.pop("yamlignore", None)
 
         self.goodSampleBackground.samples[0].containers[0].dataFiles = (
             DataFiles([], "")
@@ -1,8 +1,13 @@
-from unittest import TestCase
+from unittest import TestCase, mock
 import os
+import tempfile
 
 from core import gudpy
+from core.copy_on_write import fields
 from core.enums import Format
+from core.exception import YAMLException
+from core.gudpy_yaml import YAML
+from core.sample import Sample
 
 
 class TestYAML(TestCase):
@@ -28,123 +33,243 @@ class TestYAML(TestCase):
             gf2.instrument.GudrunInputFileDir)
 
         self.assertDictEqual(
-            gf1.instrument.__dict__, gf2.instrument.__dict__)
-        self.assertDictEqual(gf2.beam.__dict__, gf2.beam.__dict__)
+            fields(gf1.instrument), fields(gf2.instrument))
+        self.assertDictEqual(fields(gf2.beam), fields(gf2.beam))
 
-        normalisationDataFilesA = gf1.normalisation.__dict__.pop("dataFiles")
-        normalisationDataFilesBgA = gf1.normalisation.__dict__.pop(
-            "dataFilesBg"
-        )
-        normalisationCompositionA = gf1.normalisation.__dict__.pop(
-            "composition"
-        )
-        normalisationElementsA = normalisationCompositionA.__dict__.pop(
-            "elements"
-        )
+        normalisationA = fields(gf1.normalisation)
+        normalisationDataFilesA = normalisationA.pop("dataFiles")
+        normalisationDataFilesBgA = normalisationA.pop("dataFilesBg")
+        normalisationCompositionA = fields(normalisationA.pop("composition"))
+        normalisationElementsA = normalisationCompositionA.pop("elements")
 
-        normalisationDataFilesB = gf2.normalisation.__dict__.pop("dataFiles")
-        normalisationDataFilesBgB = gf2.normalisation.__dict__.pop(
-            "dataFilesBg"
-        )
-        normalisationCompositionB = gf2.normalisation.__dict__.pop(
-            "composition"
-        )
-        normalisationElementsB = normalisationCompositionB.__dict__.pop(
-            "elements"
-        )
+        normalisationB = fields(gf2.normalisation)
+        normalisationDataFilesB = normalisationB.pop("dataFiles")
+        normalisationDataFilesBgB = normalisationB.pop("dataFilesBg")
+        normalisationCompositionB = fields(normalisationB.pop("composition"))
+        normalisationElementsB = normalisationCompositionB.pop("elements")
 
         self.assertDictEqual(
-            normalisationDataFilesA.__dict__, normalisationDataFilesB.__dict__
+            fields(normalisationDataFilesA), fields(normalisationDataFilesB)
         )
         self.assertDictEqual(
-            normalisationDataFilesBgA.__dict__,
-            normalisationDataFilesBgB.__dict__,
+            fields(normalisationDataFilesBgA),
+            fields(normalisationDataFilesBgB),
         )
         self.assertDictEqual(
-            normalisationCompositionA.__dict__,
-            normalisationCompositionB.__dict__,
-        )
-        self.assertDictEqual(
-            gf1.normalisation.__dict__, gf2.normalisation.__dict__
+            normalisationCompositionA, normalisationCompositionB
         )
+        self.assertDictEqual(normalisationA, normalisationB)
 
         for elementA, elementB in zip(
             normalisationElementsA, normalisationElementsB
         ):
-            self.assertDictEqual(elementA.__dict__, elementB.__dict__)
+            self.assertDictEqual(fields(elementA), fields(elementB))
 
-        sampleBackgroundDataFilesA = gf1.sampleBackgrounds[0].__dict__.pop(
-            "dataFiles"
-        )
-        sampleBackgroundSamplesA = gf1.sampleBackgrounds[0].__dict__.pop(
-            "samples"
-        )
+        sampleBackgroundA = fields(gf1.sampleBackgrounds[0])
+        sampleBackgroundDataFilesA = sampleBackgroundA.pop("dataFiles")
+        sampleBackgroundSamplesA = sampleBackgroundA.pop("samples")
 
-        sampleBackgroundDataFilesB = gf2.sampleBackgrounds[0].__dict__.pop(
-            "dataFiles"
-        )
-        sampleBackgroundSamplesB = gf2.sampleBackgrounds[0].__dict__.pop(
-            "samples"
-        )
+        sampleBackgroundB = fields(gf2.sampleBackgrounds[0])
+        sampleBackgroundDataFilesB = sampleBackgroundB.pop("dataFiles")
+        sampleBackgroundSamplesB = sampleBackgroundB.pop("samples")
 
         self.assertDictEqual(
-            sampleBackgroundDataFilesA.__dict__,
-            sampleBackgroundDataFilesB.__dict__,
-        )
-        self.assertDictEqual(
-            gf1.sampleBackgrounds[0].__dict__,
-            gf2.sampleBackgrounds[0].__dict__,
+            fields(sampleBackgroundDataFilesA),
+            fields(sampleBackgroundDataFilesB),
         )
+        self.assertDictEqual(sampleBackgroundA, sampleBackgroundB)
 
         for sampleA, sampleB in zip(
             sampleBackgroundSamplesA, sampleBackgroundSamplesB
         ):
-            sampleDataFilesA = sampleA.__dict__.pop("dataFiles")
-            sampleCompositionA = sampleA.__dict__.pop("composition")
-            sampleElementsA = sampleCompositionA.__dict__.pop("elements")
-            sampleContainersA = sampleA.__dict__.pop("containers")
+            sampleA = fields(sampleA)
+            sampleDataFilesA = sampleA.pop("dataFiles")
+            sampleCompositionA = fields(sampleA.pop("composition"))
+            sampleElementsA = sampleCompositionA.pop("elements")
+            sampleContainersA = sampleA.pop("containers")
 
-            sampleDataFilesB = sampleB.__dict__.pop("dataFiles")
-            sampleCompositionB = sampleB.__dict__.pop("composition")
-            sampleElementsB = sampleCompositionB.__dict__.pop("elements")
-            sampleContainersB = sampleB.__dict__.pop("containers")
+            sampleB = fields(sampleB)
+            sampleDataFilesB = sampleB.pop("dataFiles")
+            sampleCompositionB = fields(sampleB.pop("composition"))
+            sampleElementsB = sampleCompositionB.pop("elements")
+            sampleContainersB = sampleB.pop("containers")
 
             self.assertDictEqual(
-                sampleDataFilesA.__dict__, sampleDataFilesB.__dict__
-            )
-            self.assertDictEqual(
-                sampleCompositionA.__dict__, sampleCompositionB.__dict__
+                fields(sampleDataFilesA), fields(sampleDataFilesB)
             )
+            self.assertDictEqual(sampleCompositionA, sampleCompositionB)
             for elementA, elementB in zip(sampleElementsA, sampleElementsB):
-                self.assertDictEqual(elementA.__dict__, elementB.__dict__)
+                self.assertDictEqual(fields(elementA), fields(elementB))
 
-            self.assertDictEqual(sampleA.__dict__, sampleB.__dict__)
+            self.assertDictEqual(sampleA, sampleB)
 
             for containerA, containerB in zip(
                 sampleContainersA, sampleContainersB
             ):
-                containerDataFilesA = containerA.__dict__.pop("dataFiles")
-                containerCompositionA = containerA.__dict__.pop("composition")
-                containerElementsA = containerCompositionA.__dict__.pop(
-                    "elements"
-                )
+                containerA = fields(containerA)
+                containerDataFilesA = containerA.pop("dataFiles")
+                containerCompositionA = fields(containerA.pop("composition"))
+                containerElementsA = containerCompositionA.pop("elements")
 
-                containerDataFilesB = containerB.__dict__.pop("dataFiles")
-                containerCompositionB = containerB.__dict__.pop("composition")
-                containerElementsB = containerCompositionB.__dict__.pop(
-                    "elements"
-                )
+                containerB = fields(containerB)
+                containerDataFilesB = containerB.pop("dataFiles")
+                containerCompositionB = fields(containerB.pop("composition"))
+                containerElementsB = containerCompositionB.pop("elements")
 
                 self.assertDictEqual(
-                    containerDataFilesA.__dict__, containerDataFilesB.__dict__
+                    fields(containerDataFilesA), fields(containerDataFilesB)
                 )
                 self.assertDictEqual(
-                    containerCompositionA.__dict__,
-                    containerCompositionB.__dict__,
+                    containerCompositionA, containerCompositionB
                 )
                 for elementA, elementB in zip(
                     containerElementsA, containerElementsB
                 ):
-                    self.assertDictEqual(elementA.__dict__, elementB.__dict__)
+                    self.assertDictEqual(fields(elementA), fields(elementB))
+
+                self.assertDictEqual(containerA, containerB)
+
+
+class TestYAMLValidation(TestCase):
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tempdir.name, "project.yaml")
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        self.tempdir.cleanup()
+        return super().tearDown()
+
+    def parse(self, text):
+        with open(self.path, "w", encoding="utf-8") as fp:
+            fp.write(text)
+        return YAML().parseYaml(self.path)
+
+    def testInvalidAttribute(self):
+        with self.assertRaises(YAMLException) as cm:
+            self.parse("Beam:\n  notAnAttribute: 1\n")
+        self.assertIn(
+            "Invalid attribute 'notAnAttribute' given to 'Beam'",
+            str(cm.exception)
+        )
 
-                self.assertDictEqual(containerA.__dict__, containerB.__dict__)
+    def testInsufficientElementArguments(self):
+        with self.assertRaises(YAMLException) as cm:
+            self.parse(
+                "Normalisation:\n"
+                "  composition:\n"
+                "    elements:\n"
+                "    - {atomicSymbol: V, massNo: 0.0}\n"
+            )
+        self.assertIn("Insufficient arguments given to element 1",
+                      str(cm.exception))
+
+    def testInvalidRatio(self):
+        with self.assertRaises(YAMLException):
+            self.parse(
+                "SampleBackgrounds:\n"
+                "- samples:\n"
+                "  - composition:\n"
+                "      weightedComponents:\n"
+                "      - {component: {name: A}, ratio: x}\n"
+            )
+
+    def testInvalidYAML(self):
+        with self.assertRaises(YAMLException):
+            self.parse("Beam: [\n")
+
+    def testSamples(self):
+        _, _, _, _, sampleBackgrounds, _ = self.parse(
+            "SampleBackgrounds:\n"
+            "- samples:\n"
+            "  - {name: A, density: 2, geometry: FLATPLATE,\n"
+            "     dataFiles: {dataFiles: [a.raw], name: SAMPLE}}\n"
+            "  - {name: B, exponentialValues: [[0.0, 1.5]],\n"
+            "     containers: [{name: C, density: 3.5}]}\n"
+        )
+        sampleA, sampleB = sampleBackgrounds[0].samples
+        self.assertEqual(sampleA.density, 2.0)
+        self.assertIsInstance(sampleA.density, float)
+        self.assertEqual(sampleA.geometry.name, "FLATPLATE")
+        self.assertEqual(sampleA.dataFiles.dataFiles, ["a.raw"])
+        self.assertEqual(sampleB.exponentialValues, [[0.0, 1.5]])
+        self.assertEqual(sampleB.containers[0].name, "C")
+        self.assertEqual(sampleB.containers[0].density, 3.5)
+        self.assertIn(Sample, YAML.plans)
+
+
+class TestYAMLWriter(TestCase):
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tempdir.name, "project.yaml")
+        self.gudpy = gudpy.GudPy()
+        self.gudpy.loadFromFile(
+            loadFile="test/TestData/NIMROD-water/water.txt",
+            format=Format.TXT
+        )
+        self.gudrunFile = self.gudpy.gudrunFile
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        self.tempdir.cleanup()
+        return super().tearDown()
+
+    def wholeDump(self):
+        yaml = YAML()
+        return yaml.dump(yaml.toYamlDict(self.gudrunFile))
+
+    def read(self):
+        with open(self.path, "rb") as fp:
+            return fp.read()
+
+    def testMatchesWholeDump(self):
+        self.assertTrue(self.gudrunFile.yaml.writeYAML(
+            self.gudrunFile, self.path))
+        self.assertEqual(self.read(), self.wholeDump())
+
+    def testSkipsUnchanged(self):
+        yaml = self.gudrunFile.yaml
+        self.assertTrue(yaml.writeYAML(self.gudrunFile, self.path))
+        self.assertFalse(yaml.writeYAML(self.gudrunFile, self.path))
+
+        # Rewritten if the file was changed by something else
+        with open(self.path, "w", encoding="utf-8") as fp:
+            fp.write("GUI: {useComponents: true}\n")
+        self.assertTrue(yaml.writeYAML(self.gudrunFile, self.path))
+        self.assertEqual(self.read(), self.wholeDump())
+
+    def testRewritesChanges(self):
+        yaml = self.gudrunFile.yaml
+        yaml.writeYAML(self.gudrunFile, self.path)
+
+        sampleBackground = self.gudrunFile.sampleBackgrounds[0]
+        sampleBackground.periodNumber = 2
+        sampleBackground.samples[0].density = 1.5
+        sampleBackground.samples[1].dataFiles.dataFiles.append("new.raw")
+        del sampleBackground.samples[2]
+        self.gudrunFile.beam.incidentBeamLeftEdge = 2.0
+
+        self.assertTrue(yaml.writeYAML(self.gudrunFile, self.path))
+        self.assertEqual(self.read(), self.wholeDump())
+
+        sampleBackground.samples = []
+        self.assertTrue(yaml.writeYAML(self.gudrunFile, self.path))
+        self.assertEqual(self.read(), self.wholeDump())
+
+    def testBuildsOnlyChangedParts(self):
+        yaml = self.gudrunFile.yaml
+        yaml.writeYAML(self.gudrunFile, self.path)
+        sample = self.gudrunFile.sampleBackgrounds[0].samples[1]
+
+        with mock.patch.object(yaml, "toYaml", wraps=yaml.toYaml) as toYaml:
+            self.assertFalse(yaml.writeYAML(self.gudrunFile, self.path))
+            toYaml.assert_not_called()
+
+            sample.density = 2.5
+            self.assertTrue(yaml.writeYAML(self.gudrunFile, self.path))
+            self.assertIs(toYaml.call_args_list[0].args[0], sample)
+            self.assertNotIn(
+                self.gudrunFile.instrument,
+                [c.args[0] for c in toYaml.call_args_list]
+            )
+        self.assertEqual(self.read(), self.wholeDump())
@@ -0,0 +1,78 @@
+import math
+from unittest import TestCase
+
+from core.composition import Composition
+from core.element import Element
+from core.isotopes import Sears91
+
+
+class TestSears91(TestCase):
+
+    def setUp(self):
+        self.sears91 = Sears91()
+        return super().setUp()
+
+    def scan(self, element, mass):
+        for isotope in self.sears91.sears91Data:
+            if (
+                self.sears91.element(isotope) == element
+                and self.sears91.mass(isotope) == mass
+            ):
+                return isotope
+
+    def testLookupMatchesScan(self):
+        for isotope in self.sears91.sears91Data:
+            element = self.sears91.element(isotope)
+            mass = self.sears91.mass(isotope)
+            self.assertIs(
+                self.sears91.isotopeData(element, mass),
+                self.scan(element, mass)
+            )
+            self.assertTrue(self.sears91.isIsotope(element, mass))
+            self.assertIs(
+                self.sears91.findIsotope(element, mass),
+                self.scan(element, mass)
+            )
+
+    def testMissingIsotope(self):
+        self.assertIsNone(self.sears91.isotopeData("H", 7))
+        self.assertIsNone(self.sears91.findIsotope("Xx", 0))
+        self.assertFalse(self.sears91.isIsotope("H", 7))
+        self.assertEqual(self.sears91.isotopes("Xx"), [])
+        with self.assertRaises(KeyError):
+            self.sears91.row("H", 7)
+
+    def testFloatMass(self):
+        self.assertEqual(
+            self.sears91.isotope(self.sears91.isotopeData("H", 2.0)), "H_2"
+        )
+
+    def testIsotopesOfElement(self):
+        self.assertEqual(
+            [self.sears91.isotope(i) for i in self.sears91.isotopes("H")],
+            ["H_Natural", "H_1", "H_2", "H_3"]
+        )
+        self.sears91.isotopes("H").clear()
+        self.assertEqual(len(self.sears91.isotopes("H")), 4)
+
+    def testColumns(self):
+        for name in Sears91.NUMERIC_COLUMNS:
+            column = self.sears91.columns[name]
+            self.assertFalse(column.flags.writeable)
+            for i, isotope in enumerate(self.sears91.sears91Data):
+                self.assertEqual(
+                    column[i], getattr(self.sears91, name)(isotope))
+
+    def testExpectedDCSLevel(self):
+        elements = [
+            Element("H", 2, 2.0), Element("O", 0, 1.0), Element("Ti", 0, 0.5)
+        ]
+        totalAbundance = sum(el.abundance for el in elements)
+        expected = round(sum(
+            self.sears91.totalXS(
+                self.scan(el.atomicSymbol, el.massNo)
+            ) * (el.abundance / totalAbundance) for el in elements
+        ) / 4.0 / math.pi, 5)
+        self.assertEqual(
+            Composition.calculateExpectedDCSLevel(elements), expected)
+        self.assertEqual(Composition.calculateExpectedDCSLevel([]), 0.0)
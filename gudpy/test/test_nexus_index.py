@@ -0,0 +1,193 @@
+import os
+import tempfile
+from unittest import TestCase
+
+import h5py as h5
+import numpy as np
+
+from core import gudpy as gp
+from core import nexus_index
+from core import run_planner
+from core import sliding_window
+from core.data_files import DataFiles
+from core.enums import Format
+
+
+def makeNexusFile(path, charge, goodFrames=100):
+    with h5.File(path, "w") as fp:
+        entry = fp.create_group("raw_data_1")
+        entry.attrs["NX_class"] = b"NXentry"
+        entry["proton_charge"] = np.array([charge])
+        entry["good_frames"] = np.array([goodFrames])
+        entry["start_time"] = np.array([b"2023-01-01T00:00:00"])
+        entry["end_time"] = np.array([b"2023-01-01T01:00:00"])
+        entry.create_group("detector_1_events")["event_time_offset"] = (
+            np.zeros(1000)
+        )
+
+
+class TestNexusIndex(TestCase):
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.paths = []
+        for i, charge in enumerate([10.0, 20.0, 30.0]):
+            path = os.path.join(self.tempdir.name, f"run{i}.nxs")
+            makeNexusFile(path, charge)
+            self.paths.append(path)
+        self.cacheDir = tempfile.TemporaryDirectory()
+        self.defaultCacheDir = nexus_index.CACHE_DIR
+        nexus_index.CACHE_DIR = self.cacheDir.name
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        nexus_index.CACHE_DIR = self.defaultCacheDir
+        self.cacheDir.cleanup()
+        self.tempdir.cleanup()
+        return super().tearDown()
+
+    def testReadMetadata(self):
+        metadata = nexus_index.readMetadata(self.paths[1])
+        self.assertEqual(metadata.charge, 20.0)
+        self.assertEqual(metadata.goodFrames, 100)
+        self.assertEqual(metadata.startTime, "2023-01-01T00:00:00")
+        self.assertEqual(metadata.endTime, "2023-01-01T01:00:00")
+
+    def testIndexCached(self):
+        index = nexus_index.NexusIndex.forDirectory(self.tempdir.name)
+        self.assertEqual(index.charges(self.paths), [10.0, 20.0, 30.0])
+        self.assertTrue(os.path.exists(index.cachePath))
+
+        # The cache is used while the modification time is unchanged
+        cached = nexus_index.NexusIndex.forDirectory(self.tempdir.name)
+        key = os.path.abspath(self.paths[0])
+        cached.entries[key].charge = 15.0
+        self.assertEqual(cached.metadata(self.paths[0]).charge, 15.0)
+
+        makeNexusFile(self.paths[0], 40.0)
+        mtime = cached.entries[key].mtime + 10
+        os.utime(self.paths[0], (mtime, mtime))
+        self.assertEqual(cached.metadata(self.paths[0]).charge, 40.0)
+
+    def testCachedOutsideDataDirectory(self):
+        index = nexus_index.NexusIndex.forDirectory(self.tempdir.name)
+        index.charges(self.paths)
+        self.assertEqual(
+            os.path.dirname(index.cachePath), self.cacheDir.name)
+        self.assertEqual(
+            sorted(os.listdir(self.tempdir.name)),
+            ["run0.nxs", "run1.nxs", "run2.nxs"]
+        )
+
+    def testUnwritableCache(self):
+        # The cache directory cannot be created beneath a file
+        blocker = os.path.join(self.cacheDir.name, "blocker")
+        open(blocker, "w").close()
+        nexus_index.CACHE_DIR = os.path.join(blocker, "nexus_index")
+        index = nexus_index.NexusIndex.forDirectory(self.tempdir.name)
+        self.assertEqual(index.charges(self.paths), [10.0, 20.0, 30.0])
+        self.assertFalse(os.path.exists(index.cachePath))
+
+    def testMissingCharge(self):
+        index = nexus_index.NexusIndex.forDirectory(self.tempdir.name)
+        self.assertIsNone(index.charges(
+            self.paths + [os.path.join(self.tempdir.name, "missing.nxs")]))
+
+    def testEqualChargesMatchFileCount(self):
+        for batchSize, stepSize, offset in [(1, 1, 0), (3, 1, 0), (2, 2, 1)]:
+            self.assertEqual(
+                nexus_index.chargeWindows(
+                    [5.0] * 7, batchSize, stepSize, offset),
+                sliding_window.windows(7, batchSize, stepSize, offset)
+            )
+
+    def testChargeWindows(self):
+        # Mean charge 10, so each batch holds a charge of ~20
+        self.assertEqual(
+            nexus_index.chargeWindows(
+                [2.0, 2.0, 16.0, 10.0, 10.0, 20.0], 2, 2),
+            [(0, 3), (3, 5), (5, 6)]
+        )
+
+
+class TestChargeBatching(TestCase):
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.dataFiles = []
+        # Mean charge 10, so each batch holds a charge of ~20
+        for i, charge in enumerate([2.0, 2.0, 16.0, 10.0, 10.0, 20.0]):
+            dataFile = f"run{i}.nxs"
+            makeNexusFile(os.path.join(self.tempdir.name, dataFile), charge)
+            self.dataFiles.append(dataFile)
+
+        gudpy = gp.GudPy()
+        gudpy.loadFromFile(
+            loadFile=os.path.join(
+                os.path.dirname(__file__),
+                "TestData/NIMROD-water/water.txt"
+            ),
+            format=Format.TXT
+        )
+        self.gudrunFile = gudpy.gudrunFile
+        self.gudrunFile.instrument.dataFileType = "nxs"
+        self.gudrunFile.instrument.dataFileDir = self.tempdir.name
+        sampleBackground = self.gudrunFile.sampleBackgrounds[0]
+        self.sample = sampleBackground.samples[0]
+        self.sample.dataFiles = DataFiles(
+            list(self.dataFiles), self.sample.name)
+        sampleBackground.samples = [self.sample]
+        self.cacheDir = tempfile.TemporaryDirectory()
+        self.defaultCacheDir = nexus_index.CACHE_DIR
+        nexus_index.CACHE_DIR = self.cacheDir.name
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        nexus_index.CACHE_DIR = self.defaultCacheDir
+        self.cacheDir.cleanup()
+        self.tempdir.cleanup()
+        return super().tearDown()
+
+    def batchedFiles(self, gudrunFile):
+        return [
+            list(sample.dataFiles)
+            for sample in gudrunFile.sampleBackgrounds[0].samples
+        ]
+
+    def testBatch(self):
+        batchProcessing = gp.BatchProcessing(
+            self.gudrunFile, batchSize=2, stepSize=2)
+        self.assertIsNone(batchProcessing.firstBatch)
+        self.assertEqual(
+            self.batchedFiles(batchProcessing.batchedGudrunFile),
+            [self.dataFiles[0:3], self.dataFiles[3:5], self.dataFiles[5:6]]
+        )
+
+    def testSeparateFirstBatch(self):
+        batchProcessing = gp.BatchProcessing(
+            self.gudrunFile, batchSize=2, stepSize=2,
+            separateFirstBatch=True)
+        self.assertEqual(
+            self.batchedFiles(batchProcessing.firstBatch),
+            [self.dataFiles[0:3]]
+        )
+        self.assertEqual(
+            len(self.batchedFiles(batchProcessing.batchedGudrunFile)), 3)
+
+    def testSlidingWindows(self):
+        slidingWindow = gp.SlidingWindowBatchProcessing(
+            self.gudrunFile, batchSize=2, stepSize=2)
+        # None of the data files has been reduced yet
+        unmerged = slidingWindow.mergeWindows()
+        self.assertEqual(
+            [list(dataFiles) for _, _, dataFiles in unmerged],
+            [self.dataFiles[0:3], self.dataFiles[3:5], self.dataFiles[5:6]]
+        )
+
+    def testPlanBatchProcessing(self):
+        # Planned batches are formed by charge, as when batching
+        batchProcessing = gp.BatchProcessing(
+            self.gudrunFile, batchSize=1, stepSize=1)
+        nBatches = len(self.batchedFiles(batchProcessing.batchedGudrunFile))
+        self.assertEqual(nBatches, 5)
+        plan = run_planner.planBatchProcessing(
+            self.gudrunFile, batchSize=1, stepSize=1)
+        self.assertEqual(plan.runs, [nBatches])
@@ -0,0 +1,195 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+import h5py as h5
+import numpy as np
+
+from core import gudpy as gp
+from core import output_archive
+from core.curve_file import CurveFile
+from core.enums import Format, OutputArchive
+from core.gud_file import GudFile
+from core.output_file_handler import GudrunOutput, GudrunOutputHandler
+
+WATER_REF = os.path.join(
+    os.path.dirname(__file__), "TestData", "water-ref", "plain"
+)
+SAMPLE = "H2O,_Can_N9"
+DATA_FILE = "NIMROD00016608_H2O_in_N9.raw"
+
+
+def writeGudFile(path):
+    gudFile = GudFile.__new__(GudFile)
+    gudFile.name = os.path.basename(path)
+    gudFile.title = "H2O in 1mm TiZr Can N9"
+    gudFile.author = "T. G. A. Youngs, D."
+    gudFile.stamp = "23-OCT-2012 17:45:25"
+    gudFile.atomicDensity = 0.1
+    gudFile.chemicalDensity = 0.99717
+    gudFile.averageScatteringLength = -0.05583
+    gudFile.averageScatteringLengthSquared = 0.00311736
+    gudFile.averageSquareOfScatteringLength = 0.20545
+    gudFile.coherentRatio = 65.9
+    gudFile.expectedDCS = 4.46355
+    gudFile.groupsTable = "".join(
+        f"   {i}     0.0173    4.0723     4.51058    -0.6170\n"
+        for i in range(1, 4)
+    )
+    gudFile.noGroups = 3
+    gudFile.averageLevelMergedDCS = 4.4
+    gudFile.gradient = "-0.5106%"
+    gudFile.err = ""
+    gudFile.result = " The DCS level is   98.0% of expected level.\n"
+    gudFile.suggestedTweakFactor = "1.01443"
+    gudFile.write_out(path)
+
+
+class TestOutputArchive(TestCase):
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.projectDir = os.path.join(self.tempdir.name, "water")
+        self.procDir = os.path.join(self.tempdir.name, "proc")
+        os.makedirs(self.projectDir)
+        os.makedirs(self.procDir)
+
+        gudpy = gp.GudPy()
+        gudpy.loadFromFile(
+            loadFile=os.path.join(
+                os.path.dirname(__file__),
+                "TestData/NIMROD-water/water.txt"
+            ),
+            format=Format.TXT
+        )
+        gudpy.setSaveLocation(self.projectDir)
+        self.gudrunFile = gudpy.gudrunFile
+        self.gudrunFile.instrument.GudrunInputFileDir = self.procDir
+
+        # Outputs of a run, as gudrun_dcs leaves them
+        for f in os.listdir(WATER_REF):
+            shutil.copyfile(
+                os.path.join(WATER_REF, f), os.path.join(self.procDir, f))
+        writeGudFile(
+            os.path.join(self.procDir, "NIMROD00016608_H2O_in_N9.gud"))
+        with open(os.path.join(self.procDir, self.gudrunFile.OUTPATH),
+                  "w", encoding="utf-8") as fp:
+            fp.write(str(self.gudrunFile))
+        with open(os.path.join(self.procDir, "gudrun_dcs.log"),
+                  "wb") as fp:
+            fp.write(b"binary\0log")
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        self.tempdir.cleanup()
+        return super().tearDown()
+
+    def organise(self, archive, overwrite=True):
+        return GudrunOutputHandler(
+            self.gudrunFile, archive=archive, overwrite=overwrite
+        ).organiseOutput()
+
+    def testNoArchive(self):
+        output = self.organise(OutputArchive.NONE)
+        self.assertIsNone(output.archive)
+        self.assertFalse(os.path.exists(
+            output_archive.archivePath(output.path)))
+
+    def testArchiveAlso(self):
+        output = self.organise(OutputArchive.ALSO)
+        path = output_archive.archivePath(output.path)
+        self.assertTrue(os.path.isdir(output.path))
+        self.assertTrue(os.path.isfile(path))
+
+        mintPath = output.output(SAMPLE, DATA_FILE, ".mint01")
+        with h5.File(path, "r") as archive:
+            dataset = archive[os.path.relpath(mintPath, output.path)]
+            self.assertEqual(dataset.attrs["kind"], "numeric")
+            self.assertEqual(dataset.compression, "gzip")
+            self.assertTrue(dataset.shuffle)
+
+        fromArchive = GudrunOutput.fromArchive(path)
+        self.assertEqual(
+            os.path.normpath(fromArchive.path), os.path.normpath(output.path))
+        self.assertEqual(fromArchive.inputFilePath, output.inputFilePath)
+        self.assertEqual(
+            list(fromArchive.sampleOutputs), list(output.sampleOutputs))
+        for name, sampleOutput in output.sampleOutputs.items():
+            self.assertEqual(
+                fromArchive.sampleOutputs[name].outputs,
+                sampleOutput.outputs)
+            self.assertEqual(
+                fromArchive.sampleOutputs[name].diagnostics,
+                sampleOutput.diagnostics)
+        fromArchive.archive.close()
+
+    def testArchiveOnly(self):
+        output = self.organise(OutputArchive.ONLY)
+        self.assertFalse(os.path.exists(output.path))
+        self.assertIsNotNone(output.archive)
+        # The input file directory is where the archive is kept
+        self.assertEqual(output.directory(), self.projectDir)
+
+        # Outputs are only read when requested
+        self.assertIsNone(output.sampleOutputs[SAMPLE].gudFile)
+        gudFile = output.gudFile(name=SAMPLE)
+        self.assertEqual(gudFile.title, "H2O in 1mm TiZr Can N9")
+        self.assertEqual(gudFile.expectedDCS, 4.46355)
+        self.assertIs(output.gudFile(name=SAMPLE), gudFile)
+
+        curve = output.curve(SAMPLE, DATA_FILE, ".mint01")
+        expected = CurveFile(
+            os.path.join(WATER_REF, "NIMROD00016608_H2O_in_N9.mint01"))
+        self.assertIsInstance(curve, CurveFile)
+        self.assertEqual(curve.header, expected.header)
+        np.testing.assert_array_equal(curve.data, expected.data)
+
+        archive = output.archive
+        addDir = os.path.join(output.path, "AdditionalOutputs")
+        with open(os.path.join(self.procDir, self.gudrunFile.OUTPATH),
+                  encoding="utf-8") as fp:
+            self.assertEqual(
+                archive.readText(
+                    os.path.join(addDir, self.gudrunFile.OUTPATH)),
+                fp.read())
+        logPath = os.path.join(addDir, "gudrun_dcs.log")
+        self.assertIn(logPath, archive)
+        self.assertEqual(
+            archive.dataset(logPath)[()].tobytes(), b"binary\0log")
+        archive.close()
+
+    def testArchivesKept(self):
+        first = self.organise(OutputArchive.ONLY)
+        second = self.organise(OutputArchive.ONLY, overwrite=False)
+        self.assertNotEqual(second.archive.path, first.archive.path)
+        self.assertTrue(os.path.isfile(first.archive.path))
+        self.assertTrue(os.path.isfile(second.archive.path))
+        self.assertEqual(
+            second.output(SAMPLE, DATA_FILE, ".mint01"),
+            os.path.join(
+                second.path, os.path.relpath(
+                    first.output(SAMPLE, DATA_FILE, ".mint01"), first.path)
+            )
+        )
+        np.testing.assert_array_equal(
+            second.curve(SAMPLE, DATA_FILE, ".mint01").data,
+            first.curve(SAMPLE, DATA_FILE, ".mint01").data
+        )
+        first.archive.close()
+        second.archive.close()
+
+        # Directories are not given the name of an archive either
+        third = self.organise(OutputArchive.NONE, overwrite=False)
+        self.assertTrue(os.path.isdir(third.path))
+        self.assertFalse(os.path.exists(
+            output_archive.archivePath(third.path)))
+        self.assertTrue(os.path.isfile(
+            third.output(SAMPLE, DATA_FILE, ".mint01")))
+
+    def testStaleArchiveRemoved(self):
+        output = self.organise(OutputArchive.ONLY)
+        path = output.archive.path
+        output.archive.close()
+        output = self.organise(OutputArchive.NONE)
+        self.assertTrue(os.path.isdir(output.path))
+        self.assertFalse(os.path.exists(path))
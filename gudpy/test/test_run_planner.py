@@ -0,0 +1,118 @@
+import os
+import tempfile
+import threading
+from unittest import TestCase
+
+from core import gudpy as gp
+from core import iterators
+from core import run_planner
+from core.enums import Format
+
+
+class TestRunPlanner(TestCase):
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.historyPath = os.path.join(
+            self.tempdir.name, "run_history.jsonl")
+        self.gudpy = gp.GudPy(
+            runHistory=run_planner.RunHistory(self.historyPath))
+        self.gudpy.loadFromFile(
+            loadFile=os.path.join(
+                os.path.dirname(__file__),
+                "TestData/NIMROD-water/water.txt"
+            ),
+            format=Format.TXT
+        )
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        self.tempdir.cleanup()
+        return super().tearDown()
+
+    def testPlanGudrun(self):
+        plan = self.gudpy.planGudrun()
+        self.assertEqual(plan.runs, [4])
+        self.assertEqual(plan.instrument, "NIMROD")
+        self.assertIsNone(plan.duration)
+        self.assertIsNone(plan.diskUsage)
+
+    def testPlanIteration(self):
+        plan = self.gudpy.planGudrun(iterators.TweakFactor(5))
+        self.assertEqual(plan.nRuns, 6)
+        self.assertEqual(plan.nSamples, 24)
+
+        plan = self.gudpy.planGudrun(iterators.InelasticitySubtraction(2))
+        self.assertEqual(plan.nRuns, 4)
+
+    def testPlanIgnoresUnselectedSamples(self):
+        sample = self.gudpy.gudrunFile.sampleBackgrounds[0].samples[0]
+        sample.runThisSample = False
+        self.assertEqual(self.gudpy.planGudrun().runs, [3])
+
+    def testPlanBatchProcessing(self):
+        plan = self.gudpy.planBatchProcessing(batchSize=1, stepSize=1)
+        self.assertEqual(plan.runs, [8])
+
+        plan = self.gudpy.planBatchProcessing(
+            iterator=iterators.Density(3),
+            batchSize=1,
+            separateFirstBatch=True,
+            rtol=0.1
+        )
+        self.assertEqual(plan.runs, [4] * 4 + [8] * 4)
+        self.assertTrue(plan.upperBound)
+
+    def testPlanSlidingWindow(self):
+        plan = self.gudpy.planBatchProcessing(
+            batchSize=2, stepSize=1, slidingWindow=True)
+        self.assertEqual(plan.runs, [8])
+
+    def testEstimateFromHistory(self):
+        history = self.gudpy.runHistory
+        history.record("NIMROD", 4, 10.0, 4000)
+        history.record("NIMROD", 4, 20.0, 4000)
+        history.record("SANDALS", 4, 100.0, 1)
+
+        plan = self.gudpy.planGudrun(iterators.Thickness(1))
+        self.assertAlmostEqual(plan.duration, 30.0)
+        self.assertEqual(plan.diskUsage, 8000)
+
+    def testEstimateScalesBySampleCount(self):
+        self.gudpy.runHistory.record("NIMROD", 2, 10.0, 1000)
+
+        plan = self.gudpy.planGudrun()
+        self.assertAlmostEqual(plan.duration, 20.0)
+        self.assertEqual(plan.diskUsage, 2000)
+
+    def testInjectedHistory(self):
+        self.assertIs(
+            gp.Gudrun(history=self.gudpy.runHistory).history,
+            self.gudpy.runHistory
+        )
+        self.assertIs(
+            gp.GudrunPool(1, history=self.gudpy.runHistory).history,
+            self.gudpy.runHistory
+        )
+
+    def testDisabledHistory(self):
+        history = run_planner.RunHistory(None)
+        history.record("NIMROD", 4, 10.0, 4000)
+        self.assertEqual(history.entries(), [])
+        self.assertEqual(gp.GudPy().runHistory.entries(), [])
+        self.assertFalse(os.path.exists(self.historyPath))
+
+    def testConcurrentRecords(self):
+        history = self.gudpy.runHistory
+        threads = [
+            threading.Thread(
+                target=history.record, args=("NIMROD", 4, float(i), 4000))
+            for i in range(20)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(
+            sorted(e["duration"] for e in history.entries()),
+            [float(i) for i in range(20)]
+        )
@@ -0,0 +1,102 @@
+import os
+from unittest import TestCase
+
+from core import gudpy as gp
+from core.enums import Format
+from core.element import Element
+from core.run_snapshot import RunSnapshot
+
+
+class TestRunSnapshot(TestCase):
+    def setUp(self) -> None:
+        gudpy = gp.GudPy()
+        gudpy.loadFromFile(
+            loadFile=os.path.join(
+                os.path.dirname(__file__),
+                "TestData/NIMROD-water/water.txt"
+            ),
+            format=Format.TXT
+        )
+        self.gudrunFile = gudpy.gudrunFile
+        self.samples = self.gudrunFile.sampleBackgrounds[0].samples
+        self.snapshot = RunSnapshot(self.gudrunFile)
+        self.runSamples = self.snapshot.gudrunFile.sampleBackgrounds[0].samples
+        return super().setUp()
+
+    def testIsolated(self):
+        density = self.runSamples[0].density
+        self.samples[0].density = density + 1.0
+        self.samples[1].containers.pop()
+        self.assertEqual(self.runSamples[0].density, density)
+        self.assertEqual(len(self.runSamples[1].containers), 1)
+
+        self.runSamples[2].density = density + 2.0
+        self.assertNotEqual(self.samples[2].density, density + 2.0)
+
+    def testMerge(self):
+        self.snapshot.gudrunFile.setGudrunDir("Gudrun")
+        self.runSamples[0].sampleTweakFactor = 1.5
+        self.runSamples[1].containers[0].density = 0.5
+        self.assertEqual(self.snapshot.merge(), [])
+
+        self.assertEqual(self.gudrunFile.instrument.GudrunInputFileDir,
+                         "Gudrun")
+        self.assertEqual(self.samples[0].sampleTweakFactor, 1.5)
+        self.assertEqual(self.samples[1].containers[0].density, 0.5)
+
+    def testMergeResultCopy(self):
+        # Iterators run on a copy of the snapshot they are given
+        result = self.snapshot.gudrunFile.clone()
+        sample = result.sampleBackgrounds[0].samples[0]
+        sample.composition.elements.append(Element("H", 2, 1.0))
+        self.snapshot.merge(result)
+
+        composition = self.samples[0].composition
+        self.assertEqual(composition.elements[-1].massNo, 2)
+        sample.composition.elements.clear()
+        self.assertTrue(len(composition.elements))
+
+    def testEditsKept(self):
+        self.runSamples[0].density = 0.5
+        self.runSamples[0].sampleTweakFactor = 1.5
+        self.samples[0].density = 0.7
+        self.assertEqual(
+            self.snapshot.merge(),
+            [(("sampleBackgrounds", 0, "samples", 0), "density")]
+        )
+        self.assertEqual(self.samples[0].density, 0.7)
+        self.assertEqual(self.samples[0].sampleTweakFactor, 1.5)
+
+    def testMovedObjects(self):
+        moved = self.samples[1]
+        removed = self.samples.pop(0)
+        self.runSamples[0].density = 0.5
+        self.runSamples[1].density = 0.6
+        self.snapshot.merge()
+
+        self.assertIs(self.samples[0], moved)
+        self.assertEqual(moved.density, 0.6)
+        self.assertEqual(removed.density, 0.5)
+        self.assertNotIn(removed, self.samples)
+
+    def testOriginalOf(self):
+        moved = self.samples[1]
+        self.samples.pop(0)
+        self.assertIs(self.snapshot.originalOf(self.runSamples[1]), moved)
+        self.assertIs(
+            self.snapshot.originalOf(self.runSamples[2].containers[0]),
+            self.samples[1].containers[0])
+        self.assertIsNone(self.snapshot.originalOf(self.samples[0]))
+
+    def testRunMode(self):
+        # A GudrunFile built from the snapshot only passes back
+        # where its inputs were written
+        names = [s.name for s in self.samples]
+        partition = gp.RunModes().partition(self.snapshot.gudrunFile)
+        partition.setGudrunDir("Gudrun")
+        self.snapshot.gudrunFile.setGudrunDir(
+            partition.instrument.GudrunInputFileDir)
+        self.assertEqual(self.snapshot.merge(), [])
+        self.assertEqual(
+            self.gudrunFile.instrument.GudrunInputFileDir, "Gudrun")
+        self.assertEqual([s.name for s in self.samples], names)
@@ -0,0 +1,124 @@
+import copy
+import os
+import tempfile
+import threading
+import types
+from unittest import TestCase
+
+from core import gudpy as gp
+from core import run_planner
+from core import scheduler
+from core.enums import Format
+
+
+class FakePool(gp.GudrunPool):
+    """Pool whose jobs only record the order they were started in
+    """
+
+    def __init__(self, nWorkers, estimates):
+        super().__init__(nWorkers, scheduler.TimingHistory())
+        self.durations = estimates
+        self.started = []
+        self.running = 0
+        self.maxRunning = 0
+        self.lock = threading.Lock()
+
+    def estimates(self, gudrunFiles):
+        return [self.durations[g.projectDir] for g in gudrunFiles]
+
+    def runJob(self, gudrun, gudrunFile, purge):
+        with self.lock:
+            self.started.append(gudrunFile.projectDir)
+            self.running += 1
+            self.maxRunning = max(self.maxRunning, self.running)
+        try:
+            if gudrunFile.projectDir == "fail":
+                raise OSError("gudrun_dcs could not be started")
+            # Finishing the first job makes the last the longest
+            self.durations["c"] = 5.0
+            return 0
+        finally:
+            with self.lock:
+                self.running -= 1
+
+
+class TestScheduler(TestCase):
+    def setUp(self) -> None:
+        self.gudpy = gp.GudPy()
+        self.gudpy.loadFromFile(
+            loadFile=os.path.join(
+                os.path.dirname(__file__),
+                "TestData/NIMROD-water/water.txt"
+            ),
+            format=Format.TXT
+        )
+        return super().setUp()
+
+    def testOrderLongestFirst(self):
+        self.assertEqual(scheduler.order([1.0, 5.0, 3.0]), [1, 2, 0])
+
+    def testMakespan(self):
+        self.assertEqual(scheduler.makespan([3, 3, 2, 2, 2], 2), 7)
+        self.assertEqual(scheduler.makespan([4, 1], 4), 4)
+        self.assertEqual(scheduler.makespan([], 2), 0)
+
+    def testJobSignature(self):
+        self.assertEqual(
+            scheduler.jobSignature(self.gudpy.gudrunFile), ("NIMROD", 8, 4)
+        )
+
+    def testEstimateUpdates(self):
+        timings = scheduler.TimingHistory()
+        signature = ("NIMROD", 8, 4)
+        self.assertEqual(timings.estimate(signature), 8.0)
+
+        timings.update(signature, 10.0)
+        timings.update(signature, 20.0)
+        self.assertEqual(timings.estimate(signature), 15.0)
+
+        # Scaled by the number of data files
+        self.assertEqual(timings.estimate(("NIMROD", 4, 2)), 7.5)
+        self.assertEqual(timings.estimate(("SANDALS", 16, 2)), 30.0)
+
+    def testFromRunHistory(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            history = run_planner.RunHistory(
+                os.path.join(tmp, "run_history.jsonl"))
+            history.record("NIMROD", 4, 12.0, 100, nDataFiles=8)
+            history.record("NIMROD", 4, 1000.0, 100)
+            timings = scheduler.TimingHistory.fromRunHistory(history)
+        self.assertEqual(timings.estimate(("NIMROD", 8, 4)), 12.0)
+
+    def testPoolExpectedMakespan(self):
+        gudrunFiles = [self.gudpy.gudrunFile]
+        small = copy.deepcopy(self.gudpy.gudrunFile)
+        small.sampleBackgrounds[0].samples[0].runThisSample = False
+        gudrunFiles.append(small)
+
+        pool = gp.GudrunPool(2, scheduler.TimingHistory())
+        self.assertEqual(pool.estimates(gudrunFiles), [8.0, 6.0])
+        self.assertEqual(pool.expectedMakespan(gudrunFiles), 8.0)
+        pool.nWorkers = 1
+        self.assertEqual(pool.expectedMakespan(gudrunFiles), 14.0)
+
+    def testPoolRequiresSeparateProjects(self):
+        pool = gp.GudrunPool(2, scheduler.TimingHistory())
+        with self.assertRaises(ValueError):
+            pool.run([self.gudpy.gudrunFile, self.gudpy.gudrunFile])
+
+    def testPoolStartsLongestPending(self):
+        pool = FakePool(1, {"a": 3.0, "b": 2.0, "c": 1.0})
+        jobs = [types.SimpleNamespace(projectDir=d) for d in "abc"]
+        self.assertEqual(pool.run(jobs), [(0, "")] * 3)
+        self.assertEqual(pool.started, ["a", "c", "b"])
+
+    def testPoolWorkers(self):
+        durations = {str(i): float(i) for i in range(8)}
+        durations["fail"] = 10.0
+        pool = FakePool(3, durations)
+        jobs = [types.SimpleNamespace(projectDir=d) for d in durations]
+        results = pool.run(jobs)
+        self.assertLessEqual(pool.maxRunning, 3)
+        self.assertEqual(len(pool.started), len(jobs))
+        self.assertEqual(results[-1], (1, "gudrun_dcs could not be started"))
+        self.assertEqual(results[:-1], [(0, "")] * 8)
@@ -0,0 +1,104 @@
+import os
+from unittest import TestCase
+
+from core import config
+from core import gudpy as gp
+from core.container import Container
+from core.element import Element
+from core.enums import Format, Geometry
+
+
+def withoutDate(string):
+    return [
+        line for line in string.splitlines()
+        if not line.startswith("Date and time last written")
+    ]
+
+
+class TestSectionCache(TestCase):
+    def setUp(self) -> None:
+        gudpy = gp.GudPy()
+        gudpy.loadFromFile(
+            loadFile=os.path.join(
+                os.path.dirname(__file__),
+                "TestData/NIMROD-water/water.txt"
+            ),
+            format=Format.TXT
+        )
+        self.gudrunFile = gudpy.gudrunFile
+        self.geometry = config.geometry
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        config.geometry = self.geometry
+        return super().tearDown()
+
+    def assertUpToDate(self):
+        """Checks the cached text against that of a copy,
+        which starts with an empty cache
+        """
+        self.assertEqual(
+            withoutDate(str(self.gudrunFile)),
+            withoutDate(str(self.gudrunFile.clone()))
+        )
+
+    def testUnchangedSectionsReused(self):
+        str(self.gudrunFile)
+        cache = self.gudrunFile.textCache()
+        texts = {k: v[-1] for k, v in cache.entries.items()}
+        self.gudrunFile.sampleBackgrounds[0].samples[0].name = "Changed"
+        str(self.gudrunFile)
+
+        sample = self.gudrunFile.sampleBackgrounds[0].samples[0]
+        for key, text in texts.items():
+            if key[0] == id(sample):
+                self.assertIsNot(cache.entries[key][-1], text)
+            else:
+                self.assertIs(cache.entries[key][-1], text)
+
+    def testFieldChange(self):
+        str(self.gudrunFile)
+        self.gudrunFile.instrument.wavelengthMin = 0.5
+        self.gudrunFile.sampleBackgrounds[0].samples[1].density = 0.2
+        self.assertUpToDate()
+
+    def testNestedChange(self):
+        str(self.gudrunFile)
+        sample = self.gudrunFile.sampleBackgrounds[0].samples[0]
+        sample.composition.elements[0].abundance = 99.0
+        sample.containers[0].composition.elements.append(
+            Element("H", 0, 1.0))
+        self.assertUpToDate()
+
+    def testNestedListChange(self):
+        sample = self.gudrunFile.sampleBackgrounds[0].samples[0]
+        sample.exponentialValues = [[0.0, 1.5, 0]]
+        sample.resonanceValues = [[0.1, 0.2]]
+        str(self.gudrunFile)
+        # Tables edit their rows in place
+        sample.exponentialValues[0][1] = 0.777
+        sample.resonanceValues[0][0] = 0.3
+        self.assertIn("0.777", str(self.gudrunFile))
+        self.assertUpToDate()
+
+    def testListChange(self):
+        str(self.gudrunFile)
+        samples = self.gudrunFile.sampleBackgrounds[0].samples
+        samples[0].containers.append(Container())
+        samples.pop()
+        self.assertUpToDate()
+
+    def testGeometryChange(self):
+        config.geometry = Geometry.FLATPLATE
+        str(self.gudrunFile)
+        config.geometry = Geometry.CYLINDRICAL
+        self.assertUpToDate()
+
+    def testPrunedSections(self):
+        str(self.gudrunFile)
+        removed = self.gudrunFile.sampleBackgrounds[0].samples.pop()
+        str(self.gudrunFile)
+        self.assertNotIn(
+            id(removed),
+            [key[0] for key in self.gudrunFile.textCache().entries]
+        )
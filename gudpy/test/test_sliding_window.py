@@ -0,0 +1,74 @@
+import os
+import tempfile
+from unittest import TestCase
+
+import numpy as np
+
+from core import sliding_window
+from core.curve_file import readCurve
+
+
+class TestSlidingWindow(TestCase):
+    def testWindowsOverlapping(self):
+        self.assertEqual(
+            sliding_window.windows(5, 3, 1),
+            [(0, 3), (1, 4), (2, 5), (3, 5), (4, 5)]
+        )
+
+    def testWindowsOffset(self):
+        self.assertEqual(
+            sliding_window.windows(6, 2, 2, offset=1),
+            [(1, 3), (3, 5), (5, 6)]
+        )
+
+    def testWeightedSum(self):
+        x = np.array([1.0, 2.0])
+        x_, y, err = sliding_window.weightedSum([
+            (x, np.array([1.0, 2.0]), np.array([1.0, 1.0])),
+            (x, np.array([3.0, 4.0]), np.array([1.0, 1.0])),
+        ])
+        self.assertTrue(np.allclose(x_, x))
+        self.assertTrue(np.allclose(y, [2.0, 3.0]))
+        self.assertTrue(np.allclose(err, [1 / np.sqrt(2)] * 2))
+
+    def testWeightedSumFavoursSmallerErrors(self):
+        x = np.array([1.0])
+        _, y, _ = sliding_window.weightedSum([
+            (x, np.array([0.0]), np.array([1.0])),
+            (x, np.array([3.0]), np.array([0.5])),
+        ])
+        self.assertAlmostEqual(y[0], 2.4)
+
+    def testWeightedSumNoErrors(self):
+        x = np.array([1.0])
+        _, y, err = sliding_window.weightedSum([
+            (x, np.array([1.0]), np.array([0.0])),
+            (x, np.array([3.0]), np.array([0.0])),
+        ])
+        self.assertAlmostEqual(y[0], 2.0)
+        self.assertAlmostEqual(err[0], 0.0)
+
+    def testWeightedSumMismatchedX(self):
+        with self.assertRaises(ValueError):
+            sliding_window.weightedSum([
+                (np.array([1.0, 2.0]), np.zeros(2), np.ones(2)),
+                (np.array([1.0, 3.0]), np.zeros(2), np.ones(2)),
+            ])
+
+    def testMergeCurves(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            paths = []
+            for i, y in enumerate((1.0, 3.0)):
+                path = os.path.join(tmp, f"{i}.mint01")
+                with open(path, "w", encoding="utf-8") as fp:
+                    fp.write("# header\n")
+                    fp.write(f"  1.0000000E-01  {y:.7E}  1.0000000E+00\n")
+                    fp.write(f"  2.0000000E-01  {y:.7E}  1.0000000E+00\n")
+                paths.append(path)
+
+            target = sliding_window.mergeCurves(
+                paths, os.path.join(tmp, "merged", "0-1.mint01"))
+            header, x, y, err = readCurve(target)
+            self.assertEqual(header, ["# header\n"])
+            self.assertTrue(np.allclose(x, [0.1, 0.2]))
+            self.assertTrue(np.allclose(y, [2.0, 2.0]))
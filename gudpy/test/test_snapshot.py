@@ -0,0 +1,152 @@
+import json
+import os
+import pickle
+import tempfile
+from unittest import TestCase
+
+from core import gudpy as gp
+from core import snapshot
+from core.enums import Format
+from core.gudpy_yaml import YAML
+
+
+class TestSnapshot(TestCase):
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.projectDir = os.path.join(self.tempdir.name, "water")
+        os.makedirs(self.projectDir)
+        self.gudpy = gp.GudPy()
+        self.gudpy.loadFromFile(
+            loadFile=os.path.join(
+                os.path.dirname(__file__),
+                "TestData/NIMROD-water/water.txt"
+            ),
+            format=Format.TXT
+        )
+        self.gudpy.setSaveLocation(self.projectDir)
+        self.yamlPath = os.path.join(self.projectDir, "water.yaml")
+        self.keyPath = snapshot.KEY_PATH
+        snapshot.KEY_PATH = os.path.join(self.tempdir.name, "snapshot.key")
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        snapshot.KEY_PATH = self.keyPath
+        self.tempdir.cleanup()
+        return super().tearDown()
+
+    def rewrite(self, header=None, payload=None):
+        """Rewrites parts of the snapshot, keeping the rest
+        """
+        path = snapshot.snapshotPath(self.yamlPath)
+        with open(path, "rb") as fp:
+            oldHeader = json.loads(fp.readline())
+            oldPayload = fp.read()
+        with open(path, "wb") as fp:
+            fp.write(json.dumps(header or oldHeader).encode("utf-8") + b"\n")
+            fp.write(payload or oldPayload)
+
+    def testSaveWithoutSnapshot(self):
+        self.gudpy.save()
+        self.assertFalse(
+            os.path.exists(snapshot.snapshotPath(self.yamlPath)))
+
+    def testSnapshotMatchesYAML(self):
+        self.gudpy.save(snapshot=True)
+        self.assertTrue(
+            os.path.exists(snapshot.snapshotPath(self.yamlPath)))
+        self.assertTrue(snapshot.hasSnapshot(self.yamlPath))
+
+        fromSnapshot = snapshot.readSnapshot(self.yamlPath)
+        fromYAML = YAML().parseYaml(self.yamlPath)
+        self.assertIsNotNone(fromSnapshot)
+        self.assertEqual(
+            YAML().toYaml(list(fromSnapshot)),
+            YAML().toYaml(list(fromYAML))
+        )
+        self.assertEqual(
+            fromSnapshot[0].GudrunInputFileDir,
+            os.path.dirname(os.path.abspath(self.yamlPath))
+        )
+
+    def testMissingSnapshotRewritten(self):
+        self.gudpy.save(snapshot=True)
+        os.remove(snapshot.snapshotPath(self.yamlPath))
+        # The YAML file is unchanged, but the snapshot is written again
+        self.gudpy.save(snapshot=True)
+        self.assertTrue(snapshot.hasSnapshot(self.yamlPath))
+
+    def testLoadFromProject(self):
+        self.gudpy.save(snapshot=True)
+        parsed = snapshot.readSnapshot(self.yamlPath)
+        parsed[4][0].samples[0].name = "FROM SNAPSHOT"
+        snapshot.writeSnapshot(self.yamlPath, parsed)
+
+        # Snapshots are only loaded when asked for
+        gudpy = gp.GudPy()
+        gudpy.loadFromProject(self.projectDir)
+        self.assertEqual(
+            [s.name for s in gudpy.gudrunFile.sampleBackgrounds[0].samples],
+            [s.name
+             for s in self.gudpy.gudrunFile.sampleBackgrounds[0].samples]
+        )
+        gudpy = gp.GudPy()
+        gudpy.loadFromProject(self.projectDir, snapshot=True)
+        self.assertEqual(
+            gudpy.gudrunFile.sampleBackgrounds[0].samples[0].name,
+            "FROM SNAPSHOT"
+        )
+
+    def testStaleSnapshotIgnored(self):
+        self.gudpy.save(snapshot=True)
+        self.gudpy.gudrunFile.sampleBackgrounds[0].samples[0].name = "NEW"
+        self.gudpy.save()
+        self.assertFalse(snapshot.hasSnapshot(self.yamlPath))
+        self.assertIsNone(snapshot.readSnapshot(self.yamlPath))
+
+        gudpy = gp.GudPy()
+        gudpy.loadFromProject(self.projectDir, snapshot=True)
+        self.assertEqual(
+            gudpy.gudrunFile.sampleBackgrounds[0].samples[0].name, "NEW")
+
+    def testSchemaMismatchIgnored(self):
+        self.gudpy.save(snapshot=True)
+        with open(snapshot.snapshotPath(self.yamlPath), "rb") as fp:
+            header = json.loads(fp.readline())
+        header["schema"] = "0-outdated"
+        self.rewrite(header=header)
+        self.assertFalse(snapshot.hasSnapshot(self.yamlPath))
+        self.assertIsNone(snapshot.readSnapshot(self.yamlPath))
+
+    def testCorruptSnapshotIgnored(self):
+        self.gudpy.save(snapshot=True)
+        with open(snapshot.snapshotPath(self.yamlPath), "wb") as fp:
+            fp.write(b"not a snapshot")
+        self.assertFalse(snapshot.hasSnapshot(self.yamlPath))
+        self.assertIsNone(snapshot.readSnapshot(self.yamlPath))
+
+    def testForeignSnapshotIgnored(self):
+        self.gudpy.save(snapshot=True)
+        # A snapshot written by another user is signed with another key
+        snapshot.KEY_PATH = os.path.join(self.tempdir.name, "other.key")
+        self.assertFalse(snapshot.hasSnapshot(self.yamlPath))
+        self.assertIsNone(snapshot.readSnapshot(self.yamlPath))
+
+    def testDisallowedClassIgnored(self):
+        self.gudpy.save(snapshot=True)
+        payload = pickle.dumps(Reduces())
+        with open(snapshot.snapshotPath(self.yamlPath), "rb") as fp:
+            header = json.loads(fp.readline())
+        header["digest"] = snapshot._sign(payload)
+        self.rewrite(header=header, payload=payload)
+        self.assertTrue(snapshot.hasSnapshot(self.yamlPath))
+        self.assertIsNone(snapshot.readSnapshot(self.yamlPath))
+        self.assertEqual(Reduces.calls, [])
+
+
+class Reduces:
+    """Object which calls a function when unpickled
+    """
+    calls = []
+
+    def __reduce__(self):
+        return (Reduces.calls.append, ("called",))
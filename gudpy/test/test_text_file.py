@@ -0,0 +1,60 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from core import text_file
+from core.exception import ParserException
+
+
+class TestTextFile(TestCase):
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tempdir.name, "input.txt")
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        self.tempdir.cleanup()
+        return super().tearDown()
+
+    def write(self, data):
+        with open(self.path, "wb") as fp:
+            fp.write(data)
+
+    def testAscii(self):
+        self.write(b"INSTRUMENT\r\nNIMROD\rBEAM\nend")
+        self.assertEqual(
+            text_file.readLines(self.path),
+            ["INSTRUMENT\n", "NIMROD\n", "BEAM\n", "end"]
+        )
+
+    def testUtf8(self):
+        self.write("Number density (atoms/Å**3)\n".encode("utf-8"))
+        self.assertEqual(
+            text_file.readLines(self.path),
+            ["Number density (atoms/Å**3)\n"]
+        )
+
+    def testUtf8Bom(self):
+        self.write("\ufeffCONTAINER\n".encode("utf-8"))
+        self.assertEqual(text_file.readLines(self.path), ["CONTAINER\n"])
+
+    def testDetectedEncoding(self):
+        text = "Température de l'échantillon\n" * 10
+        self.write(text.encode("latin-1"))
+        self.assertEqual(text_file.readLines(self.path)[0], text[:29])
+
+    def testUndecodable(self):
+        self.write(b"\xef\xbb\xbfCONTAINER\n\xff\n")
+        with self.assertRaises(ParserException) as cm:
+            text_file.readLines(self.path)
+        self.assertIn(self.path, str(cm.exception))
+        self.assertIn("offset 13", str(cm.exception))
+
+    def testMatchesTextMode(self):
+        path = os.path.join(
+            os.path.dirname(__file__),
+            "TestData", "NIMROD-water", "water.txt"
+        )
+        with open(path, encoding="utf-8") as fp:
+            expected = fp.readlines()
+        self.assertEqual(text_file.readLines(path), expected)
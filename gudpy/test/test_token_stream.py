@@ -0,0 +1,24 @@
+from unittest import TestCase
+
+from core.token_stream import TokenStream
+
+
+class TestTokenStream(TestCase):
+    def testNextAndPeek(self):
+        stream = TokenStream(["a\n", "b\n"])
+        self.assertEqual(stream.peek(), "a\n")
+        self.assertEqual(stream.next(), "a\n")
+        self.assertEqual(stream.peek(), "b\n")
+        self.assertEqual(len(stream), 1)
+        self.assertEqual(stream.next(), "b\n")
+
+    def testExhausted(self):
+        stream = TokenStream(["a\n"])
+        stream.next()
+        self.assertFalse(stream)
+        self.assertEqual(len(stream), 0)
+        self.assertIsNone(stream.next())
+        self.assertIsNone(stream.peek())
+
+    def testEmpty(self):
+        self.assertFalse(TokenStream([]))
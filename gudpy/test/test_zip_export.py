@@ -0,0 +1,135 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+from zipfile import ZIP_DEFLATED, ZIP_STORED, ZipFile
+
+from core import gudpy as gp
+from core.curve_cache import CACHE_DIRNAME
+from core.enums import Format
+from core.file_library import GudPyFileLibrary
+from core import snapshot
+from core.zip_export import ExportMember, exportZip
+
+WATER_REF = os.path.join(
+    os.path.dirname(__file__), "TestData", "water-ref", "plain"
+)
+
+
+class TestExportZip(TestCase):
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.exportTo = os.path.join(self.tempdir.name, "export.zip")
+        self.members = [
+            ExportMember(f, path=os.path.join(WATER_REF, f))
+            for f in sorted(os.listdir(WATER_REF))
+        ]
+        self.members.append(ExportMember("params.txt", data=b"params\n"))
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        self.tempdir.cleanup()
+        return super().tearDown()
+
+    def checkContents(self, zipFile):
+        self.assertIsNone(zipFile.testzip())
+        self.assertEqual(
+            zipFile.namelist(), [m.arcname for m in self.members])
+        for member in self.members[:-1]:
+            with open(member.path, "rb") as fp:
+                self.assertEqual(zipFile.read(member.arcname), fp.read())
+        self.assertEqual(zipFile.read("params.txt"), b"params\n")
+
+    def testDeflated(self):
+        progress = []
+        exportZip(
+            self.members, self.exportTo, maxWorkers=4,
+            progress=lambda n, total: progress.append((n, total))
+        )
+        with ZipFile(self.exportTo) as zipFile:
+            self.checkContents(zipFile)
+            for info in zipFile.infolist():
+                self.assertEqual(info.compress_type, ZIP_DEFLATED)
+        total = len(self.members)
+        self.assertEqual(
+            progress, [(n, total) for n in range(1, total + 1)])
+
+    def testStored(self):
+        exportZip(self.members, self.exportTo, store=True)
+        with ZipFile(self.exportTo) as zipFile:
+            self.checkContents(zipFile)
+            for info in zipFile.infolist():
+                self.assertEqual(info.compress_type, ZIP_STORED)
+                self.assertEqual(info.compress_size, info.file_size)
+
+    def testCompressLevel(self):
+        sizes = []
+        for level in (1, 9):
+            exportZip(self.members, self.exportTo, compresslevel=level)
+            with ZipFile(self.exportTo) as zipFile:
+                self.checkContents(zipFile)
+                sizes.append(sum(
+                    info.compress_size for info in zipFile.infolist()))
+        self.assertLess(sizes[1], sizes[0])
+
+    def testStreamedMembers(self):
+        exportZip(
+            self.members, self.exportTo, maxWorkers=2, streamThreshold=0)
+        with ZipFile(self.exportTo) as zipFile:
+            self.checkContents(zipFile)
+
+    def testDeterministicOrder(self):
+        for workers in (1, 8):
+            exportZip(self.members, self.exportTo, maxWorkers=workers)
+            with ZipFile(self.exportTo) as zipFile:
+                self.assertEqual(
+                    zipFile.namelist(), [m.arcname for m in self.members])
+
+
+class TestExportProject(TestCase):
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.projectDir = os.path.join(self.tempdir.name, "water")
+        os.makedirs(self.projectDir)
+        self.gudpy = gp.GudPy()
+        self.gudpy.loadFromFile(
+            loadFile=os.path.join(
+                os.path.dirname(__file__),
+                "TestData/NIMROD-water/water.txt"
+            ),
+            format=Format.TXT
+        )
+        self.gudpy.setSaveLocation(self.projectDir)
+        self.keyPath = snapshot.KEY_PATH
+        snapshot.KEY_PATH = os.path.join(self.tempdir.name, "snapshot.key")
+        self.gudpy.save(snapshot=True)
+
+        outDir = os.path.join(self.projectDir, "Gudrun", "H2O")
+        os.makedirs(os.path.join(outDir, CACHE_DIRNAME))
+        for f in os.listdir(WATER_REF):
+            shutil.copyfile(
+                os.path.join(WATER_REF, f), os.path.join(outDir, f))
+        with open(os.path.join(outDir, CACHE_DIRNAME, "x.npy"), "wb") as fp:
+            fp.write(b"cache")
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        snapshot.KEY_PATH = self.keyPath
+        self.tempdir.cleanup()
+        return super().tearDown()
+
+    def testExportProject(self):
+        yamlPath = os.path.join(self.projectDir, "water.yaml")
+        self.assertTrue(os.path.exists(snapshot.snapshotPath(yamlPath)))
+
+        library = GudPyFileLibrary(self.gudpy.gudrunFile)
+        exportTo = library.exportProject()
+        self.assertEqual(exportTo, self.projectDir + ".zip")
+
+        with ZipFile(exportTo) as zipFile:
+            names = zipFile.namelist()
+        self.assertIn("water/water.yaml", names)
+        for f in os.listdir(WATER_REF):
+            self.assertIn(f"water/Gudrun/H2O/{f}", names)
+        self.assertFalse([n for n in names if CACHE_DIRNAME in n])
+        self.assertFalse([n for n in names if n.endswith(".snapshot")])